@@ -14,7 +14,7 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 from app.core.database import Base
 from app.core.config import settings
 # Import all models to ensure they're registered with Base.metadata
-from app.models import user, package, addon, booking, delivery
+from app.models import user, package, addon, booking, delivery, archive, staff, summary, package_stats, recommendation, backfill
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -32,6 +32,16 @@ if config.config_file_name is not None:
 # for 'autogenerate' support
 target_metadata = Base.metadata
 
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Leave the dialect-specific location search indexes out of autogenerate."""
+    if type_ == "table" and name.startswith(booking.LOCATION_FTS_TABLE):
+        return False
+    if type_ == "index" and name == "ix_bookings_location_trgm":
+        return context.get_context().dialect.name == "postgresql"
+    return True
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -54,6 +64,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -77,7 +88,7 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata, include_object=include_object
         )
 
         with context.begin_transaction():
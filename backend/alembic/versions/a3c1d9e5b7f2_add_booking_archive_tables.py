@@ -0,0 +1,83 @@
+"""Add booking archive tables
+
+Revision ID: a3c1d9e5b7f2
+Revises: 0f670c6ccc3f
+Create Date: 2026-10-19 09:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import Text
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c1d9e5b7f2'
+down_revision: Union[str, Sequence[str], None] = '0f670c6ccc3f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('bookings_archive',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('package_id', sa.UUID(), nullable=False),
+    sa.Column('event_type', sa.String(length=100), nullable=False),
+    sa.Column('event_date', sa.Date(), nullable=False),
+    sa.Column('event_time', sa.Time(), nullable=False),
+    sa.Column('location', sa.Text(), nullable=False),
+    sa.Column('status', postgresql.ENUM('PENDING', 'APPROVED', 'REJECTED', 'COMPLETED', name='bookingstatus', create_type=False), nullable=False),
+    sa.Column('total_price', sa.DECIMAL(precision=10, scale=2), nullable=False),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('admin_notes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['package_id'], ['packages.id'], ondelete='RESTRICT'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_bookings_archive_event_date'), 'bookings_archive', ['event_date'], unique=False)
+    op.create_index(op.f('ix_bookings_archive_package_id'), 'bookings_archive', ['package_id'], unique=False)
+    op.create_index(op.f('ix_bookings_archive_user_id'), 'bookings_archive', ['user_id'], unique=False)
+    op.create_table('booking_addons_archive',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('booking_id', sa.UUID(), nullable=False),
+    sa.Column('addon_id', sa.UUID(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['addon_id'], ['addons.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['booking_id'], ['bookings_archive.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_booking_addons_archive_addon_id'), 'booking_addons_archive', ['addon_id'], unique=False)
+    op.create_index(op.f('ix_booking_addons_archive_booking_id'), 'booking_addons_archive', ['booking_id'], unique=False)
+    op.create_table('deliveries_archive',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('booking_id', sa.UUID(), nullable=False),
+    sa.Column('photo_urls', postgresql.JSONB(astext_type=Text()), nullable=True),
+    sa.Column('video_urls', postgresql.JSONB(astext_type=Text()), nullable=True),
+    sa.Column('download_links', postgresql.JSONB(astext_type=Text()), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('delivered_at', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['booking_id'], ['bookings_archive.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_deliveries_archive_booking_id'), 'deliveries_archive', ['booking_id'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_deliveries_archive_booking_id'), table_name='deliveries_archive')
+    op.drop_table('deliveries_archive')
+    op.drop_index(op.f('ix_booking_addons_archive_booking_id'), table_name='booking_addons_archive')
+    op.drop_index(op.f('ix_booking_addons_archive_addon_id'), table_name='booking_addons_archive')
+    op.drop_table('booking_addons_archive')
+    op.drop_index(op.f('ix_bookings_archive_user_id'), table_name='bookings_archive')
+    op.drop_index(op.f('ix_bookings_archive_package_id'), table_name='bookings_archive')
+    op.drop_index(op.f('ix_bookings_archive_event_date'), table_name='bookings_archive')
+    op.drop_table('bookings_archive')
@@ -0,0 +1,39 @@
+"""Add addon recommendations table
+
+Revision ID: a8d2f6c4e1b7
+Revises: f1c6a8e3b5d0
+Create Date: 2026-10-19 20:14:05.871240
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8d2f6c4e1b7'
+down_revision: Union[str, Sequence[str], None] = 'f1c6a8e3b5d0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    The table starts empty; fill it with ``python -m scripts.rebuild_recommendations``.
+    """
+    op.create_table('addon_recommendations',
+    sa.Column('source_type', sa.String(length=10), nullable=False),
+    sa.Column('source_id', sa.UUID(), nullable=False),
+    sa.Column('rank', sa.Integer(), nullable=False),
+    sa.Column('addon_id', sa.UUID(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('together_count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('source_type', 'source_id', 'rank')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('addon_recommendations')
@@ -0,0 +1,44 @@
+"""Add booking coordinates and geo cell indexes
+
+Revision ID: b3e7a1d9c5f2
+Revises: a8d2f6c4e1b7
+Create Date: 2026-10-19 21:03:52.440918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e7a1d9c5f2'
+down_revision: Union[str, Sequence[str], None] = 'a8d2f6c4e1b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ('bookings', 'bookings_archive'):
+        op.add_column(table, sa.Column('latitude', sa.Float(), nullable=True))
+        op.add_column(table, sa.Column('longitude', sa.Float(), nullable=True))
+        op.add_column(table, sa.Column('geo_cell', sa.Integer(), nullable=True))
+    op.create_index(
+        'ix_bookings_event_date_geo_cell', 'bookings', ['event_date', 'geo_cell'], unique=False,
+        sqlite_where=sa.text('geo_cell IS NOT NULL'), postgresql_where=sa.text('geo_cell IS NOT NULL')
+    )
+    op.create_index(
+        'ix_bookings_geo_cell', 'bookings', ['geo_cell'], unique=False,
+        sqlite_where=sa.text('geo_cell IS NOT NULL'), postgresql_where=sa.text('geo_cell IS NOT NULL')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_bookings_geo_cell', table_name='bookings')
+    op.drop_index('ix_bookings_event_date_geo_cell', table_name='bookings')
+    for table in ('bookings_archive', 'bookings'):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('geo_cell')
+            batch_op.drop_column('longitude')
+            batch_op.drop_column('latitude')
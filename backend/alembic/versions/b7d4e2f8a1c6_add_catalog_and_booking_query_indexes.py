@@ -0,0 +1,52 @@
+"""Add partial catalog indexes and composite booking indexes
+
+Recommended by scripts/query_plan_audit.py. The single-column
+ix_bookings_user_id and ix_bookings_status are replaced by the composite
+indexes that lead with the same column.
+
+Revision ID: b7d4e2f8a1c6
+Revises: a3c1d9e5b7f2
+Create Date: 2026-10-19 10:03:27.559120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d4e2f8a1c6'
+down_revision: Union[str, Sequence[str], None] = 'a3c1d9e5b7f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Build indexes without blocking writes on PostgreSQL (CONCURRENTLY cannot run in a transaction)
+    with op.get_context().autocommit_block():
+        op.create_index('ix_packages_active_category', 'packages', ['category'], unique=False,
+                        postgresql_where=sa.text('is_active = true'), sqlite_where=sa.text('is_active = 1'),
+                        postgresql_concurrently=True)
+        op.create_index('ix_addons_active_category', 'addons', ['category'], unique=False,
+                        postgresql_where=sa.text('is_active = true'), sqlite_where=sa.text('is_active = 1'),
+                        postgresql_concurrently=True)
+        op.create_index('ix_bookings_user_event_date', 'bookings', ['user_id', 'event_date'], unique=False,
+                        postgresql_concurrently=True)
+        op.create_index('ix_bookings_status_created_at', 'bookings', ['status', 'created_at'], unique=False,
+                        postgresql_concurrently=True)
+        op.create_index('ix_bookings_created_at', 'bookings', ['created_at'], unique=False,
+                        postgresql_concurrently=True)
+    op.drop_index(op.f('ix_bookings_user_id'), table_name='bookings')
+    op.drop_index(op.f('ix_bookings_status'), table_name='bookings')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(op.f('ix_bookings_status'), 'bookings', ['status'], unique=False)
+    op.create_index(op.f('ix_bookings_user_id'), 'bookings', ['user_id'], unique=False)
+    op.drop_index('ix_bookings_created_at', table_name='bookings')
+    op.drop_index('ix_bookings_status_created_at', table_name='bookings')
+    op.drop_index('ix_bookings_user_event_date', table_name='bookings')
+    op.drop_index('ix_addons_active_category', table_name='addons')
+    op.drop_index('ix_packages_active_category', table_name='packages')
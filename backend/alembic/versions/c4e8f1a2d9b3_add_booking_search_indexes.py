@@ -0,0 +1,72 @@
+"""Add indexes for admin booking search
+
+Composite (event_type, event_date) and total_price indexes back the search
+filters and sort orders. Location substring search uses a pg_trgm GIN index
+on PostgreSQL and an FTS5 trigram table maintained by triggers on SQLite.
+
+Revision ID: c4e8f1a2d9b3
+Revises: b7d4e2f8a1c6
+Create Date: 2026-10-19 14:21:08.114602
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8f1a2d9b3'
+down_revision: Union[str, Sequence[str], None] = 'b7d4e2f8a1c6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LOCATION_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS bookings_location_fts USING fts5("
+    "location, content='bookings', content_rowid='rowid', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS bookings_location_fts_ai AFTER INSERT ON bookings BEGIN "
+    "INSERT INTO bookings_location_fts(rowid, location) VALUES (new.rowid, new.location); END",
+    "CREATE TRIGGER IF NOT EXISTS bookings_location_fts_ad AFTER DELETE ON bookings BEGIN "
+    "INSERT INTO bookings_location_fts(bookings_location_fts, rowid, location) "
+    "VALUES ('delete', old.rowid, old.location); END",
+    "CREATE TRIGGER IF NOT EXISTS bookings_location_fts_au AFTER UPDATE OF location ON bookings BEGIN "
+    "INSERT INTO bookings_location_fts(bookings_location_fts, rowid, location) "
+    "VALUES ('delete', old.rowid, old.location); "
+    "INSERT INTO bookings_location_fts(rowid, location) VALUES (new.rowid, new.location); END",
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    # Build indexes without blocking writes on PostgreSQL (CONCURRENTLY cannot run in a transaction)
+    with op.get_context().autocommit_block():
+        op.create_index('ix_bookings_event_type_event_date', 'bookings', ['event_type', 'event_date'], unique=False,
+                        postgresql_concurrently=True)
+        op.create_index('ix_bookings_total_price', 'bookings', ['total_price'], unique=False,
+                        postgresql_concurrently=True)
+        if dialect == 'postgresql':
+            op.create_index('ix_bookings_location_trgm', 'bookings', ['location'], unique=False,
+                            postgresql_using='gin', postgresql_ops={'location': 'gin_trgm_ops'},
+                            postgresql_concurrently=True)
+
+    if dialect == 'sqlite':
+        for statement in LOCATION_FTS_DDL:
+            op.execute(statement)
+        # Index the bookings that already exist
+        op.execute("INSERT INTO bookings_location_fts(bookings_location_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for trigger in ('bookings_location_fts_ai', 'bookings_location_fts_ad', 'bookings_location_fts_au'):
+            op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        op.execute('DROP TABLE IF EXISTS bookings_location_fts')
+    if dialect == 'postgresql':
+        op.drop_index('ix_bookings_location_trgm', table_name='bookings')
+    op.drop_index('ix_bookings_total_price', table_name='bookings')
+    op.drop_index('ix_bookings_event_type_event_date', table_name='bookings')
@@ -0,0 +1,38 @@
+"""Add backfill checkpoints table
+
+Revision ID: c9e4a7b2d6f1
+Revises: b3e7a1d9c5f2
+Create Date: 2026-10-19 22:17:40.381266
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9e4a7b2d6f1'
+down_revision: Union[str, Sequence[str], None] = 'b3e7a1d9c5f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('backfill_checkpoints',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('table_name', sa.String(length=100), nullable=False),
+    sa.Column('last_key', sa.String(length=64), nullable=True),
+    sa.Column('rows_visited', sa.BigInteger(), nullable=False),
+    sa.Column('rows_updated', sa.BigInteger(), nullable=False),
+    sa.Column('batches', sa.Integer(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('backfill_checkpoints')
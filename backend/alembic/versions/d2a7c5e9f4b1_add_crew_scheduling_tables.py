@@ -0,0 +1,63 @@
+"""Add staff and crew assignment tables
+
+Revision ID: d2a7c5e9f4b1
+Revises: c4e8f1a2d9b3
+Create Date: 2026-10-19 16:05:37.528311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a7c5e9f4b1'
+down_revision: Union[str, Sequence[str], None] = 'c4e8f1a2d9b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('staff',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('full_name', sa.String(length=255), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('role', sa.Enum('PHOTOGRAPHER', 'VIDEOGRAPHER', name='staffrole'), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_staff_email'), 'staff', ['email'], unique=True)
+    op.create_index(op.f('ix_staff_id'), 'staff', ['id'], unique=False)
+    op.create_index(op.f('ix_staff_role'), 'staff', ['role'], unique=False)
+    op.create_table('crew_assignments',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('booking_id', sa.UUID(), nullable=False),
+    sa.Column('staff_id', sa.UUID(), nullable=False),
+    sa.Column('role', postgresql.ENUM('PHOTOGRAPHER', 'VIDEOGRAPHER', name='staffrole', create_type=False), nullable=False),
+    sa.Column('starts_at', sa.DateTime(), nullable=False),
+    sa.Column('ends_at', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['booking_id'], ['bookings.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['staff_id'], ['staff.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('booking_id', 'staff_id', name='uq_crew_assignments_booking_staff')
+    )
+    op.create_index(op.f('ix_crew_assignments_booking_id'), 'crew_assignments', ['booking_id'], unique=False)
+    op.create_index(op.f('ix_crew_assignments_id'), 'crew_assignments', ['id'], unique=False)
+    op.create_index('ix_crew_assignments_staff_starts_at', 'crew_assignments', ['staff_id', 'starts_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_crew_assignments_staff_starts_at', table_name='crew_assignments')
+    op.drop_index(op.f('ix_crew_assignments_id'), table_name='crew_assignments')
+    op.drop_index(op.f('ix_crew_assignments_booking_id'), table_name='crew_assignments')
+    op.drop_table('crew_assignments')
+    op.drop_index(op.f('ix_staff_role'), table_name='staff')
+    op.drop_index(op.f('ix_staff_id'), table_name='staff')
+    op.drop_index(op.f('ix_staff_email'), table_name='staff')
+    op.drop_table('staff')
+    sa.Enum(name='staffrole').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,40 @@
+"""Add user booking summary table
+
+Revision ID: e5b9d3f7a2c8
+Revises: d2a7c5e9f4b1
+Create Date: 2026-10-19 18:42:11.204517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b9d3f7a2c8'
+down_revision: Union[str, Sequence[str], None] = 'd2a7c5e9f4b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    The table starts empty; fill it with ``python -m scripts.check_booking_summary``.
+    """
+    op.create_table('user_booking_summary',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('booking_count', sa.Integer(), nullable=False),
+    sa.Column('total_spent', sa.DECIMAL(precision=12, scale=2), nullable=False),
+    sa.Column('upcoming_booking_id', sa.UUID(), nullable=True),
+    sa.Column('upcoming_event_date', sa.Date(), nullable=True),
+    sa.Column('last_delivery_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_booking_summary')
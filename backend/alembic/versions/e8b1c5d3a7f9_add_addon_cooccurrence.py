@@ -0,0 +1,37 @@
+"""Add addon co-occurrence table
+
+Revision ID: e8b1c5d3a7f9
+Revises: c9e4a7b2d6f1
+Create Date: 2026-10-19 23:02:11.507384
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b1c5d3a7f9'
+down_revision: Union[str, Sequence[str], None] = 'c9e4a7b2d6f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    The table starts empty; fill it with ``python -m scripts.rebuild_recommendations``.
+    """
+    op.create_table('addon_cooccurrence',
+    sa.Column('source_type', sa.String(length=10), nullable=False),
+    sa.Column('source_id', sa.UUID(), nullable=False),
+    sa.Column('addon_id', sa.UUID(), nullable=False),
+    sa.Column('together_count', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('source_type', 'source_id', 'addon_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('addon_cooccurrence')
@@ -0,0 +1,34 @@
+"""Add package stats table
+
+Revision ID: f1c6a8e3b5d0
+Revises: e5b9d3f7a2c8
+Create Date: 2026-10-19 19:27:48.613092
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c6a8e3b5d0'
+down_revision: Union[str, Sequence[str], None] = 'e5b9d3f7a2c8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('package_stats',
+    sa.Column('package_id', sa.UUID(), nullable=False),
+    sa.Column('view_count', sa.BigInteger(), nullable=False),
+    sa.Column('quote_count', sa.BigInteger(), nullable=False),
+    sa.Column('booking_count', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('package_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('package_stats')
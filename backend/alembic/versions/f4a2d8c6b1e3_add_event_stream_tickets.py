@@ -0,0 +1,34 @@
+"""Add event stream tickets table
+
+Revision ID: f4a2d8c6b1e3
+Revises: e8b1c5d3a7f9
+Create Date: 2026-10-19 23:26:48.112907
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4a2d8c6b1e3'
+down_revision: Union[str, Sequence[str], None] = 'e8b1c5d3a7f9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('event_stream_tickets',
+    sa.Column('ticket_hash', sa.String(length=64), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('ticket_hash')
+    )
+    op.create_index(op.f('ix_event_stream_tickets_expires_at'), 'event_stream_tickets', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_event_stream_tickets_expires_at'), table_name='event_stream_tickets')
+    op.drop_table('event_stream_tickets')
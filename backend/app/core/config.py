@@ -15,6 +15,29 @@ class Settings(BaseSettings):
 
     # Database (defaults to SQLite for local development)
     DATABASE_URL: str = "sqlite:///./photobooking.db"
+    # Startup schema handling: "verify" (Alembic revision must be head, on every dialect),
+    # "create" (create_all; opt in explicitly for local development and tests), or "skip"
+    DB_SCHEMA_STRATEGY: str = "verify"
+    POOL_PREWARM_CONNECTIONS: int = 2
+    # SQLite writes: "direct" (each session writes on its own connection) or "queue" (commits go
+    # through one writer thread that group-commits them; reads stay concurrent under WAL).
+    # The queue is not used when DATABASE_SHARD_URLS is set.
+    SQLITE_WRITE_MODE: str = "direct"
+    WRITE_QUEUE_MAX_BATCH: int = 64  # Transactions committed together by the writer
+    WRITE_QUEUE_TIMEOUT_SECONDS: float = 30.0  # Longest wait for a queued commit to start
+
+    # Read replicas (comma-separated URLs; empty means all reads use DATABASE_URL).
+    # Locally, two SQLite files work: copy photobooking.db and point a replica URL at the copy.
+    DATABASE_REPLICA_URLS: str = ""
+    REPLICA_STRATEGY: str = "least_loaded"  # or "round_robin"
+    READ_YOUR_WRITES_SECONDS: float = 5.0
+    READ_PIN_MAX_KEYS: int = 100000
+
+    # Shards for per-user booking data (comma-separated URLs; empty means everything on DATABASE_URL).
+    # bookings, booking_addons, deliveries, summaries and archives are placed by user_id; users,
+    # packages, add-ons and staff stay on DATABASE_URL. Locally: sqlite:///./shard0.db,sqlite:///./shard1.db
+    DATABASE_SHARD_URLS: str = ""
+    SHARD_FANOUT_WORKERS: int = 16  # Threads querying shards in parallel for admin-wide lists
 
     # JWT
     SECRET_KEY: str = "dev-secret-key-change-in-production-09a8f7b6c5d4e3f2a1b0"
@@ -24,11 +47,118 @@ class Settings(BaseSettings):
     # CORS
     ALLOWED_ORIGINS: str = "http://localhost:5173,http://localhost:3000"
 
+    # Idempotency keys (POST /bookings/, POST /auth/register)
+    IDEMPOTENCY_TTL_SECONDS: int = 24 * 60 * 60
+    IDEMPOTENCY_MAX_ENTRIES: int = 10000
+    IDEMPOTENCY_WAIT_TIMEOUT_SECONDS: float = 30.0
+
+    # Auth rate limiting (token buckets per client IP and per email)
+    AUTH_RATE_LIMIT_IP_CAPACITY: int = 20
+    AUTH_RATE_LIMIT_IP_REFILL_PER_MINUTE: float = 10.0
+    AUTH_RATE_LIMIT_EMAIL_CAPACITY: int = 5
+    AUTH_RATE_LIMIT_EMAIL_REFILL_PER_MINUTE: float = 2.0
+    RATE_LIMIT_MAX_KEYS: int = 100000
+
+    # Admission control for password hashing
+    AUTH_MAX_PENDING_HASHES: int = 32
+    AUTH_SHED_RETRY_AFTER_SECONDS: int = 1
+
+    # List responses
+    MAX_PAGE_SIZE: int = 500  # Upper bound for `limit` unless stream=true
+    STREAM_CHUNK_SIZE: int = 500  # Rows fetched and flushed per chunk when streaming
+    BATCH_MAX_IDS: int = 100  # IDs per multi-ID GET (/bookings?ids=, /delivery?booking_ids=)
+    COUNT_CACHE_TTL_SECONDS: float = 30.0  # Exact totals (with_total=true) are cached per filter combination
+    COUNT_CACHE_MAX_ENTRIES: int = 10000
+    COUNT_ESTIMATE_MIN_ROWS: int = 100000  # Unfiltered tables at least this large report planner estimates
+
+    # Price quotes
+    QUOTE_MAX_ITEMS: int = 5000  # Candidate combinations per POST /bookings/quote
+    ADDON_MAX_QUANTITY: int = 100  # Per add-on line in bookings and quotes (keeps cent totals within int64)
+    PRICE_TABLE_TTL_SECONDS: int = 60  # Rebuild even without local changes (other workers)
+
+    # Archival of finished bookings (completed/rejected) into *_archive tables
+    ARCHIVE_AFTER_DAYS: int = 365
+    ARCHIVE_BATCH_SIZE: int = 500
+    ARCHIVE_BATCH_PAUSE_SECONDS: float = 0.1
+
+    # Batched backfills in data migrations (app.services.backfill)
+    BACKFILL_BATCH_SIZE: int = 1000  # Rows per transaction
+    BACKFILL_PAUSE_SECONDS: float = 0.05  # Minimum sleep between batches
+    BACKFILL_DUTY_CYCLE: float = 0.5  # Most of the wall time spent in batches; slow batches sleep longer
+
+    # Package popularity counters (in memory per worker, flushed to package_stats)
+    POPULARITY_FLUSH_SECONDS: float = 10.0  # Most counts a crashed worker can lose
+    POPULARITY_SHARDS: int = 16  # Independently locked counter shards
+
+    # Demand-based date pricing (package price x per-date multiplier)
+    DEMAND_WINDOW_DAYS: int = 3  # Days either side averaged into a date's booking density
+    DEMAND_HORIZON_DAYS: int = 730  # Dates from today with a multiplier (later dates use 1.00)
+    DEMAND_SENSITIVITY: float = 0.5  # Multiplier change per unit of density relative to the average
+    DEMAND_MIN_MULTIPLIER: float = 0.9
+    DEMAND_MAX_MULTIPLIER: float = 1.5
+    DEMAND_PRIOR_BOOKINGS: float = 5.0  # Pseudo-bookings added to every window, pulling sparse dates toward 1.00
+    DEMAND_MIN_BOOKINGS: int = 20  # Bookings within the horizon before any date leaves 1.00
+    DEMAND_QUOTE_TOLERANCE: float = 0.05  # Largest gap between a quoted and the current multiplier honoured at booking
+    DEMAND_QUOTE_TTL_SECONDS: int = 900  # Lifetime of a quote token
+    DEMAND_REFRESH_SECONDS: float = 300.0  # Full recount (other workers' bookings, day rollover)
+    AVAILABILITY_MAX_DAYS: int = 92  # Longest date range per availability request
+
+    # Booking coordinates (/bookings/nearby, /bookings/route-clusters)
+    GEO_MAX_RADIUS_KM: float = 200.0  # Largest radius per nearby search
+    ROUTE_CLUSTER_DISTANCE_KM: float = 15.0  # Default linking distance for same-day clusters
+
+    # Add-on recommendations (GET /packages/{id}/recommended-addons)
+    RECOMMENDATIONS_TOP_K: int = 10  # Add-ons stored per package and per add-on
+    RECOMMENDATIONS_MIN_SUPPORT: int = 2  # Bookings an add-on must share with the source
+    RECOMMENDATIONS_FLUSH_SECONDS: float = 5.0  # Adds new bookings to the shared counts and re-ranks what they touch
+
+    # Per-user booking summaries (GET /users/me/summary)
+    SUMMARY_CHECK_BATCH_SIZE: int = 500  # Users recounted per transaction by scripts/check_booking_summary.py
+
+    # Server-sent events (/events/stream)
+    EVENTS_HEARTBEAT_SECONDS: float = 15.0  # Comment line sent on idle connections
+    EVENTS_REPLAY_BUFFER_SIZE: int = 1000  # Recent events kept for Last-Event-ID resume
+    EVENTS_SUBSCRIBER_QUEUE_SIZE: int = 100  # Undelivered events per connection before resync
+    EVENTS_RETRY_MILLISECONDS: int = 3000  # Reconnect delay suggested to clients
+    EVENTS_TICKET_SECONDS: int = 30  # Lifetime of a single-use stream ticket
+
+    # Crew scheduling
+    CREW_DEFAULT_DURATION_HOURS: int = 4  # For packages without a duration
+    CREW_BUFFER_MINUTES: int = 60  # Travel/setup time kept free after each assignment
+    CREW_MAX_WINDOW_DAYS: int = 92  # Longest date window for auto-assignment
+
+    # Traffic capture for scripts/replay_traffic.py (off unless a path is set)
+    TRAFFIC_CAPTURE_PATH: str = ""  # NDJSON file sanitized request traces are appended to
+    TRAFFIC_CAPTURE_SAMPLE_RATE: float = 1.0  # Fraction of requests recorded
+    TRAFFIC_CAPTURE_MAX_BODY_BYTES: int = 65536  # Larger bodies are recorded by size only
+
+    # Request profiling (X-Profile header from admins, PROFILE_ROUTES, or at random)
+    PROFILE_SAMPLE_RATE: float = 0.0  # Fraction of requests profiled at random
+    PROFILE_ROUTES: str = ""  # Comma-separated "METHOD /route/{template}" entries always profiled
+    PROFILE_INTERVAL_MS: float = 5.0  # Time between stack samples
+    PROFILE_MAX_STORED: int = 50  # Recent profiles kept per worker for download
+    PROFILE_MAX_SAMPLES: int = 20000  # Stack samples kept per profile
+
+    # Response compression (gzip, or brotli when installed)
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
     @property
     def cors_origins(self) -> List[str]:
         """Parse CORS origins from comma-separated string."""
         return [origin.strip() for origin in self.ALLOWED_ORIGINS.split(",")]
 
+    @property
+    def replica_urls(self) -> List[str]:
+        """Parse read-replica URLs from comma-separated string."""
+        return [url.strip() for url in self.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+
+    @property
+    def shard_urls(self) -> List[str]:
+        """Parse shard URLs from comma-separated string."""
+        return [url.strip() for url in self.DATABASE_SHARD_URLS.split(",") if url.strip()]
+
     class Config:
         env_file = ".env"
         case_sensitive = True
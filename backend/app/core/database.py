@@ -1,10 +1,26 @@
 """
 Database connection and session management.
+
+Writes go to the primary ``engine``. When DATABASE_REPLICA_URLS is set, GET
+handlers read through ``get_read_db``, which picks a replica and falls back
+to the primary for callers that wrote recently (read-your-writes). With
+DATABASE_SHARD_URLS set, per-user booking tables are routed to shards by
+``shard_router`` (see app.core.sharding). On unsharded SQLite with
+SQLITE_WRITE_MODE = "queue", session commits go through ``write_queue``.
 """
-from sqlalchemy import create_engine
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, List, Optional
+
+from fastapi import Request
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from .config import settings
+from .security import decode_access_token
+from .sharding import ShardRouter, ShardRoutingSession
+from .write_queue import QueuedSession, WriteQueue
 
 # Create database engine
 engine = create_engine(
@@ -13,28 +29,199 @@ engine = create_engine(
     echo=settings.DEBUG   # Log SQL queries in debug mode
 )
 
+# Per-user booking tables on DATABASE_SHARD_URLS (one shard, the primary, when unset)
+shard_router = ShardRouter(engine, settings.shard_urls, fanout_workers=settings.SHARD_FANOUT_WORKERS)
+routing_options = {"class_": ShardRoutingSession, "shard_router": shard_router} if shard_router.sharded else {}
+
+# Single-writer group commit for SQLite (see app.core.write_queue)
+write_queue: Optional[WriteQueue] = None
+session_options = routing_options
+if not shard_router.sharded and settings.SQLITE_WRITE_MODE == "queue" and engine.dialect.name == "sqlite":
+    write_queue = WriteQueue(
+        engine,
+        max_batch=settings.WRITE_QUEUE_MAX_BATCH,
+        timeout_seconds=settings.WRITE_QUEUE_TIMEOUT_SECONDS,
+    )
+    session_options = {"class_": QueuedSession, "write_queue": write_queue}
+
+    @event.listens_for(engine, "connect")
+    def _enable_wal(dbapi_connection, connection_record):
+        # Readers never block the writer (or each other) under WAL
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.close()
+
 # Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, **session_options)
 
 # Base class for models
 Base = declarative_base()
 
 
-def get_db():
+class ReadOnlySessionError(RuntimeError):
+    """Raised when a replica session tries to flush changes."""
+
+
+class ReplicaRouter:
+    """
+    Chooses a read replica per request and tracks read-your-writes pins.
+
+    Replicas are picked by fewest in-flight sessions ("least_loaded") or in
+    turn ("round_robin"). Callers that committed on the primary are pinned
+    to it for ``pin_seconds`` so they never read their own writes stale.
+    """
+
+    def __init__(self, urls: List[str], strategy: str, pin_seconds: float, max_pins: int, session_options: dict):
+        self.engines = [
+            create_engine(url, pool_pre_ping=True, echo=settings.DEBUG)
+            for url in urls
+        ]
+        self.session_factories = [
+            sessionmaker(
+                autocommit=False, autoflush=False, bind=replica_engine, info={"read_only": True}, **session_options
+            )
+            for replica_engine in self.engines
+        ]
+        self.strategy = strategy
+        self.pin_seconds = pin_seconds
+        self.max_pins = max_pins
+        self.in_flight = [0] * len(self.engines)
+        self._next = 0
+        self._pins: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> int:
+        """Pick a replica index and count the session against it."""
+        with self._lock:
+            count = len(self.engines)
+            start = self._next
+            self._next = (self._next + 1) % count
+            if self.strategy == "round_robin":
+                index = start
+            else:
+                # Least loaded, ties broken in round-robin order
+                index = min(range(count), key=lambda i: (self.in_flight[i], (i - start) % count))
+            self.in_flight[index] += 1
+            return index
+
+    def release(self, index: int) -> None:
+        with self._lock:
+            self.in_flight[index] -= 1
+
+    def pin(self, identities: Iterable[str]) -> None:
+        """Route the given callers to the primary for the pin window."""
+        expires_at = time.monotonic() + self.pin_seconds
+        with self._lock:
+            for identity in identities:
+                self._pins[identity] = expires_at
+                self._pins.move_to_end(identity)
+            while len(self._pins) > self.max_pins:
+                self._pins.popitem(last=False)
+
+    def is_pinned(self, identities: Iterable[str]) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            for identity in identities:
+                expires_at = self._pins.get(identity)
+                if expires_at is None:
+                    continue
+                if expires_at > now:
+                    return True
+                del self._pins[identity]
+        return False
+
+
+replica_router = ReplicaRouter(
+    settings.replica_urls,
+    strategy=settings.REPLICA_STRATEGY,
+    pin_seconds=settings.READ_YOUR_WRITES_SECONDS,
+    max_pins=settings.READ_PIN_MAX_KEYS,
+    # Replicas serve the global tables; sharded tables are read from their shard
+    session_options=routing_options,
+)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _pin_writer_to_primary(session):
+    identities = session.info.get("identities")
+    if identities:
+        replica_router.pin(identities)
+
+
+@event.listens_for(Session, "before_flush")
+def _reject_replica_writes(session, flush_context, instances):
+    if session.info.get("read_only"):
+        raise ReadOnlySessionError("Cannot write through a read-replica session")
+
+
+def _request_identities(request: Optional[Request]) -> List[str]:
+    """Keys a caller is pinned under: the token's user and the client address."""
+    if request is None:
+        return []
+    identities = []
+    authorization = request.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        payload = decode_access_token(authorization[7:])
+        if payload and payload.get("user_id"):
+            identities.append(f"user:{payload['user_id']}")
+    if request.client:
+        identities.append(f"ip:{request.client.host}")
+    return identities
+
+
+def get_db(request: Request = None):
     """
     Dependency that provides a database session.
     Yields a session and ensures it's closed after use.
+
+    Sessions are bound to the primary; a commit pins the caller to the
+    primary for reads during the read-your-writes window.
     """
     db = SessionLocal()
+    if replica_router.engines:
+        db.info["identities"] = _request_identities(request)
     try:
         yield db
     finally:
         db.close()
 
 
+def get_read_db(request: Request = None):
+    """
+    Dependency that provides a read-only database session for GET handlers.
+
+    Uses a replica when DATABASE_REPLICA_URLS is configured and the caller is
+    not pinned to the primary, otherwise the primary.
+    """
+    if not replica_router.engines or replica_router.is_pinned(_request_identities(request)):
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+        return
+
+    index = replica_router.acquire()
+    db = replica_router.session_factories[index]()
+    try:
+        yield db
+    finally:
+        db.close()
+        replica_router.release(index)
+
+
+def sibling_session(db: Session) -> Session:
+    """Open a new session on the same engine (primary or replica) and shard as ``db``."""
+    if isinstance(db, ShardRoutingSession):
+        return shard_router.session(db.shard, db)
+    return Session(bind=db.get_bind(), autoflush=False, info={"read_only": db.info.get("read_only", False)})
+
+
 def init_db():
     """
     Initialize database - create all tables.
-    Should be called on application startup.
+    Used by seed_data.py and on startup when DB_SCHEMA_STRATEGY is "create";
+    production schemas are managed by Alembic. With shards, the per-user
+    tables are created on every shard and the rest on the primary.
     """
-    Base.metadata.create_all(bind=engine)
+    shard_router.create_tables(Base.metadata)
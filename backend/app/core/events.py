@@ -0,0 +1,206 @@
+"""
+In-process pub/sub for server-sent events.
+
+Write handlers queue events on their session with ``publish_after_commit``;
+they reach the broker only once that transaction commits (and are dropped on
+rollback). The broker fans each event out to the owning user's subscribers
+and to admin subscribers, and keeps a bounded replay buffer so reconnecting
+clients can resume from ``Last-Event-ID``.
+
+The broker lives in one worker process. With several workers, a client only
+sees events from writes handled by the worker it is connected to; clients
+should treat events as hints to refetch, and a ``resync`` event as a signal
+that some may have been missed.
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .config import settings
+
+# Subscription key of admins, who receive every user's events
+ALL_USERS = "*"
+
+
+class ServerEvent(NamedTuple):
+    """One published event; ``data`` is already JSON-encoded."""
+    sequence: int
+    id: str
+    user_id: str
+    type: str
+    data: str
+
+
+class Subscription:
+    """A connected client: a bounded queue fed from any thread via its event loop."""
+
+    def __init__(self, key: str, loop: asyncio.AbstractEventLoop, queue_size: int):
+        self.key = key
+        self.loop = loop
+        self.queue: "asyncio.Queue[ServerEvent]" = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+    def deliver(self, server_event: ServerEvent) -> None:
+        try:
+            self.loop.call_soon_threadsafe(self._put, server_event)
+        except RuntimeError:
+            # Event loop already closed; the subscription is being torn down
+            pass
+
+    def _put(self, server_event: ServerEvent) -> None:
+        try:
+            self.queue.put_nowait(server_event)
+        except asyncio.QueueFull:
+            # Slow consumer: stop queueing, the stream tells it to resync
+            self.overflowed = True
+
+
+class EventBroker:
+    """
+    Per-user fan-out with a bounded, process-wide replay buffer.
+
+    Event IDs are ``<epoch>-<sequence>``; the epoch changes on every process
+    start, so IDs from another process (or before a restart) are recognised
+    as unresumable.
+    """
+
+    def __init__(self, replay_size: int, queue_size: int):
+        self.queue_size = queue_size
+        self.epoch = f"{int(time.time() * 1000):x}"
+        self._sequence = 0
+        self._buffer: Deque[ServerEvent] = deque(maxlen=replay_size)
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, user_id: Any, event_type: str, data: Dict[str, Any]) -> ServerEvent:
+        """
+        Publish an event to a user's subscribers and to admins (thread-safe).
+
+        Args:
+            user_id: Owner of the affected booking
+            event_type: Event name, e.g. "booking.updated"
+            data: JSON-serializable payload
+
+        Returns:
+            The published event
+        """
+        user_key = str(user_id)
+        payload = json.dumps(data, default=str)
+        with self._lock:
+            self._sequence += 1
+            sequence = self._sequence
+            server_event = ServerEvent(sequence, f"{self.epoch}-{sequence}", user_key, event_type, payload)
+            self._buffer.append(server_event)
+            targets = list(self._subscribers.get(user_key, ())) + list(self._subscribers.get(ALL_USERS, ()))
+        for subscription in targets:
+            subscription.deliver(server_event)
+        return server_event
+
+    def subscribe(
+        self,
+        user_id: Any,
+        is_admin: bool,
+        last_event_id: Optional[str] = None
+    ) -> Tuple[Subscription, List[ServerEvent], bool]:
+        """
+        Register a subscriber on the running event loop.
+
+        Registration and the replay snapshot happen under one lock, so no
+        event is both replayed and delivered live, and none falls in between.
+
+        Args:
+            user_id: Subscribing user
+            is_admin: Subscribe to every user's events
+            last_event_id: ``Last-Event-ID`` sent by a reconnecting client
+
+        Returns:
+            (subscription, events to replay, whether the client must resync)
+        """
+        key = ALL_USERS if is_admin else str(user_id)
+        subscription = Subscription(key, asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(key, set()).add(subscription)
+            if last_event_id is None:
+                return subscription, [], False
+            last_sequence = self._parse_id(last_event_id)
+            oldest = self._buffer[0].sequence if self._buffer else self._sequence + 1
+            if last_sequence is None or last_sequence > self._sequence or last_sequence < oldest - 1:
+                # Unknown ID or events already evicted: the client must refetch
+                return subscription, [], True
+            replay = [
+                server_event for server_event in self._buffer
+                if server_event.sequence > last_sequence and (is_admin or server_event.user_id == key)
+            ]
+        return subscription, replay, False
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.key)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.key]
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def _parse_id(self, last_event_id: str) -> Optional[int]:
+        """Sequence number of an ID from this process, or None if unresumable."""
+        epoch, _, sequence = last_event_id.strip().partition("-")
+        if epoch != self.epoch or not sequence.isdigit():
+            return None
+        return int(sequence)
+
+
+event_broker = EventBroker(
+    replay_size=settings.EVENTS_REPLAY_BUFFER_SIZE,
+    queue_size=settings.EVENTS_SUBSCRIBER_QUEUE_SIZE,
+)
+
+
+def publish_after_commit(db: Session, user_id: Any, event_type: str, data: Dict[str, Any]) -> None:
+    """
+    Queue an event on the session; it is published when the session commits.
+
+    Args:
+        db: Session of the write
+        user_id: Owner of the affected booking
+        event_type: Event name
+        data: JSON-serializable payload
+    """
+    db.info.setdefault("pending_events", []).append((user_id, event_type, data))
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending_events(session):
+    for user_id, event_type, data in session.info.pop("pending_events", ()):
+        event_broker.publish(user_id, event_type, data)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_events(session):
+    session.info.pop("pending_events", None)
+
+
+def format_sse(server_event: Optional[ServerEvent] = None, event_type: str = None, data: str = "{}") -> bytes:
+    """
+    Encode one SSE message.
+
+    Args:
+        server_event: Published event (carries its own id, type and data)
+        event_type: Type of an unnumbered control event, e.g. "resync"
+        data: Payload of a control event
+
+    Returns:
+        Encoded message, terminated by a blank line
+    """
+    if server_event is not None:
+        return f"id: {server_event.id}\nevent: {server_event.type}\ndata: {server_event.data}\n\n".encode("utf-8")
+    return f"event: {event_type}\ndata: {data}\n\n".encode("utf-8")
@@ -0,0 +1,256 @@
+"""
+Idempotency-Key support for retried POST requests.
+
+The first response for a (route, caller, key) triple is stored in memory and
+replayed for later requests carrying the same key, without running the
+handler again. Concurrent duplicates wait for the in-flight request instead
+of racing it.
+"""
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Tuple
+
+from starlette.datastructures import Headers
+
+from .config import settings
+from .security import decode_access_token
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+REPLAYED_HEADER = b"idempotent-replayed"
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyStoreFullError(RuntimeError):
+    """Raised when every stored entry belongs to a request still in progress."""
+
+
+class StoredResponse:
+    """A fully buffered response that can be replayed."""
+
+    def __init__(self, status: int, headers: List[Tuple[bytes, bytes]], body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+
+class IdempotencyEntry:
+    """State for one idempotency key: in flight until a response is stored."""
+
+    def __init__(self, fingerprint: str, expires_at: float):
+        self.fingerprint = fingerprint
+        self.expires_at = expires_at
+        self.response: Optional[StoredResponse] = None
+        self.done = asyncio.Event()
+
+
+class IdempotencyStore:
+    """
+    In-memory, TTL-bounded store of idempotent responses.
+
+    Entries are kept in insertion order, which is also expiry order because
+    every entry gets the same TTL, so eviction looks at the front. Only
+    completed entries are evicted: dropping one still in flight would let its
+    waiting duplicates run the handler again. A store full of in-flight
+    entries refuses new keys instead. The store is per process and must only
+    be used from the event loop.
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, IdempotencyEntry]" = OrderedDict()
+
+    def _evict(self, now: float) -> None:
+        # Completed entries to drop beyond the expired ones, leaving room for one new entry
+        excess = len(self._entries) - self.max_entries + 1
+        evicted = []
+        for key, entry in self._entries.items():
+            if entry.expires_at > now and len(evicted) >= excess:
+                break
+            if entry.response is not None:
+                evicted.append(key)
+        for key in evicted:
+            del self._entries[key]
+
+    def begin(self, key: tuple, fingerprint: str) -> Tuple[IdempotencyEntry, bool]:
+        """
+        Look up a key, creating an in-flight entry if it is new.
+
+        Args:
+            key: Store key (route, caller identity, idempotency key)
+            fingerprint: Hash of the request body
+
+        Returns:
+            The entry and whether the caller owns it (must run the handler)
+
+        Raises:
+            IdempotencyStoreFullError: If the key is new and the store is full of in-flight requests
+        """
+        now = time.monotonic()
+        self._evict(now)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            return entry, False
+
+        if len(self._entries) >= self.max_entries:
+            raise IdempotencyStoreFullError("Too many requests with an Idempotency-Key in progress")
+        entry = IdempotencyEntry(fingerprint, now + self.ttl_seconds)
+        self._entries[key] = entry
+        return entry, True
+
+    def complete(self, entry: IdempotencyEntry, response: StoredResponse) -> None:
+        """Store the response for an in-flight entry and release waiters."""
+        entry.response = response
+        entry.done.set()
+
+    def release(self, key: tuple, entry: IdempotencyEntry) -> None:
+        """Drop an in-flight entry without a response so the key can be retried."""
+        if self._entries.get(key) is entry:
+            del self._entries[key]
+        entry.done.set()
+
+
+idempotency_store = IdempotencyStore(
+    ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+    max_entries=settings.IDEMPOTENCY_MAX_ENTRIES,
+)
+
+
+def _caller_identity(headers: Headers, scope) -> str:
+    """Scope keys to the authenticated user, or to the client address."""
+    authorization = headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        payload = decode_access_token(authorization[7:])
+        if payload and payload.get("user_id"):
+            return f"user:{payload['user_id']}"
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+async def _send_json(send, status_code: int, detail: str) -> None:
+    body = json.dumps({"detail": detail}).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("latin-1")),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _replay(send, response: StoredResponse) -> None:
+    await send({
+        "type": "http.response.start",
+        "status": response.status,
+        "headers": response.headers + [(REPLAYED_HEADER, b"true")],
+    })
+    await send({"type": "http.response.body", "body": response.body})
+
+
+class IdempotencyMiddleware:
+    """
+    ASGI middleware honouring the ``Idempotency-Key`` header on selected POST routes.
+
+    Responses with a status below 500 are stored and replayed; server errors
+    and exceptions release the key so the client can retry. A new key that
+    finds the store full of in-flight requests gets a 503.
+    """
+
+    def __init__(self, app, paths: Iterable[str], store: IdempotencyStore = idempotency_store):
+        self.app = app
+        self.paths = frozenset(paths)
+        self.store = store
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        idempotency_key = headers.get(IDEMPOTENCY_HEADER)
+        if not idempotency_key:
+            await self.app(scope, receive, send)
+            return
+
+        if len(idempotency_key) > MAX_KEY_LENGTH:
+            await _send_json(send, 400, "Idempotency-Key is too long")
+            return
+
+        # Buffer the request body so it can be fingerprinted and re-sent
+        chunks = []
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunks.append(message.get("body", b""))
+            more_body = message.get("more_body", False)
+        body = b"".join(chunks)
+        fingerprint = hashlib.sha256(body).hexdigest()
+
+        key = (scope["path"], _caller_identity(headers, scope), idempotency_key)
+
+        while True:
+            try:
+                entry, is_owner = self.store.begin(key, fingerprint)
+            except IdempotencyStoreFullError:
+                await _send_json(send, 503, "Too many requests in progress, retry later")
+                return
+            if entry.fingerprint != fingerprint:
+                await _send_json(send, 422, "Idempotency-Key was already used with a different request body")
+                return
+            if is_owner:
+                break
+
+            try:
+                await asyncio.wait_for(entry.done.wait(), settings.IDEMPOTENCY_WAIT_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                await _send_json(send, 409, "A request with this Idempotency-Key is still in progress")
+                return
+
+            if entry.response is not None:
+                await _replay(send, entry.response)
+                return
+            # The original request failed and released the key; try to take it over
+
+        await self._run_and_store(scope, receive, send, body, key, entry)
+
+    async def _run_and_store(self, scope, receive, send, body: bytes, key: tuple, entry: IdempotencyEntry):
+        body_sent = False
+
+        async def replay_receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        status_code = 500
+        response_headers: List[Tuple[bytes, bytes]] = []
+        response_body = []
+
+        async def capture_send(message):
+            nonlocal status_code, response_headers
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                response_headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                response_body.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, capture_send)
+        except BaseException:
+            self.store.release(key, entry)
+            raise
+
+        if status_code >= 500:
+            self.store.release(key, entry)
+        else:
+            self.store.complete(entry, StoredResponse(status_code, response_headers, b"".join(response_body)))
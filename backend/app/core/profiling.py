@@ -0,0 +1,385 @@
+"""
+On-demand sampling profiler for individual requests.
+
+A request is profiled when it is picked by PROFILE_SAMPLE_RATE, matches one
+of PROFILE_ROUTES ("GET /bookings/search"), or carries the X-Profile header
+from an admin. While at least one profile is active a sampler thread reads
+the stacks of the threads working on it (``sys._current_frames``) every
+PROFILE_INTERVAL_MS; SQL statements executed for it are recorded as spans.
+
+A request runs on the event loop and, for sync dependencies and handlers,
+on thread-pool workers. The event loop thread is attached when the request
+starts and a worker is attached when it executes SQL on the request's
+behalf, which every authenticated handler does first. Idle threads are not
+sampled. With concurrent profiled requests, event-loop samples are shared
+between them.
+
+When nothing is profiled the cost per request is a header scan and, only if
+configured, a random draw and a route regex match.
+"""
+import asyncio
+import contextvars
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.routing import compile_path
+
+from .config import settings
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+# Innermost functions of a thread that is waiting for work rather than doing it
+IDLE_FUNCTIONS = frozenset({"select", "poll", "wait", "_worker", "get", "_wait_for_tstate_lock", "run_forever"})
+IDLE_MODULES = ("threading.py", "queue.py", "selectors.py", "_threads.py", "base_events.py")
+MAX_SQL_LENGTH = 1000
+
+Frame = Tuple[str, str, int]  # (function, file, first line)
+
+_active_profile: contextvars.ContextVar[Optional["RequestProfile"]] = contextvars.ContextVar(
+    "active_profile", default=None
+)
+
+
+class RequestProfile:
+    """Stack samples and SQL spans collected for one request."""
+
+    def __init__(self, method: str, path: str, trigger: str, max_samples: int):
+        self.id = uuid.uuid4().hex
+        self.method = method
+        self.path = path
+        self.route: Optional[str] = None
+        self.trigger = trigger
+        self.max_samples = max_samples
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self.duration_ms: Optional[float] = None
+        self.status: Optional[int] = None
+        self.threads: Dict[int, str] = {}
+        self.samples: List[Tuple[float, Tuple[Frame, ...]]] = []
+        self.sql_spans: List[Tuple[float, float, str]] = []
+        self._lock = threading.Lock()
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._started) * 1000
+
+    def attach_thread(self, thread_id: int, kind: str) -> None:
+        if thread_id not in self.threads:
+            with self._lock:
+                self.threads[thread_id] = kind
+
+    def add_sample(self, stack: Tuple[Frame, ...]) -> None:
+        if len(self.samples) < self.max_samples:
+            self.samples.append((self.elapsed_ms(), stack))
+
+    def add_sql_span(self, started_ms: float, duration_ms: float, statement: str) -> None:
+        with self._lock:
+            self.sql_spans.append((round(started_ms, 3), round(duration_ms, 3), statement[:MAX_SQL_LENGTH]))
+
+    def finish(self, status: int, route: Optional[str]) -> None:
+        self.duration_ms = round(self.elapsed_ms(), 3)
+        self.status = status
+        self.route = route
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "trigger": self.trigger,
+            "status": self.status,
+            "started_at": self.started_at,
+            "duration_ms": self.duration_ms,
+            "samples": len(self.samples),
+            "sql_statements": len(self.sql_spans),
+            "sql_ms": round(sum(duration for _, duration, _ in self.sql_spans), 3),
+        }
+
+    def collapsed_stacks(self) -> str:
+        """Brendan Gregg's collapsed format (``root;caller;callee count``), for flamegraph.pl and friends."""
+        counts = Counter(";".join(_frame_name(frame) for frame in stack) for _, stack in self.samples)
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(counts.items()))
+
+    def speedscope(self, interval_ms: float) -> dict:
+        """speedscope file: a sampled profile of the stacks and an evented profile of the SQL spans."""
+        frames: List[dict] = []
+        frame_index: Dict[Frame, int] = {}
+
+        def index_of(frame: Frame) -> int:
+            if frame not in frame_index:
+                frame_index[frame] = len(frames)
+                function, file_name, line = frame
+                frames.append({"name": function, "file": file_name, "line": line} if file_name else {"name": function})
+            return frame_index[frame]
+
+        samples = [[index_of(frame) for frame in stack] for _, stack in self.samples]
+        sql_events = []
+        for started_ms, duration_ms, statement in self.sql_spans:
+            sql_index = index_of((statement, "", 0))
+            sql_events.append({"type": "O", "frame": sql_index, "at": started_ms})
+            sql_events.append({"type": "C", "frame": sql_index, "at": round(started_ms + duration_ms, 3)})
+        end_value = self.duration_ms or self.elapsed_ms()
+        name = f"{self.method} {self.route or self.path}"
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "photobooking-profiler",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": f"{name} (stacks)",
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": end_value,
+                    "samples": samples,
+                    "weights": [interval_ms] * len(samples),
+                },
+                {
+                    "type": "evented",
+                    "name": f"{name} (SQL)",
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": end_value,
+                    "events": sql_events,
+                },
+            ],
+        }
+
+
+def _frame_name(frame: Frame) -> str:
+    function, file_name, line = frame
+    return f"{function} ({file_name}:{line})" if file_name else function
+
+
+_CWD = os.getcwd() + os.sep
+
+
+def _short_path(file_name: str) -> str:
+    """Path relative to site-packages or the working directory, to keep frames readable."""
+    marker = "site-packages" + os.sep
+    index = file_name.rfind(marker)
+    if index >= 0:
+        return file_name[index + len(marker):]
+    return file_name[len(_CWD):] if file_name.startswith(_CWD) else file_name
+
+
+def _stack(frame, kind: str) -> Optional[Tuple[Frame, ...]]:
+    """Root-first stack of a frame, or None if the thread is idle."""
+    code = frame.f_code
+    if code.co_name in IDLE_FUNCTIONS and code.co_filename.endswith(IDLE_MODULES):
+        return None
+    stack = []
+    while frame is not None:
+        # Functions are identified by their definition line so samples merge per function
+        code = frame.f_code
+        stack.append((code.co_name, _short_path(code.co_filename), code.co_firstlineno))
+        frame = frame.f_back
+    stack.append((kind, "", 0))
+    stack.reverse()
+    return tuple(stack)
+
+
+class Profiler:
+    """
+    Keeps recent profiles and runs the sampler thread while any are active.
+
+    Args:
+        interval_ms: Time between stack samples
+        max_profiles: Finished profiles kept for download (oldest dropped first)
+        max_samples: Samples kept per profile
+        sample_rate: Fraction of requests profiled at random
+        routes: "METHOD /route/{template}" entries profiled on every request
+    """
+
+    def __init__(self, interval_ms: float, max_profiles: int, max_samples: int, sample_rate: float, routes: Iterable[str]):
+        self.interval_ms = interval_ms
+        self.max_samples = max_samples
+        self.sample_rate = sample_rate
+        self.routes: List[str] = []
+        self._route_patterns: List[Tuple[str, object]] = []
+        self.set_routes(routes)
+        self._finished: "deque[RequestProfile]" = deque(maxlen=max_profiles)
+        self._active: Dict[str, RequestProfile] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def set_routes(self, routes: Iterable[str]) -> None:
+        entries = [" ".join(route.split()) for route in routes if route.strip()]
+        patterns = []
+        for entry in entries:
+            method, _, path = entry.partition(" ")
+            if not path:
+                raise ValueError(f"Expected 'METHOD /path', got {entry!r}")
+            patterns.append((method.upper(), compile_path(path)[0]))
+        self.routes = entries
+        self._route_patterns = patterns
+
+    def matches_route(self, method: str, path: str) -> bool:
+        return any(method == route_method and pattern.match(path) for route_method, pattern in self._route_patterns)
+
+    def start(self, method: str, path: str, trigger: str) -> RequestProfile:
+        profile = RequestProfile(method, path, trigger, self.max_samples)
+        with self._lock:
+            self._active[profile.id] = profile
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._sample_loop, name="request-profiler", daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+        return profile
+
+    def stop(self, profile: RequestProfile) -> None:
+        with self._lock:
+            self._active.pop(profile.id, None)
+            self._finished.append(profile)
+
+    def list(self) -> List[RequestProfile]:
+        with self._lock:
+            return list(reversed(self._finished))
+
+    def get(self, profile_id: str) -> Optional[RequestProfile]:
+        with self._lock:
+            for profile in self._finished:
+                if profile.id == profile_id:
+                    return profile
+        return None
+
+    def _sample_loop(self) -> None:
+        interval = self.interval_ms / 1000
+        own_id = threading.get_ident()
+        while True:
+            with self._lock:
+                active = list(self._active.values())
+                if not active:
+                    self._wakeup.clear()
+            if not active:
+                self._wakeup.wait()
+                continue
+
+            frames = sys._current_frames()
+            for profile in active:
+                for thread_id, kind in list(profile.threads.items()):
+                    frame = frames.get(thread_id)
+                    if frame is None or thread_id == own_id:
+                        continue
+                    stack = _stack(frame, kind)
+                    if stack is not None:
+                        profile.add_sample(stack)
+            del frames
+            time.sleep(interval)
+
+
+profiler = Profiler(
+    interval_ms=settings.PROFILE_INTERVAL_MS,
+    max_profiles=settings.PROFILE_MAX_STORED,
+    max_samples=settings.PROFILE_MAX_SAMPLES,
+    sample_rate=settings.PROFILE_SAMPLE_RATE,
+    routes=settings.PROFILE_ROUTES.split(","),
+)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_sql_span(conn, cursor, statement, parameters, context, executemany):
+    profile = _active_profile.get()
+    if profile is not None:
+        profile.attach_thread(threading.get_ident(), "worker")
+        conn.info.setdefault("profile_spans", []).append(profile.elapsed_ms())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _end_sql_span(conn, cursor, statement, parameters, context, executemany):
+    profile = _active_profile.get()
+    if profile is not None:
+        spans = conn.info.get("profile_spans")
+        if spans:
+            started_ms = spans.pop()
+            profile.add_sql_span(started_ms, profile.elapsed_ms() - started_ms, statement)
+
+
+def _is_admin_token(authorization: str) -> bool:
+    """Run the token through get_current_admin with a short-lived session."""
+    from fastapi import HTTPException
+    from fastapi.security import HTTPAuthorizationCredentials
+
+    from app.core.database import SessionLocal
+    from app.utils.dependencies import get_current_admin, get_current_user
+
+    if not authorization.lower().startswith("bearer "):
+        return False
+    db = SessionLocal()
+    try:
+        user = get_current_user(HTTPAuthorizationCredentials(scheme="Bearer", credentials=authorization[7:]), db)
+        get_current_admin(user)
+        return True
+    except HTTPException:
+        return False
+    finally:
+        db.close()
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that profiles requests picked by header, route or sample rate.
+
+    Profiled responses carry an ``X-Profile-Id`` header naming the profile
+    to download from ``/admin/profiles``.
+    """
+
+    def __init__(self, app, profiler: Profiler = profiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trigger = None
+        requested = False
+        authorization = ""
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                requested = value not in (b"", b"0", b"false")
+            elif name == b"authorization":
+                authorization = value.decode("latin-1")
+        if requested and await asyncio.to_thread(_is_admin_token, authorization):
+            trigger = "header"
+        elif self.profiler.routes and self.profiler.matches_route(scope["method"], scope["path"]):
+            trigger = "route"
+        elif self.profiler.sample_rate > 0 and random.random() < self.profiler.sample_rate:
+            trigger = "sample"
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile = self.profiler.start(scope["method"], scope["path"], trigger)
+        profile.attach_thread(threading.get_ident(), "event-loop")
+        token = _active_profile.set(profile)
+        status_code = 500
+
+        async def profiled_send(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message = dict(message, headers=list(message.get("headers", [])) + [
+                    (PROFILE_ID_HEADER, profile.id.encode("latin-1")),
+                ])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, profiled_send)
+        finally:
+            _active_profile.reset(token)
+            route = scope.get("route")
+            profile.finish(status_code, getattr(route, "path", None))
+            self.profiler.stop(profile)
@@ -0,0 +1,142 @@
+"""
+In-memory rate limiting and admission control.
+
+Token buckets are kept in an LRU-ordered dict, so lookups are O(1) and the
+number of tracked keys is bounded: idle keys fall off the cold end. All
+state is per process.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from contextlib import ExitStack
+from typing import Tuple
+
+from .config import settings
+
+
+class TokenBucketLimiter:
+    """
+    Token-bucket limiter keyed by an arbitrary string (IP, email, ...).
+
+    Each key holds up to ``capacity`` tokens and regains ``refill_per_second``
+    tokens per second. A request consumes one token.
+    """
+
+    def __init__(self, capacity: int, refill_per_second: float, max_keys: int):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key: str) -> float:
+        """
+        Consume one token for a key.
+
+        Args:
+            key: Bucket key
+
+        Returns:
+            0 if the request is allowed, otherwise seconds until a token is available
+        """
+        return hit_all((self, key))
+
+    def _refilled(self, key: str, now: float) -> list:
+        """Return the key's [tokens, updated_at] bucket topped up to ``now`` (caller holds the lock)."""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = [float(self.capacity), now]
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            elapsed = now - bucket[1]
+            bucket[0] = min(self.capacity, bucket[0] + elapsed * self.refill_per_second)
+            bucket[1] = now
+        return bucket
+
+    def _wait(self, bucket: list) -> float:
+        """Seconds until the bucket holds a whole token (0 if it does)."""
+        if bucket[0] >= 1:
+            return 0.0
+        return (1 - bucket[0]) / self.refill_per_second
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class AdmissionController:
+    """
+    Caps the number of requests waiting for or running an expensive step.
+
+    Requests beyond ``max_pending`` are rejected immediately instead of
+    queueing behind the thread pool.
+    """
+
+    def __init__(self, max_pending: int):
+        self.max_pending = max_pending
+        self.pending = 0
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        """Take a slot if the queue is below its configured depth."""
+        with self._lock:
+            if self.pending >= self.max_pending:
+                return False
+            self.pending += 1
+            return True
+
+    def release(self) -> None:
+        """Return a slot taken with ``try_acquire``."""
+        with self._lock:
+            self.pending -= 1
+
+
+def hit_all(*hits: Tuple[TokenBucketLimiter, str]) -> float:
+    """
+    Consume one token from each (limiter, key) bucket, only if all of them have one.
+
+    Every bucket is checked before any is debited, so a request rejected by
+    one limiter does not use up the caller's allowance in the others.
+
+    Args:
+        hits: (limiter, key) pairs
+
+    Returns:
+        0 if the request is allowed, otherwise the longest wait in seconds
+        (nothing was consumed)
+    """
+    now = time.monotonic()
+    limiters = list({id(limiter): limiter for limiter, _ in hits}.values())
+    with ExitStack() as stack:
+        # Taken in one global order so concurrent callers cannot deadlock
+        for limiter in sorted(limiters, key=id):
+            stack.enter_context(limiter._lock)
+        buckets = [limiter._refilled(key, now) for limiter, key in hits]
+        retry_after = max(limiter._wait(bucket) for (limiter, _), bucket in zip(hits, buckets))
+        if retry_after:
+            return retry_after
+        for bucket in buckets:
+            bucket[0] -= 1
+        return 0.0
+
+
+def retry_after_header(seconds: float) -> str:
+    """Format a wait time for the ``Retry-After`` header (whole seconds, at least 1)."""
+    return str(max(1, math.ceil(seconds)))
+
+
+# Auth limiters shared by /auth/login and /auth/register
+auth_ip_limiter = TokenBucketLimiter(
+    capacity=settings.AUTH_RATE_LIMIT_IP_CAPACITY,
+    refill_per_second=settings.AUTH_RATE_LIMIT_IP_REFILL_PER_MINUTE / 60,
+    max_keys=settings.RATE_LIMIT_MAX_KEYS,
+)
+auth_email_limiter = TokenBucketLimiter(
+    capacity=settings.AUTH_RATE_LIMIT_EMAIL_CAPACITY,
+    refill_per_second=settings.AUTH_RATE_LIMIT_EMAIL_REFILL_PER_MINUTE / 60,
+    max_keys=settings.RATE_LIMIT_MAX_KEYS,
+)
+password_hash_admission = AdmissionController(max_pending=settings.AUTH_MAX_PENDING_HASHES)
@@ -0,0 +1,277 @@
+"""
+Horizontal sharding of per-user booking data (DATABASE_SHARD_URLS).
+
+``bookings``, ``booking_addons`` and ``deliveries`` live on one of N shard
+databases, picked by the booking owner's user ID, together with the tables
+written in the same transactions as them: ``user_booking_summary`` and the
+archive tables. ``users``, ``packages``, ``addons`` and the other catalog
+and scheduling tables stay global on DATABASE_URL.
+
+Sessions are ``ShardRoutingSession``s. Statements on global tables use the
+session's own bind (primary or replica); statements on sharded tables go to
+the shard the session was routed to with ``shard_router.route(db, user_id)``.
+A session is routed once, and touching a sharded table before routing
+raises ``ShardRoutingError`` instead of guessing. Booking IDs are generated
+to hash to their owner's shard, so a booking ID alone routes a lookup.
+
+Admin-wide lists ``scatter`` the query: each shard gets a session of its
+own and the shards are queried in parallel. Their results, already in list
+order, are combined with a k-way merge (``heapq.merge``), so a page costs
+one bounded query per shard and no sort of the whole result.
+
+A key's shard is ``key.int % number of shards``. Changing the number of
+shards therefore means moving rows (``python -m scripts.split_shards``).
+Without DATABASE_SHARD_URLS there is one shard, the primary, and routing is
+a no-op.
+"""
+import heapq
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+from operator import itemgetter
+from typing import Callable, Iterator, List, Optional, Sequence, TypeVar
+from uuid import UUID
+
+from sqlalchemy import MetaData, create_engine
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Query, Session
+from sqlalchemy.sql import visitors
+from sqlalchemy.sql.expression import TableClause
+
+# Per-user tables; everything else is global
+SHARDED_TABLES = frozenset({
+    "bookings",
+    "booking_addons",
+    "deliveries",
+    "user_booking_summary",
+    "bookings_archive",
+    "booking_addons_archive",
+    "deliveries_archive",
+})
+
+T = TypeVar("T")
+
+
+class ShardRoutingError(RuntimeError):
+    """Raised when a session uses sharded tables without (or across) a shard."""
+
+
+def _is_sharded(mapper, clause) -> bool:
+    if mapper is not None:
+        table = getattr(mapper, "local_table", None)
+        if table is None:
+            table = getattr(mapper, "__table__", None)
+        return table is not None and table.name in SHARDED_TABLES
+    if clause is not None:
+        # Tables named anywhere in the statement, including through columns only (implicit FROMs)
+        for element in visitors.iterate(clause):
+            table = element if isinstance(element, TableClause) else getattr(element, "table", None)
+            if isinstance(table, TableClause) and table.name in SHARDED_TABLES:
+                return True
+    return False
+
+
+class ShardRoutingSession(Session):
+    """
+    Session that sends sharded tables to its shard and everything else to its bind.
+
+    Sessions opened by ``ShardRouter.scatter`` for this one are closed with it.
+    """
+
+    def __init__(self, *args, shard_router: "ShardRouter" = None, shard: Optional[int] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.shard_router = shard_router
+        self.shard = shard
+
+    def use_shard(self, shard: int) -> None:
+        """
+        Route sharded tables to ``shard``.
+
+        Raises:
+            ShardRoutingError: If the session already holds rows of another shard
+        """
+        if self.shard == shard:
+            return
+        if self.shard is not None and any(
+            instance.__table__.name in SHARDED_TABLES
+            for instance in list(self.identity_map.values()) + list(self.new)
+        ):
+            raise ShardRoutingError(f"Session already holds rows of shard {self.shard}")
+        self.shard = shard
+
+    # ORM statements that select no entity (``select(literal(1)).where(Booking.id == ...)``)
+    # reach get_bind with neither mapper nor clause, so the statement is passed along
+    def execute(self, statement, params=None, *, bind_arguments=None, **kwargs):
+        return super().execute(statement, params, bind_arguments={"clause": statement, **(bind_arguments or {})}, **kwargs)
+
+    def scalar(self, statement, params=None, *, bind_arguments=None, **kwargs):
+        return super().scalar(statement, params, bind_arguments={"clause": statement, **(bind_arguments or {})}, **kwargs)
+
+    def scalars(self, statement, params=None, *, bind_arguments=None, **kwargs):
+        return super().scalars(statement, params, bind_arguments={"clause": statement, **(bind_arguments or {})}, **kwargs)
+
+    def get_bind(self, mapper=None, *, clause=None, **kwargs):
+        if _is_sharded(mapper, clause):
+            if self.shard is None:
+                raise ShardRoutingError(
+                    "Sharded table used before the session was routed (shard_router.route or scatter)"
+                )
+            return self.shard_router.engines[self.shard]
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+    def close(self) -> None:
+        for session in self.info.pop("shard_sessions", ()):
+            session.close()
+        super().close()
+
+
+class ShardRouter:
+    """
+    Shard engines, key to shard routing, and parallel scatter-gather.
+
+    Args:
+        primary: Engine of the global tables (DATABASE_URL)
+        urls: Shard URLs; the primary's URL may be one of them
+        fanout_workers: Threads querying shards in parallel (shared by all requests)
+    """
+
+    def __init__(self, primary: Engine, urls: List[str], fanout_workers: int):
+        self.primary = primary
+        self.sharded = bool(urls)
+        self.engines = [
+            primary if make_url(url) == primary.url else create_engine(url, pool_pre_ping=True, echo=primary.echo)
+            for url in urls
+        ] or [primary]
+        self._executor = (
+            ThreadPoolExecutor(max_workers=fanout_workers, thread_name_prefix="shard-fanout")
+            if self.sharded else None
+        )
+
+    @property
+    def count(self) -> int:
+        return len(self.engines)
+
+    def shard_of(self, key: UUID) -> int:
+        """Shard of a user ID (or of a booking ID, see ``new_id``)."""
+        if not isinstance(key, UUID):
+            key = UUID(str(key))
+        return key.int % len(self.engines)
+
+    def new_id(self, owner_id: UUID) -> UUID:
+        """A new random UUID that hashes to the same shard as ``owner_id``."""
+        shard = self.shard_of(owner_id)
+        while True:
+            candidate = uuid.uuid4()
+            if candidate.int % len(self.engines) == shard:
+                return candidate
+
+    def use_shard(self, db: Session, shard: int) -> None:
+        """Route ``db`` to a shard (no-op without sharding)."""
+        if self.sharded:
+            db.use_shard(shard)
+
+    def route(self, db: Session, key: UUID) -> None:
+        """Route ``db`` to the shard of a user ID or booking ID (no-op without sharding)."""
+        if self.sharded:
+            db.use_shard(self.shard_of(key))
+
+    def session(self, shard: int, db: Optional[Session] = None) -> ShardRoutingSession:
+        """New session on ``shard``; its global tables use ``db``'s bind (primary or replica)."""
+        return ShardRoutingSession(
+            bind=db.get_bind() if db is not None else self.primary,
+            autoflush=False,
+            shard_router=self,
+            shard=shard,
+            info={"read_only": db.info.get("read_only", False)} if db is not None else {},
+        )
+
+    @contextmanager
+    def shard_sessions(self, session_factory: Callable[[], Session]) -> Iterator[List[Session]]:
+        """One session per shard from ``session_factory`` (a single one without sharding), closed on exit."""
+        sessions = []
+        try:
+            for shard in range(self.count):
+                session = session_factory()
+                sessions.append(session)
+                self.use_shard(session, shard)
+            yield sessions
+        finally:
+            for session in sessions:
+                session.close()
+
+    def scatter(self, db: Session, work: Callable[[Session], T], shards: Optional[Sequence[int]] = None) -> List[T]:
+        """
+        Run ``work(session)`` on every shard (or the given ones) in parallel.
+
+        Each shard gets a session of its own that is closed with ``db``, so
+        rows it returns can still lazy-load while the response is built.
+        Without sharding ``work`` runs once, on ``db`` itself.
+
+        Args:
+            db: The caller's session
+            work: Query to run; must not scatter again
+            shards: Shards to ask (all by default)
+
+        Returns:
+            One result per shard, in shard order
+        """
+        if not self.sharded:
+            return [work(db)]
+        shards = range(self.count) if shards is None else shards
+        sessions = [self.session(shard, db) for shard in shards]
+        db.info.setdefault("shard_sessions", []).extend(sessions)
+        if len(sessions) == 1:
+            return [work(sessions[0])]
+        futures = [self._executor.submit(work, session) for session in sessions]
+        return [future.result() for future in futures]
+
+    def gather_page(
+        self,
+        db: Session,
+        build_query: Callable[[Session], Query],
+        order_by,
+        descending: bool,
+        skip: int,
+        limit: int,
+        shards: Optional[Sequence[int]] = None
+    ) -> list:
+        """
+        One page of an ordered list over a sharded table.
+
+        Every shard returns its first ``skip + limit`` rows in list order,
+        and the page is cut from their k-way merge on ``order_by``.
+
+        Args:
+            db: The caller's session
+            build_query: Builds the list query (ordered by ``order_by``) for a session
+            order_by: Column the list is ordered by
+            descending: Whether the order is descending
+            skip: Rows to skip
+            limit: Rows to return
+            shards: Shards to ask (all by default)
+
+        Returns:
+            The page's entities
+        """
+        partials = self.scatter(
+            db,
+            lambda session: build_query(session).add_columns(order_by).offset(None).limit(skip + limit).all(),
+            shards,
+        )
+        merged = heapq.merge(*partials, key=itemgetter(-1), reverse=descending)
+        return [row[0] for row in islice(merged, skip, skip + limit)]
+
+    def create_tables(self, metadata: MetaData) -> None:
+        """Create the global tables on the primary and the sharded ones on every shard."""
+        if not self.sharded:
+            metadata.create_all(bind=self.primary)
+            return
+        sharded = [table for table in metadata.sorted_tables if table.name in SHARDED_TABLES]
+        metadata.create_all(
+            bind=self.primary,
+            tables=[table for table in metadata.sorted_tables if table.name not in SHARDED_TABLES],
+        )
+        for shard_engine in dict.fromkeys(self.engines):
+            # Foreign keys to global tables are declared but not enforced (SQLite leaves them off)
+            metadata.create_all(bind=shard_engine, tables=sharded)
@@ -0,0 +1,228 @@
+"""
+Worker startup: schema verification, warm-up, lazy routers and cold-start metrics.
+"""
+import importlib
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import configure_mappers
+from starlette.routing import BaseRoute, Match
+
+from .config import settings
+
+ALEMBIC_DIR = Path(__file__).resolve().parent.parent.parent / "alembic"
+
+
+class SchemaVersionError(RuntimeError):
+    """Raised when the database schema does not match the Alembic head."""
+
+
+def get_head_revision() -> str:
+    """Return the head revision of the Alembic scripts shipped with the app."""
+    from alembic.script import ScriptDirectory
+
+    return ScriptDirectory(str(ALEMBIC_DIR)).get_current_head()
+
+
+def verify_schema_revision(engine: Engine) -> str:
+    """
+    Check the database's Alembic revision against head with a single query.
+
+    Args:
+        engine: Database engine
+
+    Returns:
+        The verified revision
+
+    Raises:
+        SchemaVersionError: If the database is not migrated to head
+    """
+    head = get_head_revision()
+    try:
+        with engine.connect() as connection:
+            current = connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+    except DBAPIError as exc:
+        raise SchemaVersionError(
+            "Database has no alembic_version table. Run `alembic upgrade head` before starting the API."
+        ) from exc
+
+    if current != head:
+        raise SchemaVersionError(
+            f"Database schema is at revision {current!r} but the code expects {head!r}. "
+            "Run `alembic upgrade head` before starting the API."
+        )
+    return current
+
+
+SCHEMA_STRATEGIES = ("verify", "create", "skip")
+
+
+def schema_strategy() -> str:
+    """Return DB_SCHEMA_STRATEGY, rejecting unknown values instead of silently skipping."""
+    strategy = settings.DB_SCHEMA_STRATEGY
+    if strategy not in SCHEMA_STRATEGIES:
+        raise ValueError(
+            f"DB_SCHEMA_STRATEGY must be one of {', '.join(SCHEMA_STRATEGIES)}, not {strategy!r}"
+        )
+    return strategy
+
+
+def prewarm(engine: Engine, connections: int) -> None:
+    """
+    Open pool connections and configure ORM mappers ahead of the first request.
+
+    Args:
+        engine: Database engine whose pool is warmed
+        connections: Number of connections to open (bounded by the pool size)
+    """
+    configure_mappers()
+
+    pool_size = getattr(engine.pool, "size", lambda: connections)()
+    opened = []
+    try:
+        for _ in range(min(connections, pool_size)):
+            connection = engine.connect()
+            connection.execute(text("SELECT 1"))
+            opened.append(connection)
+    finally:
+        for connection in opened:
+            connection.close()
+
+
+def current_rss_mb() -> Optional[float]:
+    """Resident set size of this process in MiB, if it can be determined."""
+    try:
+        with open("/proc/self/statm") as statm:
+            pages = int(statm.read().split()[1])
+        return round(pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 1)
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+
+        # ru_maxrss is KiB on Linux and bytes on macOS; this is a peak, not current
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        divisor = 1024 * 1024 if os.uname().sysname == "Darwin" else 1024
+        return round(maxrss / divisor, 1)
+    except (ImportError, AttributeError):
+        return None
+
+
+class StartupMetrics:
+    """Cold-start timings for this worker, measured from module import."""
+
+    def __init__(self):
+        self.import_started = time.perf_counter()
+        self.startup_completed: Optional[float] = None
+        self.first_request_completed: Optional[float] = None
+        self.rss_after_startup_mb: Optional[float] = None
+        self.rss_after_first_request_mb: Optional[float] = None
+
+    def mark_started(self) -> None:
+        self.startup_completed = time.perf_counter()
+        self.rss_after_startup_mb = current_rss_mb()
+
+    def mark_first_request(self) -> None:
+        self.first_request_completed = time.perf_counter()
+        self.rss_after_first_request_mb = current_rss_mb()
+        print(
+            f"Cold start: first request served {self.as_dict()['time_to_first_request_ms']} ms "
+            f"after import, RSS {self.rss_after_first_request_mb} MiB"
+        )
+
+    def as_dict(self) -> Dict[str, Optional[float]]:
+        def elapsed_ms(mark):
+            return None if mark is None else round((mark - self.import_started) * 1000, 1)
+
+        return {
+            "time_to_ready_ms": elapsed_ms(self.startup_completed),
+            "time_to_first_request_ms": elapsed_ms(self.first_request_completed),
+            "rss_after_startup_mb": self.rss_after_startup_mb,
+            "rss_after_first_request_mb": self.rss_after_first_request_mb,
+            "rss_now_mb": current_rss_mb(),
+        }
+
+
+startup_metrics = StartupMetrics()
+
+
+class FirstRequestTimer:
+    """ASGI middleware that records when the first HTTP request finishes."""
+
+    def __init__(self, app, metrics: StartupMetrics = startup_metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        await self.app(scope, receive, send)
+        if scope["type"] == "http" and self.metrics.first_request_completed is None:
+            self.metrics.mark_first_request()
+
+
+class LazyRouterRoute(BaseRoute):
+    """
+    Placeholder route that imports a router module on first use.
+
+    Matches every path under ``prefix``; on the first hit it includes the real
+    router into the application, removes itself and re-dispatches the request.
+    """
+
+    def __init__(self, app, module_path: str, prefix: str):
+        self.fastapi_app = app
+        self.module_path = module_path
+        self.prefix = prefix.rstrip("/")
+        self.loaded = False
+
+    def matches(self, scope):
+        if scope["type"] == "http":
+            path = scope["path"]
+            if path == self.prefix or path.startswith(self.prefix + "/"):
+                return Match.FULL, {}
+        return Match.NONE, {}
+
+    def load(self) -> None:
+        if self.loaded:
+            return
+        module = importlib.import_module(self.module_path)
+        self.fastapi_app.include_router(module.router)
+        if self in self.fastapi_app.router.routes:
+            self.fastapi_app.router.routes.remove(self)
+        self.fastapi_app.openapi_schema = None
+        self.loaded = True
+
+    async def handle(self, scope, receive, send):
+        self.load()
+        await self.fastapi_app.router(scope, receive, send)
+
+
+def include_lazy_routers(app, routers: Dict[str, str]) -> List[LazyRouterRoute]:
+    """
+    Register routers that are imported on first request instead of at boot.
+
+    The OpenAPI schema loads them all, so /docs stays complete.
+
+    Args:
+        app: FastAPI application
+        routers: Mapping of URL prefix to router module path
+
+    Returns:
+        The placeholder routes
+    """
+    placeholders = [LazyRouterRoute(app, module_path, prefix) for prefix, module_path in routers.items()]
+    app.router.routes.extend(placeholders)
+
+    build_openapi = app.openapi
+
+    def openapi():
+        if any(not placeholder.loaded for placeholder in placeholders):
+            for placeholder in placeholders:
+                placeholder.load()
+        return build_openapi()
+
+    app.openapi = openapi
+    return placeholders
@@ -0,0 +1,131 @@
+"""
+Streaming JSON-array responses for large list endpoints.
+
+Rows are pulled from the database in chunks with ``yield_per`` and each
+chunk is serialized and flushed before the next one is fetched, so memory
+stays flat regardless of how many rows a request asks for.
+"""
+import heapq
+from itertools import islice
+from operator import itemgetter
+from typing import Callable, Iterable, Iterator, Optional, Sequence, Type
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy.orm import Query, Session
+
+from .config import settings
+from .database import shard_router, sibling_session
+
+
+def stream_json_array(
+    rows: Iterable,
+    schema: Type[BaseModel],
+    chunk_size: int = None
+) -> Iterator[bytes]:
+    """
+    Serialize rows into a JSON array, yielding one chunk of bytes at a time.
+
+    Args:
+        rows: ORM objects (or anything the schema can validate from attributes)
+        schema: Pydantic response schema for a single row
+        chunk_size: Number of rows per yielded chunk
+
+    Yields:
+        Encoded pieces of the JSON array
+    """
+    chunk_size = chunk_size or settings.STREAM_CHUNK_SIZE
+    buffer = [b"["]
+    count = 0
+    for row in rows:
+        if count:
+            buffer.append(b",")
+        buffer.append(schema.model_validate(row).model_dump_json(by_alias=True).encode("utf-8"))
+        count += 1
+        if count % chunk_size == 0:
+            yield b"".join(buffer)
+            buffer = []
+    buffer.append(b"]")
+    yield b"".join(buffer)
+
+
+def stream_query(
+    build_query: Callable[[Session], Query],
+    schema: Type[BaseModel],
+    db: Session
+) -> StreamingResponse:
+    """
+    Build a streaming JSON response from a query.
+
+    The query runs in its own session on the same engine as ``db`` (primary
+    or replica), which lives as long as the response body is being produced
+    rather than as long as the request handler.
+
+    Args:
+        build_query: Callable that builds the query from a session
+        schema: Pydantic response schema for a single row
+        db: The request's session, used to pick the engine
+
+    Returns:
+        StreamingResponse producing a JSON array
+    """
+    chunk_size = settings.STREAM_CHUNK_SIZE
+
+    def generate():
+        session = sibling_session(db)
+        try:
+            rows = build_query(session).yield_per(chunk_size)
+            yield from stream_json_array(rows, schema, chunk_size)
+        finally:
+            session.close()
+
+    return StreamingResponse(generate(), media_type="application/json")
+
+
+def stream_merged_query(
+    build_query: Callable[[Session], Query],
+    schema: Type[BaseModel],
+    db: Session,
+    order_by,
+    descending: bool,
+    skip: int,
+    limit: int,
+    shards: Optional[Sequence[int]] = None
+) -> StreamingResponse:
+    """
+    Build a streaming JSON response from a query over a sharded table.
+
+    Every shard streams its first ``skip + limit`` rows in list order from a
+    session of its own, and the streams are k-way merged on ``order_by`` as
+    they are read, so memory stays flat as with ``stream_query``.
+
+    Args:
+        build_query: Callable that builds the query (ordered by ``order_by``) from a session
+        schema: Pydantic response schema for a single row
+        db: The request's session, used to pick the engine of the global tables
+        order_by: Column the list is ordered by
+        descending: Whether the order is descending
+        skip: Rows to skip
+        limit: Rows to return
+        shards: Shards to read (all by default)
+
+    Returns:
+        StreamingResponse producing a JSON array
+    """
+    chunk_size = settings.STREAM_CHUNK_SIZE
+    shards = range(shard_router.count) if shards is None else shards
+
+    def generate():
+        sessions = [shard_router.session(shard, db) for shard in shards]
+        try:
+            streams = [
+                build_query(session).add_columns(order_by).offset(None).limit(skip + limit).yield_per(chunk_size)
+                for session in sessions
+            ]
+            merged = heapq.merge(*streams, key=itemgetter(-1), reverse=descending)
+            yield from stream_json_array((row[0] for row in islice(merged, skip, skip + limit)), schema, chunk_size)
+        finally:
+            for session in sessions:
+                session.close()
+
+    return StreamingResponse(generate(), media_type="application/json")
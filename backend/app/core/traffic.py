@@ -0,0 +1,224 @@
+"""
+Opt-in capture of sanitized request traces for replay (scripts/replay_traffic.py).
+
+Each sampled request becomes one NDJSON line with its route template, path
+and query parameters, the shape of its JSON body, the caller's role and a
+pseudonym for the caller, and the response status and timing. Values that
+could identify people (emails, free text, IDs) never reach the file: UUIDs
+and emails become keyed pseudonyms, so the same ID maps to the same token
+within one capture and can be remapped consistently on replay, and other
+strings are kept only for known enum, date and number parameters (and only
+when they look like one); everything else is reduced to its length.
+Passwords and tokens are dropped entirely.
+
+Lines are written by a background thread, so the event loop never waits on
+the file.
+"""
+import hashlib
+import hmac
+import json
+import os
+import queue
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+from urllib.parse import parse_qsl
+from uuid import UUID
+
+from .security import decode_access_token
+
+UUID_PATTERN = re.compile(r"^[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}$")
+EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+$")
+# Shape of a string kept verbatim: dates, times, numbers, booleans and enum-like tokens
+SAFE_STRING_PATTERN = re.compile(
+    r"^(\d{4}-\d{2}-\d{2}([T ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?|\d{2}:\d{2}(:\d{2})?|-?\d+(\.\d+)?|true|false"
+    r"|-?[a-z][a-z0-9_]{0,31}(,-?[a-z][a-z0-9_]{0,31})*)$"
+)
+# Keys of enum, date and number parameters whose string values may be kept verbatim;
+# strings under any other key are reduced to their length
+SAFE_VALUE_KEYS = frozenset({
+    "status", "status_filter", "category", "role", "sort", "format", "fields", "include", "type",
+    "date", "date_from", "date_to", "event_date", "event_time", "starts_at", "ends_at", "last_event_id",
+    "skip", "limit", "max_batches", "older_than_days", "lat", "lon", "latitude", "longitude", "radius",
+    "max_distance", "price", "price_min", "price_max", "duration", "quantity",
+    "active_only", "is_active", "with_total", "stream", "dry_run",
+})
+# Keys whose values are never written, not even as a shape
+SECRET_KEYS = frozenset({"password", "access_token", "token", "refresh_token", "secret", "ticket"})
+# Free-text keys whose values are reduced to their length even when they are not strings
+FREE_TEXT_KEYS = frozenset({
+    "location", "notes", "admin_notes", "description", "full_name", "name", "title", "email", "client_email",
+    "phone",
+})
+# Prefix of a placeholder replacing a string that was not kept
+REDACTED_PREFIX = "$str:"
+
+
+class TraceSanitizer:
+    """Turns request values into replayable, non-identifying placeholders."""
+
+    def __init__(self, key: Optional[bytes] = None):
+        # A fresh key per capture: tokens are consistent within a file but cannot be reversed
+        self.key = key or os.urandom(32)
+
+    def pseudonym(self, value: str) -> str:
+        return hmac.new(self.key, value.lower().encode("utf-8"), hashlib.sha256).hexdigest()[:16]
+
+    def value(self, value: Any, key: Optional[str] = None) -> Any:
+        name = key.lower() if key else None
+        if name in SECRET_KEYS:
+            return {"$secret": True}
+        if isinstance(value, dict):
+            return {item_key: self.value(item, item_key) for item_key, item in value.items()}
+        if isinstance(value, list):
+            return [self.value(item, key) for item in value]
+        if not isinstance(value, str):
+            if name in FREE_TEXT_KEYS and value is not None:
+                return f"{REDACTED_PREFIX}{len(str(value))}"
+            return value
+        if name in FREE_TEXT_KEYS and not EMAIL_PATTERN.match(value):
+            return f"{REDACTED_PREFIX}{len(value)}"
+        if UUID_PATTERN.match(value):
+            return {"$id": self.pseudonym(str(UUID(value)))}
+        if EMAIL_PATTERN.match(value):
+            return {"$email": self.pseudonym(value)}
+        if name in SAFE_VALUE_KEYS and SAFE_STRING_PATTERN.match(value):
+            return value
+        return f"{REDACTED_PREFIX}{len(value)}"
+
+    def query(self, query_string: bytes) -> Dict[str, list]:
+        params: Dict[str, list] = {}
+        for name, value in parse_qsl(query_string.decode("latin-1"), keep_blank_values=True):
+            params.setdefault(name, []).append(self.value(value, name))
+        return params
+
+
+class TraceWriter:
+    """Appends NDJSON lines to a file from a daemon thread."""
+
+    def __init__(self, path: str, flush_seconds: float = 1.0):
+        self.path = path
+        self.flush_seconds = flush_seconds
+        self._queue: "queue.SimpleQueue[Optional[str]]" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="trace-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, record: dict) -> None:
+        self._queue.put(json.dumps(record, separators=(",", ":"), default=str))
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        with open(self.path, "a", encoding="utf-8") as output:
+            last_flush = time.monotonic()
+            while True:
+                try:
+                    line = self._queue.get(timeout=self.flush_seconds)
+                except queue.Empty:
+                    line = ""
+                if line is None:
+                    break
+                if line:
+                    output.write(line + "\n")
+                if time.monotonic() - last_flush >= self.flush_seconds:
+                    output.flush()
+                    last_flush = time.monotonic()
+
+
+class TrafficCaptureMiddleware:
+    """
+    ASGI middleware that records a sanitized trace of sampled HTTP requests.
+
+    Only added to the app when TRAFFIC_CAPTURE_PATH is set. Request bodies
+    are observed as the application reads them (up to ``max_body_bytes``)
+    and never buffered ahead of it; responses pass through untouched.
+    """
+
+    def __init__(
+        self,
+        app,
+        path: str,
+        sample_rate: float = 1.0,
+        max_body_bytes: int = 65536,
+        exclude_prefixes: Iterable[str] = ("/events", "/docs", "/redoc", "/openapi.json"),
+    ):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.max_body_bytes = max_body_bytes
+        self.exclude_prefixes = tuple(exclude_prefixes)
+        self.sanitizer = TraceSanitizer()
+        self.writer = TraceWriter(path)
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["path"].startswith(self.exclude_prefixes)
+            or (self.sample_rate < 1.0 and random.random() >= self.sample_rate)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        body = bytearray()
+        status_code = 500
+        response_bytes = 0
+
+        async def capture_receive():
+            message = await receive()
+            if message["type"] == "http.request" and len(body) <= self.max_body_bytes:
+                body.extend(message.get("body", b""))
+            return message
+
+        async def capture_send(message):
+            nonlocal status_code, response_bytes
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        started_at = time.time()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, capture_receive, capture_send)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            self.writer.write(self._record(scope, bytes(body), started_at, duration_ms, status_code, response_bytes))
+
+    def _record(self, scope, body: bytes, started_at: float, duration_ms: float, status_code: int, response_bytes: int) -> dict:
+        route = scope.get("route")
+        path_params = scope.get("path_params") or {}
+        user, role = None, None
+        for name, value in scope.get("headers", []):
+            if name == b"authorization" and value[:7].lower() == b"bearer ":
+                payload = decode_access_token(value[7:].decode("latin-1"))
+                if payload and payload.get("user_id"):
+                    user, role = self.sanitizer.pseudonym(payload["user_id"]), payload.get("role")
+                break
+
+        body_shape = None
+        if body and len(body) <= self.max_body_bytes:
+            try:
+                body_shape = self.sanitizer.value(json.loads(body))
+            except ValueError:
+                body_shape = {"$bytes": len(body)}
+        elif body:
+            body_shape = {"$bytes": len(body)}
+
+        return {
+            "ts": round(started_at, 6),
+            "method": scope["method"],
+            # Unmatched paths may contain anything, so only matched templates are kept
+            "route": getattr(route, "path", None) or "<unmatched>",
+            "path_params": {name: self.sanitizer.value(str(value), name) for name, value in path_params.items()},
+            "query": self.sanitizer.query(scope.get("query_string", b"")),
+            "body": body_shape,
+            "user": user,
+            "role": role,
+            "status": status_code,
+            "duration_ms": round(duration_ms, 3),
+            "response_bytes": response_bytes,
+        }
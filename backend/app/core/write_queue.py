@@ -0,0 +1,268 @@
+"""
+Single-writer group commit for SQLite (SQLITE_WRITE_MODE = "queue").
+
+SQLite allows one writer at a time. With several request threads writing
+through their own pooled connections, each one retries its lock in
+busy-waits, and a transaction that read before writing fails outright
+with ``database is locked`` when another writer committed in between.
+
+In queue mode every ORM commit is handed to one writer thread that owns a
+dedicated connection. The thread takes all jobs that queued up while the
+previous batch was committing (up to WRITE_QUEUE_MAX_BATCH). It runs each
+job in its own SAVEPOINT inside a single ``BEGIN IMMEDIATE`` transaction and
+commits the batch once, so many transactions share one fsync. A failing job
+is rolled back to its savepoint and gets its own exception; the others
+commit. Results are returned to the waiting callers only after the batch
+commit, so a caller whose commit returned can rely on its write being
+durable and visible.
+
+Reads stay on the normal pool and run concurrently with the writer under
+WAL. Statements that write through a session's own connection (Core or
+text ``INSERT``/``UPDATE``/``DELETE`` in batch jobs such as archival or
+counter flushes, and explicit ``flush()`` calls) hold SQLite's write lock
+there, so such sessions commit directly, waiting for the lock like before.
+
+Session ``after_commit`` listeners (events, cache invalidation, demand
+deltas, replica pins) keep their payloads in ``session.info``. For a queued
+commit those payloads are held back while the writer releases the
+session's savepoint, and ``after_commit`` is dispatched in the caller's
+thread once the group commit succeeded (``after_rollback`` if it failed),
+so nothing is announced for writes that are not durable yet. If the group
+commit fails after the session's savepoint was released, the session is
+emptied (``expunge_all``) so it does not keep objects that were never written.
+"""
+import queue
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, List, Optional, Tuple
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+_STOP = object()
+
+
+class WriteQueueTimeoutError(RuntimeError):
+    """Raised when a queued commit did not start within WRITE_QUEUE_TIMEOUT_SECONDS (it was not run)."""
+
+
+class WriteQueue:
+    """One writer thread committing queued jobs in groups."""
+
+    def __init__(self, engine: Engine, max_batch: int, timeout_seconds: float):
+        self.url = engine.url
+        self.echo = engine.echo
+        self.max_batch = max_batch
+        self.timeout_seconds = timeout_seconds
+        self.jobs_committed = 0
+        self.batches_committed = 0
+        self._queue: "queue.Queue" = queue.Queue()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def _writer_engine(self) -> Engine:
+        """
+        Engine for the writer connection.
+
+        pysqlite's own transaction handling is turned off so the writer
+        issues BEGIN IMMEDIATE and savepoints itself; ``synchronous=FULL``
+        makes each (group) commit durable.
+        """
+        writer_engine = create_engine(self.url, echo=self.echo)
+
+        @event.listens_for(writer_engine, "connect")
+        def _configure(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=FULL")
+            cursor.close()
+
+        @event.listens_for(writer_engine, "begin")
+        def _begin_immediate(connection):
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+        return writer_engine
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Commit what is queued, then stop the writer thread."""
+        with self._lock:
+            if self._thread is None:
+                return
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, work: Callable[[Connection], Any], savepoint: bool = True) -> Any:
+        """
+        Run ``work(connection)`` on the writer and wait for its batch to commit.
+
+        Args:
+            work: Writes through the given connection; raising rolls back its
+                own changes only
+            savepoint: Wrap ``work`` in a savepoint (False when it opens its own)
+
+        Returns:
+            What ``work`` returned
+
+        Raises:
+            WriteQueueTimeoutError: If the job waited too long to start (it is dropped)
+            Exception: What ``work`` raised, or the batch commit's exception
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            # Already on the writer (e.g. a commit inside a commit hook): join the current job
+            return work(connection)
+        self.start()
+        future: Future = Future()
+        self._queue.put((work, savepoint, future))
+        try:
+            return future.result(timeout=self.timeout_seconds)
+        except FutureTimeoutError:
+            if future.cancel():
+                raise WriteQueueTimeoutError(f"Write not started within {self.timeout_seconds} s")
+            # Already running: its batch is about to commit
+            return future.result()
+
+    def _run(self) -> None:
+        writer_engine = self._writer_engine()
+        connection = writer_engine.connect()
+        self._local.connection = connection
+        stopping = False
+        try:
+            while not stopping:
+                item = self._queue.get()
+                if item is _STOP:
+                    break
+                batch = [item]
+                # Everything that queued up while the last batch committed joins this one
+                while len(batch) < self.max_batch:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+                self._commit_batch(connection, batch)
+        finally:
+            self._local.connection = None
+            connection.close()
+            writer_engine.dispose()
+
+    def _commit_batch(self, connection: Connection, batch: List[Tuple[Callable, bool, Future]]) -> None:
+        succeeded = []
+        try:
+            with connection.begin():
+                for work, isolate, future in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    savepoint = connection.begin_nested() if isolate else None
+                    try:
+                        result = work(connection)
+                    except BaseException as exc:
+                        if savepoint is not None:
+                            savepoint.rollback()
+                        future.set_exception(exc)
+                    else:
+                        if savepoint is not None:
+                            savepoint.commit()
+                        succeeded.append((future, result))
+        except Exception as exc:
+            # The group commit (or BEGIN) failed: nothing in the batch was written. SQLite can
+            # leave the transaction open after a failed COMMIT, which would fail every later BEGIN
+            if not connection.invalidated and connection.connection.dbapi_connection.in_transaction:
+                connection.connection.dbapi_connection.rollback()
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            print(f"Write queue batch of {len(batch)} failed: {exc}")
+            return
+        self.jobs_committed += len(succeeded)
+        self.batches_committed += 1
+        for future, result in succeeded:
+            future.set_result(result)
+
+
+class QueuedSession(Session):
+    """
+    Session whose ORM commits run on a WriteQueue's writer thread.
+
+    Queries before the commit use the normal connection pool. At commit the
+    session is handed to the writer, which flushes it on the writer
+    connection and commits it in the current group; its after-commit
+    listeners run afterwards, in the calling thread. Read-only sessions, and
+    sessions that already wrote on their own connection, commit directly.
+    """
+
+    def __init__(self, *args, write_queue: Optional[WriteQueue] = None, **kwargs):
+        # On the writer connection the session keeps its changes in a savepoint of its own
+        kwargs.setdefault("join_transaction_mode", "create_savepoint")
+        super().__init__(*args, **kwargs)
+        self.write_queue = write_queue
+        self._writer_connection: Optional[Connection] = None
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._writer_connection is not None:
+            return self._writer_connection
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+    def _wrote_directly(self) -> bool:
+        """Whether the session's own connection holds a write transaction (pysqlite opens one on DML only)."""
+        if not self.in_transaction():
+            return False
+        return self.connection().connection.dbapi_connection.in_transaction
+
+    def commit(self) -> None:
+        if (
+            self.write_queue is not None
+            and self._writer_connection is None
+            and (self.new or self.dirty or self.deleted)
+            and not self._wrote_directly()
+        ):
+            held: dict = {}
+            released: List[bool] = []
+            try:
+                self.write_queue.submit(
+                    lambda connection: self._commit_on_writer(connection, held, released), savepoint=False
+                )
+            except BaseException:
+                if released:
+                    # The savepoint was released, so the identity map holds objects the failed
+                    # group commit never wrote; drop them instead of serving phantom state
+                    self.expunge_all()
+                # Nothing was written: let the listeners discard what they collected
+                self.info.update(held)
+                self.dispatch.after_rollback(self)
+                raise
+            # The group commit is durable; only now publish events, invalidate caches, pin reads
+            self.info.update(held)
+            self.dispatch.after_commit(self)
+        else:
+            super().commit()
+
+    def _commit_on_writer(self, connection: Connection, held: dict, released: List[bool]) -> None:
+        self._writer_connection = connection
+        try:
+            self.flush()
+            # Only the savepoint is released below; hide the after-commit payloads from the
+            # listeners it triggers until the batch has committed
+            held.update(self.info)
+            self.info.clear()
+            super().commit()
+            released.append(True)
+        except BaseException:
+            super().rollback()
+            raise
+        finally:
+            self._writer_connection = None
@@ -6,6 +6,13 @@ from app.models.package import Package, PackageCategory
 from app.models.addon import AddOn, AddOnCategory
 from app.models.booking import Booking, BookingAddOn, BookingStatus
 from app.models.delivery import Delivery
+from app.models.archive import ArchivedBooking, ArchivedBookingAddOn, ArchivedDelivery
+from app.models.staff import StaffMember, StaffRole, CrewAssignment
+from app.models.summary import UserBookingSummary
+from app.models.package_stats import PackageStats
+from app.models.recommendation import AddOnCoOccurrence, AddOnRecommendation
+from app.models.backfill import BackfillCheckpoint
+from app.models.event_ticket import EventStreamTicket
 
 __all__ = [
     "User",
@@ -18,4 +25,16 @@ __all__ = [
     "BookingAddOn",
     "BookingStatus",
     "Delivery",
+    "ArchivedBooking",
+    "ArchivedBookingAddOn",
+    "ArchivedDelivery",
+    "StaffMember",
+    "StaffRole",
+    "CrewAssignment",
+    "UserBookingSummary",
+    "PackageStats",
+    "AddOnRecommendation",
+    "AddOnCoOccurrence",
+    "BackfillCheckpoint",
+    "EventStreamTicket",
 ]
\ No newline at end of file
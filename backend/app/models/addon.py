@@ -1,7 +1,7 @@
 """
 AddOn model for optional extras.
 """
-from sqlalchemy import Column, String, Text, DECIMAL, Boolean, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, String, Text, DECIMAL, Boolean, DateTime, Enum as SQLEnum, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
@@ -23,6 +23,13 @@ class AddOn(Base):
     """Optional add-ons for bookings."""
 
     __tablename__ = "addons"
+    __table_args__ = (
+        # Partial index for the public catalog (active add-ons, optional category filter)
+        Index(
+            "ix_addons_active_category", "category",
+            sqlite_where=text("is_active = 1"), postgresql_where=text("is_active = true")
+        ),
+    )
 
     id = Column(GUID, primary_key=True, default=uuid.uuid4, index=True)
     name = Column(String(255), nullable=False)
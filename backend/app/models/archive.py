@@ -0,0 +1,88 @@
+"""
+Archive models for old, finished bookings.
+
+Completed and rejected bookings past the archival age are moved here,
+together with their add-ons and delivery, to keep the hot tables and their
+indexes small. Column names and relationships mirror the hot models so the
+same response schemas serialize both.
+"""
+from sqlalchemy import Column, String, Text, DECIMAL, Date, Time, DateTime, Enum as SQLEnum, ForeignKey, Integer, Float
+from sqlalchemy.orm import relationship
+from datetime import datetime
+
+from app.core.database import Base
+from app.core.db_types import GUID, JSON
+from app.models.booking import BookingStatus
+
+
+class ArchivedBooking(Base):
+    """Archived client booking."""
+
+    __tablename__ = "bookings_archive"
+
+    id = Column(GUID, primary_key=True)
+    user_id = Column(GUID, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    package_id = Column(GUID, ForeignKey("packages.id", ondelete="RESTRICT"), nullable=False, index=True)
+    event_type = Column(String(100), nullable=False)
+    event_date = Column(Date, nullable=False, index=True)
+    event_time = Column(Time, nullable=False)
+    location = Column(Text, nullable=False)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    geo_cell = Column(Integer, nullable=True)
+    status = Column(SQLEnum(BookingStatus), nullable=False)
+    total_price = Column(DECIMAL(10, 2), nullable=False)
+    notes = Column(Text, nullable=True)
+    admin_notes = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    # Relationships
+    user = relationship("User")
+    package = relationship("Package")
+    booking_addons = relationship("ArchivedBookingAddOn", back_populates="booking", cascade="all, delete-orphan")
+    delivery = relationship("ArchivedDelivery", back_populates="booking", uselist=False, cascade="all, delete-orphan")
+
+    def __repr__(self):
+        return f"<ArchivedBooking(id={self.id}, event_type={self.event_type}, status={self.status})>"
+
+
+class ArchivedBookingAddOn(Base):
+    """Archived add-on line of an archived booking."""
+
+    __tablename__ = "booking_addons_archive"
+
+    id = Column(GUID, primary_key=True)
+    booking_id = Column(GUID, ForeignKey("bookings_archive.id", ondelete="CASCADE"), nullable=False, index=True)
+    addon_id = Column(GUID, ForeignKey("addons.id", ondelete="CASCADE"), nullable=False, index=True)
+    quantity = Column(Integer, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+
+    # Relationships
+    booking = relationship("ArchivedBooking", back_populates="booking_addons")
+    addon = relationship("AddOn")
+
+    def __repr__(self):
+        return f"<ArchivedBookingAddOn(booking_id={self.booking_id}, addon_id={self.addon_id})>"
+
+
+class ArchivedDelivery(Base):
+    """Archived delivery of an archived booking."""
+
+    __tablename__ = "deliveries_archive"
+
+    id = Column(GUID, primary_key=True)
+    booking_id = Column(GUID, ForeignKey("bookings_archive.id", ondelete="CASCADE"), unique=True, nullable=False, index=True)
+    photo_urls = Column(JSON, nullable=True)
+    video_urls = Column(JSON, nullable=True)
+    download_links = Column(JSON, nullable=True)
+    notes = Column(Text, nullable=True)
+    delivered_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+
+    # Relationships
+    booking = relationship("ArchivedBooking", back_populates="delivery")
+
+    def __repr__(self):
+        return f"<ArchivedDelivery(id={self.id}, booking_id={self.booking_id})>"
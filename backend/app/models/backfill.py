@@ -0,0 +1,32 @@
+"""
+Progress checkpoints of batched backfills (app.services.backfill).
+"""
+from sqlalchemy import Column, BigInteger, DateTime, Integer, String
+from datetime import datetime
+
+from app.core.database import Base
+
+
+class BackfillCheckpoint(Base):
+    """
+    Where a named backfill got to.
+
+    ``last_key`` is the primary key of the last row processed, as text; it
+    is written in the same transaction as the batch it ends, so a restarted
+    backfill continues right after the last committed batch.
+    """
+
+    __tablename__ = "backfill_checkpoints"
+
+    name = Column(String(100), primary_key=True)
+    table_name = Column(String(100), nullable=False)
+    last_key = Column(String(64), nullable=True)  # None until the first batch commits
+    rows_visited = Column(BigInteger, default=0, nullable=False)
+    rows_updated = Column(BigInteger, default=0, nullable=False)
+    batches = Column(Integer, default=0, nullable=False)
+    started_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    completed_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<BackfillCheckpoint(name={self.name}, last_key={self.last_key})>"
@@ -1,7 +1,10 @@
 """
 Booking model for client reservations.
 """
-from sqlalchemy import Column, String, Text, DECIMAL, Date, Time, DateTime, Enum as SQLEnum, ForeignKey, Integer
+from sqlalchemy import (
+    Column, String, Text, DECIMAL, Date, Time, DateTime, Enum as SQLEnum, ForeignKey, Integer, Float, Index, DDL,
+    event, text
+)
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
@@ -9,6 +12,7 @@ import enum
 
 from app.core.database import Base
 from app.core.db_types import GUID
+from app.utils.geo import cell_of
 
 
 class BookingStatus(str, enum.Enum):
@@ -23,15 +27,42 @@ class Booking(Base):
     """Client booking requests."""
 
     __tablename__ = "bookings"
+    __table_args__ = (
+        # (user_id, event_date) also serves plain user_id lookups
+        Index("ix_bookings_user_event_date", "user_id", "event_date"),
+        # Admin list: status filter with newest-first paging
+        Index("ix_bookings_status_created_at", "status", "created_at"),
+        Index("ix_bookings_created_at", "created_at"),
+        # Admin search (/bookings/search): event type with date range/order, price range/order
+        Index("ix_bookings_event_type_event_date", "event_type", "event_date"),
+        Index("ix_bookings_total_price", "total_price"),
+        # Substring search on location; SQLite uses the FTS5 table below instead
+        Index(
+            "ix_bookings_location_trgm", "location",
+            postgresql_using="gin", postgresql_ops={"location": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+        # Radius searches (/bookings/nearby): geo_cell ranges, per day or across days
+        Index(
+            "ix_bookings_event_date_geo_cell", "event_date", "geo_cell",
+            sqlite_where=text("geo_cell IS NOT NULL"), postgresql_where=text("geo_cell IS NOT NULL")
+        ),
+        Index(
+            "ix_bookings_geo_cell", "geo_cell",
+            sqlite_where=text("geo_cell IS NOT NULL"), postgresql_where=text("geo_cell IS NOT NULL")
+        ),
+    )
 
     id = Column(GUID, primary_key=True, default=uuid.uuid4, index=True)
-    user_id = Column(GUID, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(GUID, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     package_id = Column(GUID, ForeignKey("packages.id", ondelete="RESTRICT"), nullable=False, index=True)
     event_type = Column(String(100), nullable=False)
     event_date = Column(Date, nullable=False, index=True)
     event_time = Column(Time, nullable=False)
     location = Column(Text, nullable=False)
-    status = Column(SQLEnum(BookingStatus), nullable=False, default=BookingStatus.PENDING, index=True)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    geo_cell = Column(Integer, nullable=True)  # Grid cell of (latitude, longitude), see app.utils.geo
+    status = Column(SQLEnum(BookingStatus), nullable=False, default=BookingStatus.PENDING)
     total_price = Column(DECIMAL(10, 2), nullable=False)
     notes = Column(Text, nullable=True)
     admin_notes = Column(Text, nullable=True)
@@ -48,6 +79,43 @@ class Booking(Base):
         return f"<Booking(id={self.id}, event_type={self.event_type}, status={self.status})>"
 
 
+@event.listens_for(Booking, "before_insert")
+@event.listens_for(Booking, "before_update")
+def _set_geo_cell(mapper, connection, target):
+    target.geo_cell = cell_of(target.latitude, target.longitude)
+
+
+# Location search on SQLite: an FTS5 trigram table over bookings.location, kept
+# in sync by triggers. It is keyed by the bookings rowid, which VACUUM may
+# renumber; afterwards run
+#   INSERT INTO bookings_location_fts(bookings_location_fts) VALUES ('rebuild')
+LOCATION_FTS_TABLE = "bookings_location_fts"
+LOCATION_FTS_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {LOCATION_FTS_TABLE} USING fts5("
+    f"location, content='bookings', content_rowid='rowid', tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS {LOCATION_FTS_TABLE}_ai AFTER INSERT ON bookings BEGIN "
+    f"INSERT INTO {LOCATION_FTS_TABLE}(rowid, location) VALUES (new.rowid, new.location); END",
+    f"CREATE TRIGGER IF NOT EXISTS {LOCATION_FTS_TABLE}_ad AFTER DELETE ON bookings BEGIN "
+    f"INSERT INTO {LOCATION_FTS_TABLE}({LOCATION_FTS_TABLE}, rowid, location) "
+    f"VALUES ('delete', old.rowid, old.location); END",
+    f"CREATE TRIGGER IF NOT EXISTS {LOCATION_FTS_TABLE}_au AFTER UPDATE OF location ON bookings BEGIN "
+    f"INSERT INTO {LOCATION_FTS_TABLE}({LOCATION_FTS_TABLE}, rowid, location) "
+    f"VALUES ('delete', old.rowid, old.location); "
+    f"INSERT INTO {LOCATION_FTS_TABLE}(rowid, location) VALUES (new.rowid, new.location); END",
+)
+
+for _statement in LOCATION_FTS_DDL:
+    event.listen(Booking.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(
+    Booking.__table__, "before_drop",
+    DDL(f"DROP TABLE IF EXISTS {LOCATION_FTS_TABLE}").execute_if(dialect="sqlite")
+)
+event.listen(
+    Booking.__table__, "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
+
+
 class BookingAddOn(Base):
     """Junction table for bookings and add-ons."""
 
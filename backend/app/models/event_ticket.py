@@ -0,0 +1,27 @@
+"""
+Single-use tickets for opening the server-sent event stream.
+"""
+from sqlalchemy import Column, String, DateTime
+
+from app.core.database import Base
+from app.core.db_types import GUID
+
+
+class EventStreamTicket(Base):
+    """
+    A short-lived ticket that authenticates one ``GET /events/stream``.
+
+    EventSource cannot send an Authorization header, so clients exchange
+    their JWT for a ticket (``POST /events/ticket``) and put that in the URL
+    instead. Only the ticket's SHA-256 is stored, and the row is deleted when
+    the stream opens, so a ticket found in a log is useless.
+    """
+
+    __tablename__ = "event_stream_tickets"
+
+    ticket_hash = Column(String(64), primary_key=True)
+    user_id = Column(GUID, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<EventStreamTicket(user_id={self.user_id}, expires_at={self.expires_at})>"
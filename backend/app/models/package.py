@@ -1,7 +1,7 @@
 """
 Package model for photography and videography services.
 """
-from sqlalchemy import Column, String, Text, DECIMAL, Integer, Boolean, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, String, Text, DECIMAL, Integer, Boolean, DateTime, Enum as SQLEnum, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
@@ -23,6 +23,13 @@ class Package(Base):
     """Photography and videography service packages."""
 
     __tablename__ = "packages"
+    __table_args__ = (
+        # Partial index for the public catalog (active packages, optional category filter)
+        Index(
+            "ix_packages_active_category", "category",
+            sqlite_where=text("is_active = 1"), postgresql_where=text("is_active = true")
+        ),
+    )
 
     id = Column(GUID, primary_key=True, default=uuid.uuid4, index=True)
     title = Column(String(255), nullable=False)
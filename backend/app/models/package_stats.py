@@ -0,0 +1,29 @@
+"""
+Aggregated package popularity counters, written behind by app.services.popularity.
+"""
+from sqlalchemy import Column, BigInteger, DateTime
+from datetime import datetime
+
+from app.core.database import Base
+from app.core.db_types import GUID
+
+
+class PackageStats(Base):
+    """
+    Lifetime view, quote and booking counts per package.
+
+    Rows are only ever incremented by the periodic flush; a crashed worker
+    loses at most its last unflushed interval. There is no foreign key, so a
+    flush never fails because a package was deleted in the meantime.
+    """
+
+    __tablename__ = "package_stats"
+
+    package_id = Column(GUID, primary_key=True)
+    view_count = Column(BigInteger, default=0, nullable=False)
+    quote_count = Column(BigInteger, default=0, nullable=False)
+    booking_count = Column(BigInteger, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<PackageStats(package_id={self.package_id}, view_count={self.view_count})>"
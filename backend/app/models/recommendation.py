@@ -0,0 +1,53 @@
+"""
+Precomputed "frequently booked together" add-on recommendations and the
+shared co-occurrence counts they are ranked from.
+"""
+from sqlalchemy import Column, String, Integer, BigInteger, Float, DateTime
+from datetime import datetime
+
+from app.core.database import Base
+from app.core.db_types import GUID
+
+
+class AddOnRecommendation(Base):
+    """
+    Top add-ons booked together with a package or with another add-on.
+
+    Written by app.services.recommendations; ``score`` is the share of the
+    source's bookings that also included the add-on.
+    """
+
+    __tablename__ = "addon_recommendations"
+
+    source_type = Column(String(10), primary_key=True)  # "package" or "addon"
+    source_id = Column(GUID, primary_key=True)
+    rank = Column(Integer, primary_key=True)
+    addon_id = Column(GUID, nullable=False)
+    score = Column(Float, nullable=False)
+    together_count = Column(Integer, nullable=False)  # Bookings with both the source and the add-on
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<AddOnRecommendation(source_id={self.source_id}, rank={self.rank}, addon_id={self.addon_id})>"
+
+
+class AddOnCoOccurrence(Base):
+    """
+    Bookings that included both a source (package or add-on) and an add-on.
+
+    Every worker adds the bookings it creates with an upsert, and the full
+    rebuild recounts the table. The row whose ``addon_id`` equals
+    ``source_id`` holds the source's own booking count (for an add-on, the
+    bookings that included it), the denominator of the scores.
+    """
+
+    __tablename__ = "addon_cooccurrence"
+
+    source_type = Column(String(10), primary_key=True)  # "package" or "addon"
+    source_id = Column(GUID, primary_key=True)
+    addon_id = Column(GUID, primary_key=True)
+    together_count = Column(BigInteger, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<AddOnCoOccurrence(source_id={self.source_id}, addon_id={self.addon_id}, together_count={self.together_count})>"
@@ -0,0 +1,72 @@
+"""
+Staff (crew) model and crew assignments to bookings.
+"""
+from sqlalchemy import Column, String, Boolean, DateTime, Enum as SQLEnum, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.orm import relationship
+from datetime import datetime
+import uuid
+import enum
+
+from app.core.database import Base
+from app.core.db_types import GUID
+from app.models.package import PackageCategory
+
+
+class StaffRole(str, enum.Enum):
+    """Crew role enumeration."""
+    PHOTOGRAPHER = "photographer"
+    VIDEOGRAPHER = "videographer"
+
+
+# On-site crew each package category needs (editing is done off-site)
+CREW_REQUIREMENTS = {
+    PackageCategory.PHOTOGRAPHY: (StaffRole.PHOTOGRAPHER,),
+    PackageCategory.VIDEOGRAPHY: (StaffRole.VIDEOGRAPHER,),
+    PackageCategory.COMBO: (StaffRole.PHOTOGRAPHER, StaffRole.VIDEOGRAPHER),
+    PackageCategory.EDITING: (),
+}
+
+
+class StaffMember(Base):
+    """Photographer or videographer who can be assigned to bookings."""
+
+    __tablename__ = "staff"
+
+    id = Column(GUID, primary_key=True, default=uuid.uuid4, index=True)
+    full_name = Column(String(255), nullable=False)
+    email = Column(String(255), unique=True, nullable=False, index=True)
+    role = Column(SQLEnum(StaffRole), nullable=False, index=True)
+    is_active = Column(Boolean, default=True, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    # Relationships
+    assignments = relationship("CrewAssignment", back_populates="staff", cascade="all, delete-orphan")
+
+    def __repr__(self):
+        return f"<StaffMember(id={self.id}, full_name={self.full_name}, role={self.role})>"
+
+
+class CrewAssignment(Base):
+    """A staff member working a booking, with the booking's time span denormalized."""
+
+    __tablename__ = "crew_assignments"
+    __table_args__ = (
+        UniqueConstraint("booking_id", "staff_id", name="uq_crew_assignments_booking_staff"),
+        # Loading a staff member's schedule for a date window
+        Index("ix_crew_assignments_staff_starts_at", "staff_id", "starts_at"),
+    )
+
+    id = Column(GUID, primary_key=True, default=uuid.uuid4, index=True)
+    booking_id = Column(GUID, ForeignKey("bookings.id", ondelete="CASCADE"), nullable=False, index=True)
+    staff_id = Column(GUID, ForeignKey("staff.id", ondelete="CASCADE"), nullable=False)
+    role = Column(SQLEnum(StaffRole), nullable=False)
+    starts_at = Column(DateTime, nullable=False)
+    ends_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    # Relationships
+    staff = relationship("StaffMember", back_populates="assignments")
+    booking = relationship("Booking")
+
+    def __repr__(self):
+        return f"<CrewAssignment(booking_id={self.booking_id}, staff_id={self.staff_id}, role={self.role})>"
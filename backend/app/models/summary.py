@@ -0,0 +1,31 @@
+"""
+Per-user booking summary, maintained with every booking and delivery write.
+"""
+from sqlalchemy import Column, Integer, DECIMAL, Date, DateTime, ForeignKey
+from datetime import datetime
+
+from app.core.database import Base
+from app.core.db_types import GUID
+
+
+class UserBookingSummary(Base):
+    """
+    Counters shown on a client's profile page.
+
+    Archived bookings still count: archival moves rows without touching the
+    summary, and the consistency checker reads both hot and archive tables.
+    """
+
+    __tablename__ = "user_booking_summary"
+
+    user_id = Column(GUID, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    booking_count = Column(Integer, default=0, nullable=False)
+    total_spent = Column(DECIMAL(12, 2), default=0, nullable=False)  # Approved and completed bookings
+    # Earliest pending or approved booking; may lag behind today until the next write or rebuild
+    upcoming_booking_id = Column(GUID, nullable=True)
+    upcoming_event_date = Column(Date, nullable=True)
+    last_delivery_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<UserBookingSummary(user_id={self.user_id}, booking_count={self.booking_count})>"
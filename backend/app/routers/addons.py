@@ -1,27 +1,40 @@
 """
 AddOn router for managing optional extras.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import delete
 from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import List, Optional
 from uuid import UUID
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db, shard_router
+from app.core.streaming import stream_query
 from app.models.addon import AddOn
+from app.models.booking import BookingAddOn
 from app.models.user import User
 from app.schemas.addon import AddOnCreate, AddOnUpdate, AddOnResponse
+from app.services.counts import total_count
 from app.utils.dependencies import get_current_admin
+from app.utils.fieldsets import Fieldset, sparse_response
+from app.utils.pagination import enforce_page_size, with_total_count
 
 router = APIRouter(prefix="/addons", tags=["Add-ons"])
 
+ADDON_FIELDSET = Fieldset(AddOnResponse)
+
 
 @router.get("/", response_model=List[AddOnResponse])
 def get_addons(
-    skip: int = 0,
-    limit: int = 100,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1),
     category: str = None,
     active_only: bool = True,
-    db: Session = Depends(get_db)
+    stream: bool = False,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (id is always included)"),
+    with_total: bool = Query(False, description="Report the total count in X-Total-Count"),
+    response: Response = None,
+    db: Session = Depends(get_read_db)
 ):
     """
     Get all add-ons (public endpoint).
@@ -31,21 +44,46 @@ def get_addons(
         limit: Maximum number of records to return
         category: Filter by category (optional)
         active_only: Show only active add-ons
+        stream: Stream the JSON array in chunks (not subject to MAX_PAGE_SIZE)
+        fields: Sparse fieldset; only these columns are loaded and returned
+        with_total: Report the total count in the X-Total-Count header
+        response: Response the total header is set on
         db: Database session
 
     Returns:
         List of add-ons
+
+    Raises:
+        HTTPException: If limit exceeds MAX_PAGE_SIZE without streaming, or a field is unknown
     """
-    query = db.query(AddOn)
+    enforce_page_size(limit, stream)
+    selection = ADDON_FIELDSET.resolve(fields, None)
+    schema = ADDON_FIELDSET.model_for(selection) if selection else AddOnResponse
+
+    def build_query(session: Session):
+        query = session.query(AddOn)
+        if selection:
+            query = query.options(*ADDON_FIELDSET.options(AddOn, selection))
 
-    if active_only:
-        query = query.filter(AddOn.is_active == True)
+        if active_only:
+            query = query.filter(AddOn.is_active == True)
 
-    if category:
-        query = query.filter(AddOn.category == category)
+        if category:
+            query = query.filter(AddOn.category == category)
 
-    addons = query.offset(skip).limit(limit).all()
-    return addons
+        return query.offset(skip).limit(limit)
+
+    if stream:
+        result = stream_query(build_query, schema, db)
+    else:
+        result = build_query(db).all()
+        if selection:
+            result = sparse_response(result, schema)
+
+    if with_total:
+        filters = {"category": category, "active_only": active_only or None}
+        return with_total_count(result, response, total_count(db, "addons", filters, build_query))
+    return result
 
 
 @router.post("/", response_model=AddOnResponse, status_code=status.HTTP_201_CREATED)
@@ -135,6 +173,15 @@ def delete_addon(
             detail="Add-on not found"
         )
 
+    if shard_router.sharded:
+        # The cascade cannot reach booking add-ons on the shards; delete them there first
+        def delete_booking_addons(session: Session) -> None:
+            session.execute(delete(BookingAddOn).where(BookingAddOn.addon_id == addon_id))
+            session.commit()
+
+        shard_router.scatter(db, delete_booking_addons)
+        set_committed_value(addon, "booking_addons", [])
+
     db.delete(addon)
     db.commit()
     return None
@@ -0,0 +1,285 @@
+"""
+Admin router for operational tasks (archival, archived data and request profiles).
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import JSONResponse, PlainTextResponse
+from sqlalchemy import func
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Literal, Optional
+from datetime import date
+
+from app.core.database import get_read_db, shard_router
+from app.core.profiling import profiler
+from app.models.archive import ArchivedBooking, ArchivedBookingAddOn
+from app.models.booking import BookingStatus
+from app.models.package import Package
+from app.models.package_stats import PackageStats
+from app.models.user import User
+from app.schemas.booking import ArchivedBookingResponse
+from app.schemas.package import PackageStatsResponse
+from app.schemas.profiling import ProfileSummary, ProfilingConfig
+from app.services.archival import archive_bookings
+from app.services.recommendations import recommender
+from app.utils.dependencies import get_current_admin, get_read_admin
+from app.utils.pagination import enforce_page_size
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+@router.post("/archive/run")
+def run_archival(
+    older_than_days: Optional[int] = Query(None, ge=0),
+    max_batches: int = Query(10, ge=1),
+    current_admin: User = Depends(get_current_admin)
+):
+    """
+    Archive finished bookings now (admin only).
+
+    Runs at most ``max_batches`` bounded batches; schedule
+    ``python -m scripts.archive_bookings`` for full runs.
+
+    Args:
+        older_than_days: Minimum event age in days (defaults to ARCHIVE_AFTER_DAYS)
+        max_batches: Maximum number of batches to run in this request
+        current_admin: Current authenticated admin
+
+    Returns:
+        Number of bookings archived
+    """
+    archived = archive_bookings(older_than_days=older_than_days, max_batches=max_batches)
+    return {"archived": archived}
+
+
+@router.post("/recommendations/rebuild")
+def rebuild_recommendations(current_admin: User = Depends(get_current_admin)):
+    """
+    Recount add-on co-occurrences and rewrite every recommendation (admin only).
+
+    Args:
+        current_admin: Current authenticated admin
+
+    Returns:
+        Number of recommendation rows written
+    """
+    return {"written": recommender.rebuild()}
+
+
+@router.get("/archive/bookings", response_model=List[ArchivedBookingResponse])
+def search_archived_bookings(
+    user_email: Optional[str] = None,
+    status_filter: Optional[BookingStatus] = None,
+    event_type: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1),
+    db: Session = Depends(get_read_db),
+    current_admin: User = Depends(get_read_admin)
+):
+    """
+    Search archived bookings (admin only).
+
+    Args:
+        user_email: Filter by client email (exact match)
+        status_filter: Filter by final status
+        event_type: Filter by event type (exact match)
+        date_from: Earliest event date (inclusive)
+        date_to: Latest event date (inclusive)
+        skip: Number of records to skip (pagination)
+        limit: Maximum number of records to return
+        db: Database session
+        current_admin: Current authenticated admin
+
+    Returns:
+        Archived bookings, most recent event first (merged over the shards when sharded)
+    """
+    enforce_page_size(limit)
+
+    user_id, shards = None, None
+    if user_email and shard_router.sharded:
+        # Users are global and cannot be joined on a shard: find the client, then search their shard only
+        user_id = db.query(User.id).filter(User.email == user_email).scalar()
+        if user_id is None:
+            return []
+        shards = [shard_router.shard_of(user_id)]
+
+    def build_query(session: Session):
+        query = session.query(ArchivedBooking).options(
+            selectinload(ArchivedBooking.package),
+            selectinload(ArchivedBooking.user),
+            selectinload(ArchivedBooking.booking_addons).selectinload(ArchivedBookingAddOn.addon),
+        )
+
+        if user_id:
+            query = query.filter(ArchivedBooking.user_id == user_id)
+        elif user_email:
+            query = query.join(User, User.id == ArchivedBooking.user_id).filter(User.email == user_email)
+        if status_filter:
+            query = query.filter(ArchivedBooking.status == status_filter)
+        if event_type:
+            query = query.filter(ArchivedBooking.event_type == event_type)
+        if date_from:
+            query = query.filter(ArchivedBooking.event_date >= date_from)
+        if date_to:
+            query = query.filter(ArchivedBooking.event_date <= date_to)
+
+        return query.order_by(ArchivedBooking.event_date.desc()).offset(skip).limit(limit)
+
+    if shard_router.sharded:
+        return shard_router.gather_page(db, build_query, ArchivedBooking.event_date, True, skip, limit, shards)
+    return build_query(db).all()
+
+
+@router.get("/package-stats", response_model=List[PackageStatsResponse])
+def get_package_stats(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1),
+    db: Session = Depends(get_read_db),
+    current_admin: User = Depends(get_read_admin)
+):
+    """
+    Package popularity and conversion rates (admin only).
+
+    Counts are those flushed to package_stats; each worker holds back up to
+    POPULARITY_FLUSH_SECONDS of increments.
+
+    Args:
+        skip: Number of records to skip (pagination)
+        limit: Maximum number of records to return
+        db: Database session
+        current_admin: Current authenticated admin
+
+    Returns:
+        Packages, most booked first
+    """
+    enforce_page_size(limit)
+
+    views = func.coalesce(PackageStats.view_count, 0)
+    quotes = func.coalesce(PackageStats.quote_count, 0)
+    bookings = func.coalesce(PackageStats.booking_count, 0)
+    rows = (
+        db.query(Package.id, Package.title, views, quotes, bookings)
+        .outerjoin(PackageStats, PackageStats.package_id == Package.id)
+        .order_by(bookings.desc(), quotes.desc(), views.desc(), Package.id)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+    return [
+        PackageStatsResponse(
+            package_id=package_id,
+            title=title,
+            view_count=view_count,
+            quote_count=quote_count,
+            booking_count=booking_count,
+            view_to_booking=booking_count / view_count if view_count else None,
+            quote_to_booking=booking_count / quote_count if quote_count else None,
+        )
+        for package_id, title, view_count, quote_count, booking_count in rows
+    ]
+
+
+@router.get("/profiles", response_model=List[ProfileSummary])
+def list_profiles(current_admin: User = Depends(get_current_admin)):
+    """
+    List recent request profiles of this worker, newest first (admin only).
+
+    Requests are profiled when sent by an admin with ``X-Profile: 1``, when
+    they match a configured route, or at the configured sample rate; the
+    response of a profiled request carries its ``X-Profile-Id``.
+
+    Args:
+        current_admin: Current authenticated admin
+
+    Returns:
+        Profile summaries
+    """
+    return [profile.summary() for profile in profiler.list()]
+
+
+@router.get("/profiles/{profile_id}")
+def download_profile(
+    profile_id: str,
+    format: Literal["collapsed", "speedscope"] = "speedscope",
+    current_admin: User = Depends(get_current_admin)
+):
+    """
+    Download a request profile (admin only).
+
+    ``collapsed`` is one ``frame;frame;... count`` line per stack, for
+    flamegraph.pl or inferno; ``speedscope`` is a file for speedscope.app
+    with the stack samples and a second profile of the SQL statements.
+
+    Args:
+        profile_id: Profile ID (from X-Profile-Id or the list)
+        format: Download format
+        current_admin: Current authenticated admin
+
+    Returns:
+        The profile as a file download
+
+    Raises:
+        HTTPException: If the profile is not (or no longer) stored
+    """
+    profile = profiler.get(profile_id)
+    if not profile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+
+    if format == "collapsed":
+        return PlainTextResponse(
+            profile.collapsed_stacks(),
+            headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.folded"'},
+        )
+    return JSONResponse(
+        profile.speedscope(profiler.interval_ms),
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.speedscope.json"'},
+    )
+
+
+@router.get("/profiling", response_model=ProfilingConfig)
+def get_profiling_config(current_admin: User = Depends(get_current_admin)):
+    """
+    Get this worker's profiling triggers (admin only).
+
+    Args:
+        current_admin: Current authenticated admin
+
+    Returns:
+        Sample rate and always-profiled routes
+    """
+    return ProfilingConfig(sample_rate=profiler.sample_rate, routes=profiler.routes)
+
+
+@router.put("/profiling", response_model=ProfilingConfig)
+def update_profiling_config(
+    config: ProfilingConfig,
+    current_admin: User = Depends(get_current_admin)
+):
+    """
+    Change this worker's profiling triggers until restart (admin only).
+
+    Other workers keep their own settings; use PROFILE_SAMPLE_RATE and
+    PROFILE_ROUTES to configure every worker.
+
+    Args:
+        config: Sample rate and always-profiled routes
+        current_admin: Current authenticated admin
+
+    Returns:
+        The applied configuration
+
+    Raises:
+        HTTPException: If a route entry is not "METHOD /path"
+    """
+    try:
+        profiler.set_routes(config.routes)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    profiler.sample_rate = config.sample_rate
+    return ProfilingConfig(sample_rate=profiler.sample_rate, routes=profiler.routes)
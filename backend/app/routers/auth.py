@@ -1,10 +1,20 @@
 """
 Authentication router for user registration and login.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from contextlib import contextmanager
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_db, get_read_db
+from app.core.rate_limit import (
+    auth_ip_limiter,
+    auth_email_limiter,
+    hit_all,
+    password_hash_admission,
+    retry_after_header,
+)
 from app.core.security import verify_password, get_password_hash, create_access_token
 from app.models.user import User
 from app.schemas.user import UserCreate, UserLogin, UserResponse, Token
@@ -12,21 +22,66 @@ from app.schemas.user import UserCreate, UserLogin, UserResponse, Token
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
+def _enforce_rate_limits(request: Request, action: str, email: str):
+    """
+    Apply the per-IP and per-email token buckets for an auth action.
+
+    A token is taken from both buckets only when both have one.
+
+    Raises:
+        HTTPException: 429 with Retry-After if either bucket is empty
+    """
+    client_ip = request.client.host if request.client else "unknown"
+    retry_after = hit_all(
+        (auth_ip_limiter, f"{action}:{client_ip}"),
+        (auth_email_limiter, f"{action}:{email.lower()}"),
+    )
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many attempts. Please try again later.",
+            headers={"Retry-After": retry_after_header(retry_after)}
+        )
+
+
+@contextmanager
+def _password_hash_slot():
+    """
+    Admission control around bcrypt work.
+
+    Raises:
+        HTTPException: 429 with Retry-After if the pending-hash queue is full
+    """
+    if not password_hash_admission.try_acquire():
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Server is busy. Please try again shortly.",
+            headers={"Retry-After": retry_after_header(settings.AUTH_SHED_RETRY_AFTER_SECONDS)}
+        )
+    try:
+        yield
+    finally:
+        password_hash_admission.release()
+
+
 @router.post("/register", response_model=Token, status_code=status.HTTP_201_CREATED)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
+def register(user_data: UserCreate, request: Request, db: Session = Depends(get_db)):
     """
     Register a new user.
 
     Args:
         user_data: User registration data
+        request: Incoming request (client address for rate limiting)
         db: Database session
 
     Returns:
         JWT token and user information
 
     Raises:
-        HTTPException: If email already exists
+        HTTPException: If email already exists or the request is rate limited
     """
+    _enforce_rate_limits(request, "register", user_data.email)
+
     # Check if user already exists
     existing_user = db.query(User).filter(User.email == user_data.email).first()
     if existing_user:
@@ -36,7 +91,8 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
         )
 
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    with _password_hash_slot():
+        hashed_password = get_password_hash(user_data.password)
     new_user = User(
         email=user_data.email,
         password=hashed_password,
@@ -66,20 +122,23 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=Token)
-def login(credentials: UserLogin, db: Session = Depends(get_db)):
+def login(credentials: UserLogin, request: Request, db: Session = Depends(get_read_db)):
     """
     Login with email and password.
 
     Args:
         credentials: User login credentials
+        request: Incoming request (client address for rate limiting)
         db: Database session
 
     Returns:
         JWT token and user information
 
     Raises:
-        HTTPException: If credentials are invalid
+        HTTPException: If credentials are invalid or the request is rate limited
     """
+    _enforce_rate_limits(request, "login", credentials.email)
+
     # Find user by email
     user = db.query(User).filter(User.email == credentials.email).first()
     if not user:
@@ -89,7 +148,9 @@ def login(credentials: UserLogin, db: Session = Depends(get_db)):
         )
 
     # Verify password
-    if not verify_password(credentials.password, user.password):
+    with _password_hash_slot():
+        password_ok = verify_password(credentials.password, user.password)
+    if not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
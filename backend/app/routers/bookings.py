@@ -1,23 +1,85 @@
 """
 Booking router for managing client bookings.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Literal, Optional
 from uuid import UUID
 from datetime import date, datetime
 from decimal import Decimal
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_db, get_read_db, shard_router
+from app.core.events import publish_after_commit
+from app.core.streaming import stream_merged_query, stream_query
 from app.models.booking import Booking, BookingAddOn, BookingStatus
+from app.models.archive import ArchivedBooking, ArchivedBookingAddOn
 from app.models.package import Package
 from app.models.addon import AddOn
 from app.models.user import User
-from app.schemas.booking import BookingCreate, BookingUpdate, BookingResponse, BookingDetailResponse
-from app.utils.dependencies import get_current_user, get_current_admin
+from app.schemas.booking import (
+    BookingCreate,
+    BookingUpdate,
+    BookingResponse,
+    BookingDetailResponse,
+    BookingBatchResponse,
+    QuoteRequest,
+    QuoteResponse,
+    NearbyBooking,
+    RouteClusterReport,
+)
+from app.services import booking_summary  # noqa: F401 - keeps user_booking_summary in step with booking writes
+from app.services.booking_search import BookingSearch, LOCATION_MIN_LENGTH
+from app.services.counts import total_count
+from app.services.demand import apply_multiplier, demand_pricing, honour_quote
+from app.services.geo_search import nearby_bookings, route_clusters
+from app.services.popularity import popularity
+from app.services.pricing import quote_many
+from app.services.recommendations import recommender
+from app.utils.batch import parse_id_list, redirect_to_list
+from app.utils.dependencies import get_current_user, get_current_admin, get_read_user, get_read_admin
+from app.utils.fieldsets import Fieldset, sparse_response
+from app.utils.lookups import booking_by_id, package_by_id
+from app.utils.pagination import enforce_page_size, with_total_count
 
 router = APIRouter(prefix="/bookings", tags=["Bookings"])
 
+# Relationships serialized by BookingDetailResponse, loaded in batches
+BOOKING_DETAIL_OPTIONS = (
+    selectinload(Booking.package),
+    selectinload(Booking.user),
+    selectinload(Booking.booking_addons).selectinload(BookingAddOn.addon),
+)
+ARCHIVED_BOOKING_DETAIL_OPTIONS = (
+    selectinload(ArchivedBooking.package),
+    selectinload(ArchivedBooking.user),
+    selectinload(ArchivedBooking.booking_addons).selectinload(ArchivedBookingAddOn.addon),
+)
+
+# ?fields= / ?include= on booking lists; relationships are only loaded when included
+BOOKING_FIELDSET = Fieldset(
+    BookingDetailResponse,
+    relationships={
+        "package": ("package",),
+        "user": ("user",),
+        "addons": ("booking_addons", "addon"),
+    },
+    foreign_keys={"package": "package_id", "user": "user_id"},
+)
+
+FIELDS_DESCRIPTION = "Comma-separated fields to return (id is always included)"
+INCLUDE_DESCRIPTION = "Comma-separated relationships to embed: package, user, addons"
+
+
+def gather_bookings(db: Session, build_query, schema, selection, stream: bool, order_by, descending: bool,
+                    skip: int, limit: int, shards=None):
+    """Scatter an admin booking list over the shards and k-way merge the pages (or streams) on ``order_by``."""
+    if stream:
+        return stream_merged_query(build_query, schema, db, order_by, descending, skip, limit, shards)
+    result = shard_router.gather_page(db, build_query, order_by, descending, skip, limit, shards)
+    return sparse_response(result, schema) if selection else result
+
 
 @router.post("/", response_model=BookingResponse, status_code=status.HTTP_201_CREATED)
 def create_booking(
@@ -40,7 +102,7 @@ def create_booking(
         HTTPException: If package not found or event date is in the past
     """
     # Validate package exists
-    package = db.query(Package).filter(Package.id == booking_data.package_id).first()
+    package = package_by_id(db, booking_data.package_id)
     if not package or not package.is_active:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -54,26 +116,38 @@ def create_booking(
             detail="Event date must be in the future"
         )
 
-    # Calculate total price
-    total_price = package.price
+    # Calculate total price (package price adjusted for demand on the event date,
+    # keeping a recently quoted multiplier that is still close to this worker's)
+    multiplier = honour_quote(
+        demand_pricing.multiplier(booking_data.event_date),
+        booking_data.quote_token,
+        booking_data.package_id,
+        booking_data.event_date,
+    )
+    total_price = apply_multiplier(package.price, multiplier)
 
-    # Create booking
+    # Bookings live on their owner's shard. The ID is assigned here (hashing to
+    # that shard), so the add-ons can reference it before the flush
+    shard_router.route(db, current_user.id)
     new_booking = Booking(
+        id=shard_router.new_id(current_user.id),
         user_id=current_user.id,
         package_id=booking_data.package_id,
         event_type=booking_data.event_type,
         event_date=booking_data.event_date,
         event_time=booking_data.event_time,
         location=booking_data.location,
+        latitude=booking_data.latitude,
+        longitude=booking_data.longitude,
         notes=booking_data.notes,
         total_price=total_price,
         status=BookingStatus.PENDING
     )
 
     db.add(new_booking)
-    db.flush()  # Get booking ID without committing
 
     # Add add-ons if provided
+    booked_addon_ids = []
     if booking_data.addon_ids:
         for addon_item in booking_data.addon_ids:
             addon = db.query(AddOn).filter(AddOn.id == addon_item.addon_id).first()
@@ -84,35 +158,77 @@ def create_booking(
                     quantity=addon_item.quantity
                 )
                 db.add(booking_addon)
+                booked_addon_ids.append(addon.id)
                 total_price += addon.price * addon_item.quantity
 
     # Update total price
     new_booking.total_price = total_price
 
+    publish_after_commit(db, current_user.id, "booking.created", {
+        "booking_id": new_booking.id,
+        "status": new_booking.status.value,
+    })
     db.commit()
+    popularity.record_booking(new_booking.package_id)
+    recommender.record_booking(new_booking.package_id, booked_addon_ids)
     db.refresh(new_booking)
     return new_booking
 
 
+@router.post("/quote", response_model=QuoteResponse)
+def quote_bookings(quote_request: QuoteRequest):
+    """
+    Price many candidate bookings in one call (public endpoint).
+
+    Uses the same rules as booking creation: inactive or unknown add-ons are
+    ignored, combinations with an unavailable package get an error
+    instead of a price, and candidates with an ``event_date`` get that
+    date's demand multiplier on the package price.
+
+    Args:
+        quote_request: Candidate (package, add-ons, quantities) combinations
+
+    Returns:
+        One quote per candidate, in request order
+
+    Raises:
+        HTTPException: If more than QUOTE_MAX_ITEMS candidates are sent
+    """
+    if len(quote_request.quotes) > settings.QUOTE_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.QUOTE_MAX_ITEMS} quotes per request"
+        )
+
+    quotes = quote_many(quote_request.quotes)
+    # Only packages the price table knows count, so unknown IDs never reach package_stats
+    popularity.record_quotes(quote["package_id"] for quote in quotes if quote["error"] is None)
+    return {"quotes": quotes}
+
+
 @router.get("/user/{user_id}", response_model=List[BookingDetailResponse])
 def get_user_bookings(
     user_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_read_user)
 ):
     """
     Get all bookings for a specific user.
 
     Args:
         user_id: User UUID
+        fields: Sparse fieldset; only these columns are loaded and returned
+        include: Relationships to embed when ``fields`` is given (all without it)
         db: Database session
         current_user: Current authenticated user
 
     Returns:
-        List of user's bookings
+        List of user's bookings, followed by their archived bookings
 
     Raises:
-        HTTPException: If user tries to access another user's bookings
+        HTTPException: If user tries to access another user's bookings, or a field is unknown
     """
     # Users can only see their own bookings (unless admin)
     if str(current_user.id) != str(user_id) and current_user.role.value != "admin":
@@ -121,17 +237,102 @@ def get_user_bookings(
             detail="Not authorized to view these bookings"
         )
 
-    bookings = db.query(Booking).filter(Booking.user_id == user_id).all()
-    return bookings
+    shard_router.route(db, user_id)
+    selection = BOOKING_FIELDSET.resolve(fields, include)
+    if selection:
+        hot_options = BOOKING_FIELDSET.options(Booking, selection)
+        archived_options = BOOKING_FIELDSET.options(ArchivedBooking, selection)
+    else:
+        hot_options, archived_options = (), ARCHIVED_BOOKING_DETAIL_OPTIONS
+
+    bookings = db.query(Booking).options(*hot_options).filter(Booking.user_id == user_id).all()
+    archived = (
+        db.query(ArchivedBooking)
+        .options(*archived_options)
+        .filter(ArchivedBooking.user_id == user_id)
+        .all()
+    )
+    if selection:
+        return sparse_response(bookings + archived, BOOKING_FIELDSET.model_for(selection))
+    return bookings + archived
+
+
+@router.get("", response_model=BookingBatchResponse)
+def get_bookings_by_ids(
+    request: Request,
+    ids: Optional[List[str]] = Query(None, description="Booking IDs, comma-separated and/or repeated"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_read_user)
+):
+    """
+    Get several bookings by ID in one request.
+
+    All IDs are resolved with one IN query (plus one on the archive for IDs
+    not found in the hot table), per shard in parallel when sharded. Each ID
+    gets its own ok / not_found /
+    forbidden marker instead of failing the whole request. Without ``ids``
+    the request is redirected to the booking list (``GET /bookings/``).
+
+    Args:
+        request: Incoming request, for the redirect
+        ids: Booking UUIDs
+        db: Database session
+        current_user: Current authenticated user
+
+    Returns:
+        Results keyed by booking ID
+
+    Raises:
+        HTTPException: If the ID list is invalid or too long
+    """
+    if ids is None:
+        return redirect_to_list(request)
+    booking_ids = parse_id_list(ids, "ids")
+    is_admin = current_user.role.value == "admin"
+
+    def lookup(session: Session) -> dict:
+        found = {
+            booking.id: booking
+            for booking in session.query(Booking).options(*BOOKING_DETAIL_OPTIONS).filter(Booking.id.in_(booking_ids))
+        }
+        missing = [booking_id for booking_id in booking_ids if booking_id not in found]
+        if missing:
+            found.update(
+                (booking.id, booking)
+                for booking in session.query(ArchivedBooking)
+                .options(*ARCHIVED_BOOKING_DETAIL_OPTIONS)
+                .filter(ArchivedBooking.id.in_(missing))
+            )
+        return found
+
+    found = {}
+    for shard_found in shard_router.scatter(db, lookup):
+        found.update(shard_found)
+
+    results = {}
+    for booking_id in booking_ids:
+        booking = found.get(booking_id)
+        if booking is None:
+            results[booking_id] = {"status": "not_found", "detail": "Booking not found"}
+        elif booking.user_id != current_user.id and not is_admin:
+            results[booking_id] = {"status": "forbidden", "detail": "Not authorized to view this booking"}
+        else:
+            results[booking_id] = {"status": "ok", "booking": booking}
+    return {"results": results}
 
 
 @router.get("/", response_model=List[BookingDetailResponse])
 def get_all_bookings(
-    skip: int = 0,
-    limit: int = 100,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1),
     status_filter: str = None,
-    db: Session = Depends(get_db),
-    current_admin: User = Depends(get_current_admin)
+    stream: bool = False,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION),
+    with_total: bool = Query(False, description="Report the total count in X-Total-Count"),
+    response: Response = None,
+    db: Session = Depends(get_read_db),
+    current_admin: User = Depends(get_read_admin)
 ):
     """
     Get all bookings (admin only).
@@ -140,26 +341,229 @@ def get_all_bookings(
         skip: Number of records to skip (pagination)
         limit: Maximum number of records to return
         status_filter: Filter by status (optional)
+        stream: Stream the JSON array in chunks (not subject to MAX_PAGE_SIZE)
+        fields: Sparse fieldset; only these columns are loaded and returned
+        include: Relationships to embed when ``fields`` is given (all without it)
+        with_total: Report the total count in the X-Total-Count header
+        response: Response the total header is set on
+        db: Database session
+        current_admin: Current authenticated admin
+
+    Returns:
+        List of all bookings, newest first
+
+    Raises:
+        HTTPException: If limit exceeds MAX_PAGE_SIZE without streaming, or a field is unknown
+    """
+    enforce_page_size(limit, stream)
+    selection = BOOKING_FIELDSET.resolve(fields, include)
+    if selection:
+        options = BOOKING_FIELDSET.options(Booking, selection)
+        schema = BOOKING_FIELDSET.model_for(selection)
+    else:
+        options, schema = BOOKING_DETAIL_OPTIONS, BookingDetailResponse
+
+    def build_query(session: Session):
+        query = session.query(Booking).options(*options)
+
+        if status_filter:
+            query = query.filter(Booking.status == status_filter)
+
+        return query.order_by(Booking.created_at.desc()).offset(skip).limit(limit)
+
+    if shard_router.sharded:
+        result = gather_bookings(db, build_query, schema, selection, stream, Booking.created_at, True, skip, limit)
+    elif stream:
+        result = stream_query(build_query, schema, db)
+    else:
+        result = build_query(db).all()
+        if selection:
+            result = sparse_response(result, schema)
+
+    if with_total:
+        filters = {"status": status_filter}
+        return with_total_count(result, response, total_count(db, "bookings", filters, build_query))
+    return result
+
+
+@router.get("/search", response_model=List[BookingDetailResponse])
+def search_bookings(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    event_type: Optional[str] = None,
+    location: Optional[str] = Query(None, min_length=LOCATION_MIN_LENGTH),
+    price_min: Optional[Decimal] = Query(None, ge=0),
+    price_max: Optional[Decimal] = Query(None, ge=0),
+    client_email: Optional[str] = None,
+    status_filter: Optional[BookingStatus] = None,
+    sort: Literal["-created_at", "created_at", "-event_date", "event_date", "-total_price", "total_price"] = "-created_at",
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1),
+    stream: bool = False,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION),
+    with_total: bool = Query(False, description="Report the total count in X-Total-Count"),
+    response: Response = None,
+    db: Session = Depends(get_read_db),
+    current_admin: User = Depends(get_read_admin)
+):
+    """
+    Search bookings by any combination of filters (admin only).
+
+    Args:
+        date_from: Earliest event date (inclusive)
+        date_to: Latest event date (inclusive)
+        event_type: Event type (exact match)
+        location: Text contained in the location (case-insensitive)
+        price_min: Minimum total price
+        price_max: Maximum total price
+        client_email: Client email (exact match)
+        status_filter: Booking status
+        sort: Sort order; "-" for descending
+        skip: Number of records to skip (pagination)
+        limit: Maximum number of records to return
+        stream: Stream the JSON array in chunks (not subject to MAX_PAGE_SIZE)
+        fields: Sparse fieldset; only these columns are loaded and returned
+        include: Relationships to embed when ``fields`` is given (all without it)
+        with_total: Report the total count in the X-Total-Count header
+        response: Response the total header is set on
         db: Database session
         current_admin: Current authenticated admin
 
     Returns:
-        List of all bookings
+        Matching bookings (archived bookings are not searched)
+
+    Raises:
+        HTTPException: If limit exceeds MAX_PAGE_SIZE without streaming, or a field is unknown
+    """
+    enforce_page_size(limit, stream)
+    selection = BOOKING_FIELDSET.resolve(fields, include)
+    if selection:
+        options = BOOKING_FIELDSET.options(Booking, selection)
+        schema = BOOKING_FIELDSET.model_for(selection)
+    else:
+        options, schema = BOOKING_DETAIL_OPTIONS, BookingDetailResponse
+
+    client_id, shards = None, None
+    if client_email and shard_router.sharded:
+        # Users are global and cannot be joined on a shard: find the client, then search their shard only
+        client_id = db.execute(select(User.id).where(User.email == client_email)).scalar()
+        if client_id is None:
+            return with_total_count([], response, (0, False)) if with_total else []
+        shards = [shard_router.shard_of(client_id)]
+
+    def build_query(session: Session):
+        search = (
+            BookingSearch(session.query(Booking).options(*options), session.get_bind(Booking).dialect.name)
+            .event_dates(date_from, date_to)
+            .event_type(event_type)
+            .location(location)
+            .price_range(price_min, price_max)
+            .status(status_filter)
+        )
+        search = search.client(client_id) if client_id else search.client_email(client_email)
+        return search.sort(sort).statement.offset(skip).limit(limit)
+
+    if shard_router.sharded:
+        order_by, descending = getattr(Booking, sort.lstrip("-")), sort.startswith("-")
+        result = gather_bookings(db, build_query, schema, selection, stream, order_by, descending, skip, limit, shards)
+    elif stream:
+        result = stream_query(build_query, schema, db)
+    else:
+        result = build_query(db).all()
+        if selection:
+            result = sparse_response(result, schema)
+
+    if with_total:
+        filters = {
+            "date_from": date_from, "date_to": date_to, "event_type": event_type, "location": location,
+            "price_min": price_min, "price_max": price_max, "client_email": client_email, "status": status_filter,
+        }
+        return with_total_count(result, response, total_count(db, "bookings", filters, build_query, shards))
+    return result
+
+
+@router.get("/nearby", response_model=List[NearbyBooking])
+def get_nearby_bookings(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius: float = Query(10.0, gt=0, description="Radius in km"),
+    date: Optional[date] = None,
+    status_filter: Optional[BookingStatus] = None,
+    limit: int = Query(50, ge=1),
+    db: Session = Depends(get_read_db),
+    current_admin: User = Depends(get_read_admin)
+):
+    """
+    Find bookings with coordinates near a point, nearest first (admin only).
+
+    Args:
+        lat: Latitude of the centre
+        lon: Longitude of the centre
+        radius: Search radius in km (at most GEO_MAX_RADIUS_KM)
+        date: Only bookings on this event date
+        status_filter: Only bookings with this status
+        limit: Maximum number of records to return
+        db: Database session
+        current_admin: Current authenticated admin
+
+    Returns:
+        Bookings with their distance in km
+
+    Raises:
+        HTTPException: If the radius or limit is too large
     """
-    query = db.query(Booking)
+    enforce_page_size(limit)
+    if radius > settings.GEO_MAX_RADIUS_KM:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"radius must be at most {settings.GEO_MAX_RADIUS_KM} km"
+        )
 
-    if status_filter:
-        query = query.filter(Booking.status == status_filter)
+    return [
+        {"booking": booking, "distance_km": distance}
+        for booking, distance in nearby_bookings(db, lat, lon, radius, date, status_filter, limit)
+    ]
 
-    bookings = query.offset(skip).limit(limit).all()
-    return bookings
+
+@router.get("/route-clusters", response_model=RouteClusterReport)
+def get_route_clusters(
+    date: date,
+    max_distance: Optional[float] = Query(None, gt=0, description="Linking distance in km"),
+    db: Session = Depends(get_read_db),
+    current_admin: User = Depends(get_read_admin)
+):
+    """
+    Same-day route clustering report (admin only).
+
+    Located bookings of the day are grouped so that bookings within
+    ``max_distance`` km of each other share a cluster; bookings without
+    coordinates are listed separately.
+
+    Args:
+        date: Event date to report on
+        max_distance: Linking distance in km (defaults to ROUTE_CLUSTER_DISTANCE_KM)
+        db: Database session
+        current_admin: Current authenticated admin
+
+    Returns:
+        Clusters with their stops in event time order
+    """
+    if max_distance is None:
+        max_distance = settings.ROUTE_CLUSTER_DISTANCE_KM
+    if max_distance > settings.GEO_MAX_RADIUS_KM:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"max_distance must be at most {settings.GEO_MAX_RADIUS_KM} km"
+        )
+    return route_clusters(db, date, max_distance)
 
 
 @router.get("/{booking_id}", response_model=BookingDetailResponse)
 def get_booking(
     booking_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_read_user)
 ):
     """
     Get a specific booking by ID.
@@ -170,12 +574,14 @@ def get_booking(
         current_user: Current authenticated user
 
     Returns:
-        Booking details
+        Booking details (from the archive if the booking has been archived)
 
     Raises:
         HTTPException: If booking not found or not authorized
     """
-    booking = db.query(Booking).filter(Booking.id == booking_id).first()
+    booking = booking_by_id(db, booking_id)
+    if not booking:
+        booking = db.query(ArchivedBooking).filter(ArchivedBooking.id == booking_id).first()
     if not booking:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -214,7 +620,7 @@ def update_booking_status(
     Raises:
         HTTPException: If booking not found
     """
-    booking = db.query(Booking).filter(Booking.id == booking_id).first()
+    booking = booking_by_id(db, booking_id)
     if not booking:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -226,6 +632,10 @@ def update_booking_status(
     for key, value in update_data.items():
         setattr(booking, key, value)
 
+    publish_after_commit(db, booking.user_id, "booking.updated", {
+        "booking_id": booking.id,
+        "status": booking.status.value,
+    })
     db.commit()
     db.refresh(booking)
     return booking
@@ -0,0 +1,315 @@
+"""
+Crew router: staff, crew assignments and automatic crew scheduling (admin only).
+"""
+from datetime import date, datetime, time, timedelta
+from typing import List, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import get_db, get_read_db
+from app.models.staff import CREW_REQUIREMENTS, CrewAssignment, StaffMember, StaffRole
+from app.models.user import User
+from app.schemas.crew import (
+    AutoAssignRequest,
+    AutoAssignResponse,
+    CrewAssignmentCreate,
+    CrewAssignmentResponse,
+    StaffCreate,
+    StaffResponse,
+    StaffUpdate,
+)
+from app.services.crew import ScheduleConflictError, auto_assign, check_assignment, lock_schedules, schedule_lock
+from app.utils.dependencies import get_current_admin, get_read_admin
+from app.utils.lookups import booking_by_id
+from app.utils.pagination import enforce_page_size
+
+router = APIRouter(prefix="/crew", tags=["Crew"])
+
+
+@router.get("/staff", response_model=List[StaffResponse])
+def get_staff(
+    role: Optional[StaffRole] = None,
+    active_only: bool = True,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1),
+    db: Session = Depends(get_read_db),
+    current_admin: User = Depends(get_read_admin)
+):
+    """
+    List staff members (admin only).
+
+    Args:
+        role: Filter by role (optional)
+        active_only: Show only active staff
+        skip: Number of records to skip (pagination)
+        limit: Maximum number of records to return
+        db: Database session
+        current_admin: Current authenticated admin
+
+    Returns:
+        List of staff members
+    """
+    enforce_page_size(limit)
+    query = db.query(StaffMember)
+    if role:
+        query = query.filter(StaffMember.role == role)
+    if active_only:
+        query = query.filter(StaffMember.is_active == True)
+    return query.order_by(StaffMember.full_name).offset(skip).limit(limit).all()
+
+
+@router.post("/staff", response_model=StaffResponse, status_code=status.HTTP_201_CREATED)
+def create_staff(
+    staff_data: StaffCreate,
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_admin)
+):
+    """
+    Add a staff member (admin only).
+
+    Args:
+        staff_data: Staff creation data
+        db: Database session
+        current_admin: Current authenticated admin
+
+    Returns:
+        Created staff member
+
+    Raises:
+        HTTPException: If the email is already in use
+    """
+    if db.query(StaffMember).filter(StaffMember.email == staff_data.email).first():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
+
+    staff = StaffMember(**staff_data.model_dump())
+    db.add(staff)
+    db.commit()
+    db.refresh(staff)
+    return staff
+
+
+@router.put("/staff/{staff_id}", response_model=StaffResponse)
+def update_staff(
+    staff_id: UUID,
+    staff_data: StaffUpdate,
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_admin)
+):
+    """
+    Update a staff member (admin only).
+
+    Deactivated staff keep their existing assignments but are no longer
+    picked by auto-assignment.
+
+    Args:
+        staff_id: Staff member UUID
+        staff_data: Staff update data
+        db: Database session
+        current_admin: Current authenticated admin
+
+    Returns:
+        Updated staff member
+
+    Raises:
+        HTTPException: If the staff member is not found
+    """
+    staff = db.query(StaffMember).filter(StaffMember.id == staff_id).first()
+    if not staff:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Staff member not found"
+        )
+
+    for key, value in staff_data.model_dump(exclude_unset=True).items():
+        setattr(staff, key, value)
+
+    db.commit()
+    db.refresh(staff)
+    return staff
+
+
+@router.get("/assignments", response_model=List[CrewAssignmentResponse])
+def get_assignments(
+    staff_id: Optional[UUID] = None,
+    booking_id: Optional[UUID] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1),
+    db: Session = Depends(get_read_db),
+    current_admin: User = Depends(get_read_admin)
+):
+    """
+    List crew assignments in start order (admin only).
+
+    Args:
+        staff_id: Filter by staff member (optional)
+        booking_id: Filter by booking (optional)
+        date_from: Earliest start date (inclusive)
+        date_to: Latest start date (inclusive)
+        skip: Number of records to skip (pagination)
+        limit: Maximum number of records to return
+        db: Database session
+        current_admin: Current authenticated admin
+
+    Returns:
+        List of crew assignments
+    """
+    enforce_page_size(limit)
+    query = db.query(CrewAssignment)
+    if staff_id:
+        query = query.filter(CrewAssignment.staff_id == staff_id)
+    if booking_id:
+        query = query.filter(CrewAssignment.booking_id == booking_id)
+    if date_from:
+        query = query.filter(CrewAssignment.starts_at >= datetime.combine(date_from, time.min))
+    if date_to:
+        query = query.filter(CrewAssignment.starts_at < datetime.combine(date_to + timedelta(days=1), time.min))
+    return query.order_by(CrewAssignment.starts_at).offset(skip).limit(limit).all()
+
+
+@router.post("/assignments", response_model=CrewAssignmentResponse, status_code=status.HTTP_201_CREATED)
+def create_assignment(
+    assignment_data: CrewAssignmentCreate,
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_admin)
+):
+    """
+    Assign a staff member to a booking by hand (admin only).
+
+    Args:
+        assignment_data: Booking and staff member
+        db: Database session
+        current_admin: Current authenticated admin
+
+    Returns:
+        Created crew assignment
+
+    Raises:
+        HTTPException: If the booking or staff member is not found, the
+            package does not need the staff member's role, or the staff
+            member is busy at that time
+    """
+    booking = booking_by_id(db, assignment_data.booking_id)
+    if not booking:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Booking not found"
+        )
+    staff = db.query(StaffMember).filter(StaffMember.id == assignment_data.staff_id).first()
+    if not staff or not staff.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Staff member not found"
+        )
+    if staff.role not in CREW_REQUIREMENTS[booking.package.category]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"This package does not need a {staff.role.value}"
+        )
+
+    with schedule_lock:
+        lock_schedules(db)
+        already_assigned = db.query(CrewAssignment.id).filter(
+            CrewAssignment.booking_id == booking.id,
+            CrewAssignment.staff_id == staff.id
+        ).first()
+        if already_assigned:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Staff member is already assigned to this booking"
+            )
+        try:
+            starts_at, ends_at = check_assignment(db, staff, booking)
+        except ScheduleConflictError as e:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=str(e)
+            )
+
+        assignment = CrewAssignment(
+            booking_id=booking.id,
+            staff_id=staff.id,
+            role=staff.role,
+            starts_at=starts_at,
+            ends_at=ends_at,
+        )
+        db.add(assignment)
+        db.commit()
+    db.refresh(assignment)
+    return assignment
+
+
+@router.delete("/assignments/{assignment_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_assignment(
+    assignment_id: UUID,
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_admin)
+):
+    """
+    Remove a crew assignment (admin only).
+
+    Args:
+        assignment_id: Crew assignment UUID
+        db: Database session
+        current_admin: Current authenticated admin
+
+    Raises:
+        HTTPException: If the assignment is not found
+    """
+    assignment = db.query(CrewAssignment).filter(CrewAssignment.id == assignment_id).first()
+    if not assignment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Crew assignment not found"
+        )
+
+    db.delete(assignment)
+    db.commit()
+    return None
+
+
+@router.post("/auto-assign", response_model=AutoAssignResponse)
+def run_auto_assign(
+    request: AutoAssignRequest,
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_admin)
+):
+    """
+    Assign crew to pending and approved bookings in a date window (admin only).
+
+    Bookings are staffed in start order; each missing role goes to the
+    least-loaded active staff member of that role who is free, keeping
+    CREW_BUFFER_MINUTES between a staff member's assignments. Roles that
+    cannot be filled are reported, not errors.
+
+    Args:
+        request: Date window and whether to only plan (``dry_run``)
+        db: Database session
+        current_admin: Current authenticated admin
+
+    Returns:
+        Assignments made (or proposed) and roles left unfilled
+
+    Raises:
+        HTTPException: If the window is longer than CREW_MAX_WINDOW_DAYS
+    """
+    if (request.date_to - request.date_from).days + 1 > settings.CREW_MAX_WINDOW_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date window cannot exceed {settings.CREW_MAX_WINDOW_DAYS} days"
+        )
+
+    plan = auto_assign(db, request.date_from, request.date_to, dry_run=request.dry_run)
+    return AutoAssignResponse(
+        dry_run=request.dry_run,
+        assigned=plan.assigned,
+        unfilled=plan.unfilled,
+        elapsed_ms=plan.elapsed_ms,
+    )
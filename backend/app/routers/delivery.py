@@ -1,16 +1,24 @@
 """
 Delivery router for managing final deliverables.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
+from typing import List, Optional
 from uuid import UUID
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db, shard_router
+from app.core.events import publish_after_commit
 from app.models.delivery import Delivery
 from app.models.booking import Booking, BookingStatus
+from app.models.archive import ArchivedBooking, ArchivedDelivery
 from app.models.user import User
-from app.schemas.delivery import DeliveryCreate, DeliveryUpdate, DeliveryResponse
-from app.utils.dependencies import get_current_user, get_current_admin
+from app.schemas.delivery import DeliveryCreate, DeliveryUpdate, DeliveryResponse, DeliveryBatchResponse
+from app.services import booking_summary  # noqa: F401 - records last_delivery_at with each delivery
+from app.utils.batch import parse_id_list, redirect_to_list
+from app.utils.dependencies import get_current_admin, get_read_user
+from app.utils.lookups import booking_by_id, delivery_by_booking_id
 
 router = APIRouter(prefix="/delivery", tags=["Delivery"])
 
@@ -36,7 +44,7 @@ def create_delivery(
         HTTPException: If booking not found, not completed, or delivery already exists
     """
     # Validate booking exists and is completed
-    booking = db.query(Booking).filter(Booking.id == delivery_data.booking_id).first()
+    booking = booking_by_id(db, delivery_data.booking_id)
     if not booking:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -50,7 +58,7 @@ def create_delivery(
         )
 
     # Check if delivery already exists
-    existing_delivery = db.query(Delivery).filter(Delivery.booking_id == delivery_data.booking_id).first()
+    existing_delivery = delivery_by_booking_id(db, delivery_data.booking_id)
     if existing_delivery:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -60,16 +68,87 @@ def create_delivery(
     # Create delivery
     new_delivery = Delivery(**delivery_data.model_dump())
     db.add(new_delivery)
+    publish_after_commit(db, booking.user_id, "delivery.created", {"booking_id": booking.id})
     db.commit()
     db.refresh(new_delivery)
     return new_delivery
 
 
+@router.get("", response_model=DeliveryBatchResponse)
+def get_deliveries_by_booking_ids(
+    request: Request,
+    booking_ids: Optional[List[str]] = Query(None, description="Booking IDs, comma-separated and/or repeated"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_read_user)
+):
+    """
+    Get the deliveries of several bookings in one request.
+
+    Bookings and their deliveries are resolved with one IN query with an
+    outer join (plus one on the archive for bookings not found in the hot
+    table), per shard in parallel when sharded. Each booking ID gets its own
+    ok / not_found / forbidden marker. Without ``booking_ids`` the request
+    is redirected to ``/delivery/``, as before this route existed.
+
+    Args:
+        request: Incoming request, for the redirect
+        booking_ids: Booking UUIDs
+        db: Database session
+        current_user: Current authenticated user
+
+    Returns:
+        Results keyed by booking ID
+
+    Raises:
+        HTTPException: If the ID list is invalid or too long
+    """
+    if booking_ids is None:
+        return redirect_to_list(request)
+    ids = parse_id_list(booking_ids, "booking_ids")
+    is_admin = current_user.role.value == "admin"
+
+    def lookup(session: Session) -> dict:
+        found = {
+            booking_id: (user_id, delivery)
+            for booking_id, user_id, delivery in session.query(Booking.id, Booking.user_id, Delivery)
+            .outerjoin(Delivery, Delivery.booking_id == Booking.id)
+            .filter(Booking.id.in_(ids))
+        }
+        missing = [booking_id for booking_id in ids if booking_id not in found]
+        if missing:
+            found.update(
+                (booking_id, (user_id, delivery))
+                for booking_id, user_id, delivery
+                in session.query(ArchivedBooking.id, ArchivedBooking.user_id, ArchivedDelivery)
+                .outerjoin(ArchivedDelivery, ArchivedDelivery.booking_id == ArchivedBooking.id)
+                .filter(ArchivedBooking.id.in_(missing))
+            )
+        return found
+
+    found = {}
+    for shard_found in shard_router.scatter(db, lookup):
+        found.update(shard_found)
+
+    results = {}
+    for booking_id in ids:
+        if booking_id not in found:
+            results[booking_id] = {"status": "not_found", "detail": "Booking not found"}
+            continue
+        user_id, delivery = found[booking_id]
+        if user_id != current_user.id and not is_admin:
+            results[booking_id] = {"status": "forbidden", "detail": "Not authorized to view this delivery"}
+        elif delivery is None:
+            results[booking_id] = {"status": "not_found", "detail": "Delivery not found for this booking"}
+        else:
+            results[booking_id] = {"status": "ok", "delivery": delivery}
+    return {"results": results}
+
+
 @router.get("/{booking_id}", response_model=DeliveryResponse)
 def get_delivery(
     booking_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_read_user)
 ):
     """
     Get delivery for a booking.
@@ -85,8 +164,11 @@ def get_delivery(
     Raises:
         HTTPException: If delivery not found or not authorized
     """
-    # Get booking to verify ownership
-    booking = db.query(Booking).filter(Booking.id == booking_id).first()
+    # Get booking to verify ownership, falling through to the archive
+    booking = booking_by_id(db, booking_id)
+    archived = booking is None
+    if archived:
+        booking = db.query(ArchivedBooking).filter(ArchivedBooking.id == booking_id).first()
     if not booking:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -101,7 +183,10 @@ def get_delivery(
         )
 
     # Get delivery
-    delivery = db.query(Delivery).filter(Delivery.booking_id == booking_id).first()
+    if archived:
+        delivery = db.query(ArchivedDelivery).filter(ArchivedDelivery.booking_id == booking_id).first()
+    else:
+        delivery = delivery_by_booking_id(db, booking_id)
     if not delivery:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -121,6 +206,9 @@ def update_delivery(
     """
     Update a delivery (admin only).
 
+    Changed content is a redelivery: ``delivered_at`` moves to now, and with
+    it the client's ``last_delivery_at`` summary.
+
     Args:
         booking_id: Booking UUID
         delivery_update: Delivery update data
@@ -133,7 +221,7 @@ def update_delivery(
     Raises:
         HTTPException: If delivery not found
     """
-    delivery = db.query(Delivery).filter(Delivery.booking_id == booking_id).first()
+    delivery = delivery_by_booking_id(db, booking_id)
     if not delivery:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -144,7 +232,11 @@ def update_delivery(
     update_data = delivery_update.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(delivery, key, value)
+    if update_data:
+        # New content is a redelivery
+        delivery.delivered_at = datetime.utcnow()
 
+    publish_after_commit(db, delivery.booking.user_id, "delivery.updated", {"booking_id": delivery.booking_id})
     db.commit()
     db.refresh(delivery)
     return delivery
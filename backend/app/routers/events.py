@@ -0,0 +1,179 @@
+"""
+Events router: server-sent events for booking and delivery changes.
+"""
+import asyncio
+import hashlib
+import secrets
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal, get_db
+from app.core.events import event_broker, format_sse
+from app.models.event_ticket import EventStreamTicket
+from app.models.user import User, UserRole
+from app.schemas.event import EventStreamTicketResponse
+from app.utils.dependencies import get_current_user
+from app.utils.lookups import user_by_id
+
+router = APIRouter(prefix="/events", tags=["Events"])
+
+# EventSource cannot send headers, so the stream also accepts ?ticket= (never the JWT itself)
+optional_security = HTTPBearer(auto_error=False)
+
+
+def _ticket_hash(ticket: str) -> str:
+    return hashlib.sha256(ticket.encode("utf-8")).hexdigest()
+
+
+def _authenticate(token: str):
+    """
+    Resolve the token to (user_id, is_admin) with a short-lived session.
+
+    The stream holds no database session: it may stay open for hours.
+    """
+    db = SessionLocal()
+    try:
+        user = get_current_user(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token), db)
+        return user.id, user.role == UserRole.ADMIN
+    finally:
+        db.close()
+
+
+def _redeem_ticket(ticket: str):
+    """
+    Resolve a stream ticket to (user_id, is_admin), or None, using it up.
+
+    One ``DELETE ... RETURNING`` both checks and consumes the ticket, so of
+    two connections racing with the same ticket (on any worker) only one
+    gets in.
+    """
+    db = SessionLocal()
+    try:
+        user_id = db.execute(
+            delete(EventStreamTicket)
+            .where(
+                EventStreamTicket.ticket_hash == _ticket_hash(ticket),
+                EventStreamTicket.expires_at > datetime.utcnow(),
+            )
+            .returning(EventStreamTicket.user_id)
+        ).scalar()
+        db.commit()
+        user = user_by_id(db, user_id) if user_id is not None else None
+        if user is None:
+            return None
+        return user.id, user.role == UserRole.ADMIN
+    finally:
+        db.close()
+
+
+@router.post("/ticket", response_model=EventStreamTicketResponse)
+def create_stream_ticket(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Issue a single-use ticket for opening the event stream.
+
+    For clients such as EventSource that cannot send the Authorization
+    header: the ticket goes in the stream URL instead of the JWT, is valid
+    for EVENTS_TICKET_SECONDS and opens one connection. Reconnecting needs a
+    new ticket. Expired tickets are removed here.
+
+    Args:
+        db: Database session
+        current_user: Current authenticated user
+
+    Returns:
+        The ticket and its lifetime in seconds
+    """
+    ticket = secrets.token_urlsafe(32)
+    now = datetime.utcnow()
+    db.execute(delete(EventStreamTicket).where(EventStreamTicket.expires_at <= now))
+    db.add(EventStreamTicket(
+        ticket_hash=_ticket_hash(ticket),
+        user_id=current_user.id,
+        expires_at=now + timedelta(seconds=settings.EVENTS_TICKET_SECONDS),
+    ))
+    db.commit()
+    return {"ticket": ticket, "expires_in": settings.EVENTS_TICKET_SECONDS}
+
+
+@router.get("/stream")
+async def stream_events(
+    ticket: Optional[str] = Query(None, description="Single-use ticket from POST /events/ticket, for clients that cannot set headers"),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+    resume_after: Optional[str] = Query(None, alias="last_event_id", description="Last-Event-ID for a new connection"),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+):
+    """
+    Stream booking and delivery changes as server-sent events.
+
+    Clients receive events for their own bookings (admins receive all):
+    ``booking.created``, ``booking.updated``, ``delivery.created`` and
+    ``delivery.updated``, each with the booking ID. A comment line is sent
+    when idle to keep proxies from closing the connection. Reconnecting
+    with ``Last-Event-ID`` replays missed events from a bounded buffer; if
+    they are no longer available a ``resync`` event asks the client to
+    refetch instead. Clients that open a new connection themselves (with a
+    new ticket) pass the ID as ``?last_event_id=``.
+
+    Args:
+        ticket: Ticket from ``POST /events/ticket`` (alternative to the header)
+        last_event_id: ID of the last event the client received
+        resume_after: The same ID as a query parameter
+        credentials: HTTP Bearer token credentials
+
+    Returns:
+        text/event-stream response
+
+    Raises:
+        HTTPException: If no valid token or ticket is given
+    """
+    if credentials:
+        user_id, is_admin = await asyncio.to_thread(_authenticate, credentials.credentials)
+    else:
+        identity = await asyncio.to_thread(_redeem_ticket, ticket) if ticket else None
+        if identity is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Not authenticated",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        user_id, is_admin = identity
+    last_event_id = last_event_id or resume_after
+    heartbeat = settings.EVENTS_HEARTBEAT_SECONDS
+
+    async def generate():
+        subscription, replay, resync = event_broker.subscribe(user_id, is_admin, last_event_id)
+        try:
+            yield f"retry: {settings.EVENTS_RETRY_MILLISECONDS}\n\n".encode("utf-8")
+            if resync:
+                yield format_sse(event_type="resync")
+            for server_event in replay:
+                yield format_sse(server_event)
+
+            while not subscription.overflowed:
+                try:
+                    server_event = await asyncio.wait_for(subscription.queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield b": ping\n\n"
+                    continue
+                yield format_sse(server_event)
+
+            # Events were dropped for this slow client; let it refetch and reconnect
+            yield format_sse(event_type="resync")
+        finally:
+            event_broker.unsubscribe(subscription)
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
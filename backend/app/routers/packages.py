@@ -1,27 +1,53 @@
 """
 Package router for managing photography/videography packages.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import and_, func, or_
 from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import List, Literal, Optional
 from uuid import UUID
+from datetime import date, timedelta
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_db, get_read_db, shard_router
+from app.core.streaming import stream_query
 from app.models.package import Package
+from app.models.archive import ArchivedBooking
+from app.models.booking import Booking
+from app.models.package_stats import PackageStats
+from app.models.addon import AddOn
+from app.models.recommendation import AddOnRecommendation
 from app.models.user import User
-from app.schemas.package import PackageCreate, PackageUpdate, PackageResponse
+from app.schemas.package import PackageCreate, PackageUpdate, PackageResponse, DateAvailability
+from app.schemas.addon import RecommendedAddOn
+from app.services.counts import total_count
+from app.services.demand import apply_multiplier, demand_pricing, multiplier_decimal
+from app.services.popularity import popularity
+from app.services.recommendations import ADDON_SOURCE, PACKAGE_SOURCE
+from app.utils.batch import parse_id_list
 from app.utils.dependencies import get_current_admin
+from app.utils.fieldsets import Fieldset, sparse_response
+from app.utils.lookups import package_by_id
+from app.utils.pagination import enforce_page_size, with_total_count
 
 router = APIRouter(prefix="/packages", tags=["Packages"])
 
+PACKAGE_FIELDSET = Fieldset(PackageResponse)
+
 
 @router.get("/", response_model=List[PackageResponse])
 def get_packages(
-    skip: int = 0,
-    limit: int = 100,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1),
     category: str = None,
     active_only: bool = True,
-    db: Session = Depends(get_db)
+    sort: Optional[Literal["popular"]] = Query(None, description="popular: most booked, then most quoted, then most viewed"),
+    stream: bool = False,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (id is always included)"),
+    with_total: bool = Query(False, description="Report the total count in X-Total-Count"),
+    response: Response = None,
+    db: Session = Depends(get_read_db)
 ):
     """
     Get all packages (public endpoint).
@@ -31,25 +57,59 @@ def get_packages(
         limit: Maximum number of records to return
         category: Filter by category (optional)
         active_only: Show only active packages
+        sort: "popular" orders by flushed booking, quote and view counts
+        stream: Stream the JSON array in chunks (not subject to MAX_PAGE_SIZE)
+        fields: Sparse fieldset; only these columns are loaded and returned
+        with_total: Report the total count in the X-Total-Count header
+        response: Response the total header is set on
         db: Database session
 
     Returns:
         List of packages
+
+    Raises:
+        HTTPException: If limit exceeds MAX_PAGE_SIZE without streaming, or a field is unknown
     """
-    query = db.query(Package)
+    enforce_page_size(limit, stream)
+    selection = PACKAGE_FIELDSET.resolve(fields, None)
+    schema = PACKAGE_FIELDSET.model_for(selection) if selection else PackageResponse
+
+    def build_query(session: Session):
+        query = session.query(Package)
+        if selection:
+            query = query.options(*PACKAGE_FIELDSET.options(Package, selection))
+
+        if active_only:
+            query = query.filter(Package.is_active == True)
+
+        if category:
+            query = query.filter(Package.category == category)
+
+        if sort == "popular":
+            query = query.outerjoin(PackageStats, PackageStats.package_id == Package.id).order_by(
+                func.coalesce(PackageStats.booking_count, 0).desc(),
+                func.coalesce(PackageStats.quote_count, 0).desc(),
+                func.coalesce(PackageStats.view_count, 0).desc(),
+                Package.id,
+            )
 
-    if active_only:
-        query = query.filter(Package.is_active == True)
+        return query.offset(skip).limit(limit)
 
-    if category:
-        query = query.filter(Package.category == category)
+    if stream:
+        result = stream_query(build_query, schema, db)
+    else:
+        result = build_query(db).all()
+        if selection:
+            result = sparse_response(result, schema)
 
-    packages = query.offset(skip).limit(limit).all()
-    return packages
+    if with_total:
+        filters = {"category": category, "active_only": active_only or None}
+        return with_total_count(result, response, total_count(db, "packages", filters, build_query))
+    return result
 
 
 @router.get("/{package_id}", response_model=PackageResponse)
-def get_package(package_id: UUID, db: Session = Depends(get_db)):
+def get_package(package_id: UUID, db: Session = Depends(get_read_db)):
     """
     Get a specific package by ID.
 
@@ -63,15 +123,134 @@ def get_package(package_id: UUID, db: Session = Depends(get_db)):
     Raises:
         HTTPException: If package not found
     """
-    package = db.query(Package).filter(Package.id == package_id).first()
+    package = package_by_id(db, package_id)
     if not package:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Package not found"
         )
+    popularity.record_view(package.id)
     return package
 
 
+@router.get("/{package_id}/availability", response_model=List[DateAvailability])
+def get_package_availability(
+    package_id: UUID,
+    date_from: date,
+    date_to: date,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Demand and demand-adjusted price of a package per date (public endpoint).
+
+    Args:
+        package_id: Package UUID
+        date_from: First date (inclusive)
+        date_to: Last date (inclusive)
+        db: Database session
+
+    Returns:
+        One entry per date, with the price create_booking would charge for the package
+
+    Raises:
+        HTTPException: If package not found or inactive, or the range is invalid
+    """
+    days = (date_to - date_from).days + 1
+    if days < 1 or days > settings.AVAILABILITY_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"date_to must be on or after date_from and at most {settings.AVAILABILITY_MAX_DAYS} days later"
+        )
+
+    package = package_by_id(db, package_id)
+    if not package or not package.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Package not found or not active"
+        )
+
+    curve = demand_pricing.curve()
+    availability = []
+    for offset in range(days):
+        day = date_from + timedelta(days=offset)
+        multiplier = curve.multiplier(day)
+        availability.append(DateAvailability(
+            event_date=day,
+            bookings=curve.bookings(day),
+            multiplier=multiplier_decimal(multiplier),
+            price=apply_multiplier(package.price, multiplier),
+        ))
+    return availability
+
+
+@router.get("/{package_id}/recommended-addons", response_model=List[RecommendedAddOn])
+def get_recommended_addons(
+    package_id: UUID,
+    addon_ids: List[str] = Query([], description="Add-ons already selected (comma-separated or repeated)"),
+    limit: int = Query(5, ge=1, le=50),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Add-ons frequently booked together with a package (public endpoint).
+
+    Served from the precomputed top-k table. With ``addon_ids``, the
+    package's list is merged with each selected add-on's list (scores are
+    summed) and the selected add-ons are left out.
+
+    Args:
+        package_id: Package UUID
+        addon_ids: Add-ons already in the cart
+        limit: Maximum number of add-ons to return
+        db: Database session
+
+    Returns:
+        Active add-ons, best first
+
+    Raises:
+        HTTPException: If package not found, or an add-on ID is malformed
+    """
+    selected = parse_id_list(addon_ids, "addon_ids") if addon_ids else []
+    if not package_by_id(db, package_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Package not found"
+        )
+
+    source = and_(AddOnRecommendation.source_type == PACKAGE_SOURCE, AddOnRecommendation.source_id == package_id)
+    if selected:
+        source = or_(source, and_(
+            AddOnRecommendation.source_type == ADDON_SOURCE, AddOnRecommendation.source_id.in_(selected)
+        ))
+    rows = (
+        db.query(AddOnRecommendation.addon_id, AddOnRecommendation.score, AddOnRecommendation.together_count)
+        .filter(source)
+        .all()
+    )
+
+    merged = {}
+    for addon_id, score, together_count in rows:
+        if addon_id in selected:
+            continue
+        total = merged.setdefault(addon_id, [0.0, 0])
+        total[0] += score
+        total[1] += together_count
+    if not merged:
+        return []
+
+    addons = {
+        addon.id: addon
+        for addon in db.query(AddOn).filter(AddOn.id.in_(list(merged)), AddOn.is_active == True)
+    }
+    ranked = sorted(
+        (addon_id for addon_id in merged if addon_id in addons),
+        key=lambda addon_id: (-merged[addon_id][0], -merged[addon_id][1], str(addon_id)),
+    )
+    return [
+        RecommendedAddOn(addon=addons[addon_id], score=merged[addon_id][0], together_count=merged[addon_id][1])
+        for addon_id in ranked[:limit]
+    ]
+
+
 @router.post("/", response_model=PackageResponse, status_code=status.HTTP_201_CREATED)
 def create_package(
     package_data: PackageCreate,
@@ -121,7 +300,7 @@ def update_package(
     Raises:
         HTTPException: If package not found or not authorized
     """
-    package = db.query(Package).filter(Package.id == package_id).first()
+    package = package_by_id(db, package_id)
     if not package:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -155,20 +334,28 @@ def delete_package(
     Raises:
         HTTPException: If package not found, has bookings, or not authorized
     """
-    package = db.query(Package).filter(Package.id == package_id).first()
+    package = package_by_id(db, package_id)
     if not package:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Package not found"
         )
 
-    # Check if package has bookings
-    if package.bookings:
+    # Check if package has bookings (including archived ones), on every shard
+    def has_bookings(session: Session) -> bool:
+        return (
+            session.query(Booking.id).filter(Booking.package_id == package_id).first() is not None
+            or session.query(ArchivedBooking.id).filter(ArchivedBooking.package_id == package_id).first() is not None
+        )
+
+    if any(shard_router.scatter(db, has_bookings)):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot delete package with existing bookings. Set is_active to False instead."
         )
 
+    # Known to be empty; saves the delete from loading it (from the shards)
+    set_committed_value(package, "bookings", [])
     db.delete(package)
     db.commit()
     return None
@@ -0,0 +1,45 @@
+"""
+Users router for per-user views of the current account.
+"""
+from datetime import date
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db, shard_router
+from app.models.summary import UserBookingSummary
+from app.models.user import User
+from app.schemas.user import UserBookingSummaryResponse
+from app.services.booking_summary import next_upcoming
+from app.utils.dependencies import get_current_user
+
+router = APIRouter(prefix="/users", tags=["Users"])
+
+
+@router.get("/me/summary", response_model=UserBookingSummaryResponse)
+def get_my_summary(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Get the current user's booking summary (one row read).
+
+    Read from the primary so a booking the user just made is reflected.
+
+    Args:
+        current_user: Current authenticated user
+        db: Database session
+
+    Returns:
+        Booking count, total spent, next upcoming booking and last delivery time
+    """
+    shard_router.route(db, current_user.id)
+    summary = db.get(UserBookingSummary, current_user.id)
+    if summary is None:
+        return UserBookingSummaryResponse()
+
+    result = UserBookingSummaryResponse.model_validate(summary)
+    if result.upcoming_event_date is not None and result.upcoming_event_date < date.today():
+        # The stored booking has passed since the last write; find the next one
+        result.upcoming_booking_id, result.upcoming_event_date = next_upcoming(db, current_user.id)
+    return result
@@ -1,17 +1,45 @@
 """
 Pydantic schemas initialization.
 """
-from app.schemas.user import UserCreate, UserLogin, UserResponse, Token, TokenData
-from app.schemas.package import PackageCreate, PackageUpdate, PackageResponse
-from app.schemas.addon import AddOnCreate, AddOnUpdate, AddOnResponse
+from app.schemas.user import UserCreate, UserLogin, UserResponse, Token, TokenData, UserBookingSummaryResponse
+from app.schemas.package import PackageCreate, PackageUpdate, PackageResponse, PackageStatsResponse, DateAvailability
+from app.schemas.addon import AddOnCreate, AddOnUpdate, AddOnResponse, RecommendedAddOn
 from app.schemas.booking import (
     BookingCreate,
     BookingUpdate,
     BookingResponse,
     BookingDetailResponse,
     BookingAddOnItem,
+    ArchivedBookingResponse,
+    BookingBatchItem,
+    BookingBatchResponse,
+    QuoteItem,
+    QuoteRequest,
+    QuoteResult,
+    QuoteResponse,
+    NearbyBooking,
+    RouteStop,
+    RouteCluster,
+    RouteClusterReport,
 )
-from app.schemas.delivery import DeliveryCreate, DeliveryUpdate, DeliveryResponse
+from app.schemas.delivery import (
+    DeliveryCreate,
+    DeliveryUpdate,
+    DeliveryResponse,
+    DeliveryBatchItem,
+    DeliveryBatchResponse,
+)
+from app.schemas.crew import (
+    StaffCreate,
+    StaffUpdate,
+    StaffResponse,
+    CrewAssignmentCreate,
+    CrewAssignmentResponse,
+    AutoAssignRequest,
+    AutoAssignResponse,
+)
+from app.schemas.profiling import ProfileSummary, ProfilingConfig
+from app.schemas.event import EventStreamTicketResponse
 
 __all__ = [
     # User schemas
@@ -20,22 +48,52 @@ __all__ = [
     "UserResponse",
     "Token",
     "TokenData",
+    "UserBookingSummaryResponse",
     # Package schemas
     "PackageCreate",
     "PackageUpdate",
     "PackageResponse",
+    "PackageStatsResponse",
+    "DateAvailability",
     # AddOn schemas
     "AddOnCreate",
     "AddOnUpdate",
     "AddOnResponse",
+    "RecommendedAddOn",
     # Booking schemas
     "BookingCreate",
     "BookingUpdate",
     "BookingResponse",
     "BookingDetailResponse",
     "BookingAddOnItem",
+    "ArchivedBookingResponse",
+    "BookingBatchItem",
+    "BookingBatchResponse",
+    "QuoteItem",
+    "QuoteRequest",
+    "QuoteResult",
+    "QuoteResponse",
+    "NearbyBooking",
+    "RouteStop",
+    "RouteCluster",
+    "RouteClusterReport",
     # Delivery schemas
     "DeliveryCreate",
     "DeliveryUpdate",
     "DeliveryResponse",
+    "DeliveryBatchItem",
+    "DeliveryBatchResponse",
+    # Crew schemas
+    "StaffCreate",
+    "StaffUpdate",
+    "StaffResponse",
+    "CrewAssignmentCreate",
+    "CrewAssignmentResponse",
+    "AutoAssignRequest",
+    "AutoAssignResponse",
+    # Profiling schemas
+    "ProfileSummary",
+    "ProfilingConfig",
+    # Event stream schemas
+    "EventStreamTicketResponse",
 ]
\ No newline at end of file
@@ -44,3 +44,11 @@ class AddOnResponse(AddOnBase):
 
     class Config:
         from_attributes = True
+
+
+# Schema for an add-on recommended with a package
+class RecommendedAddOn(BaseModel):
+    """An add-on frequently booked together with a package (and any selected add-ons)."""
+    addon: AddOnResponse
+    score: float = Field(..., description="Share of the source's bookings that included this add-on (summed over sources)")
+    together_count: int = Field(..., description="Bookings that included both (summed over sources)")
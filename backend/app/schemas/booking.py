@@ -1,13 +1,14 @@
 """
 Pydantic schemas for Booking model.
 """
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional
 from datetime import datetime, date, time
 from uuid import UUID
 from decimal import Decimal
 
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, model_validator
 
+from app.core.config import settings
 from app.models.booking import BookingStatus
 from app.schemas.addon import AddOnResponse
 from app.schemas.package import PackageResponse
@@ -17,7 +18,7 @@ from app.schemas.user import UserResponse
 class BookingAddOnItem(BaseModel):
     """Schema for add-on in booking."""
     addon_id: UUID
-    quantity: int = Field(1, ge=1)
+    quantity: int = Field(1, ge=1, le=settings.ADDON_MAX_QUANTITY)
 
 
 class BookingAddOnResponse(BaseModel):
@@ -42,6 +43,18 @@ class BookingBase(BaseModel):
 class BookingCreate(BookingBase):
     """Schema for creating a booking."""
     addon_ids: Optional[List[BookingAddOnItem]] = Field(default_factory=list)
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+    quote_token: Optional[str] = Field(
+        None, max_length=200,
+        description="quote_token of a quote for this package and date; its multiplier is kept if within DEMAND_QUOTE_TOLERANCE"
+    )
+
+    @model_validator(mode="after")
+    def check_coordinates(self):
+        if (self.latitude is None) != (self.longitude is None):
+            raise ValueError("latitude and longitude must be given together")
+        return self
 
 
 class BookingUpdate(BaseModel):
@@ -61,6 +74,8 @@ class BookingResponse(BaseModel):
     event_date: date
     event_time: time
     location: str
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     status: BookingStatus
     total_price: Decimal
     notes: Optional[str]
@@ -76,3 +91,93 @@ class BookingDetailResponse(BookingResponse):
     package: PackageResponse
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class ArchivedBookingResponse(BookingDetailResponse):
+    """Schema for an archived booking."""
+    archived_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class BookingBatchItem(BaseModel):
+    """One entry of a multi-ID booking lookup."""
+    status: Literal["ok", "not_found", "forbidden"]
+    detail: Optional[str] = None
+    booking: Optional[BookingDetailResponse] = None
+
+
+class BookingBatchResponse(BaseModel):
+    """Schema for a multi-ID booking lookup, keyed by booking ID."""
+    results: Dict[UUID, BookingBatchItem]
+
+
+class QuoteItem(BaseModel):
+    """One candidate package and add-on combination to price."""
+    package_id: UUID
+    addon_ids: Optional[List[BookingAddOnItem]] = Field(default_factory=list)
+    event_date: Optional[date] = Field(None, description="Apply the date's demand multiplier to the package price")
+
+
+class QuoteRequest(BaseModel):
+    """Schema for a batch price-quote request."""
+    quotes: List[QuoteItem] = Field(..., min_length=1)
+
+
+class QuoteResult(BaseModel):
+    """
+    Price of one candidate combination (error set if it cannot be booked).
+
+    ``date_multiplier`` comes from the answering worker's demand curve, which
+    only sees other workers' bookings at its next recount
+    (DEMAND_REFRESH_SECONDS), so booking the same date on another worker may
+    price it differently. Dated quotes carry a signed ``quote_token``
+    (valid for DEMAND_QUOTE_TTL_SECONDS); send it when booking to keep the
+    quoted multiplier while it is within DEMAND_QUOTE_TOLERANCE of the
+    current one.
+    """
+    package_id: UUID
+    package_price: Optional[Decimal] = None
+    addons_price: Optional[Decimal] = None
+    total_price: Optional[Decimal] = None
+    date_multiplier: Optional[Decimal] = None
+    quote_token: Optional[str] = None
+    error: Optional[str] = None
+
+
+class QuoteResponse(BaseModel):
+    """Schema for a batch price-quote response, in request order."""
+    quotes: List[QuoteResult]
+
+
+class NearbyBooking(BaseModel):
+    """A booking within the searched radius."""
+    booking: BookingResponse
+    distance_km: float
+
+
+class RouteStop(BaseModel):
+    """One located booking of a same-day route cluster, in event time order."""
+    booking_id: UUID
+    event_time: time
+    location: str
+    latitude: float
+    longitude: float
+    km_from_previous: Optional[float] = None
+
+
+class RouteCluster(BaseModel):
+    """Bookings of one day that lie within the clustering distance of each other."""
+    cluster: int
+    center_latitude: float
+    center_longitude: float
+    route_km: float = Field(..., description="Distance visiting the stops in event time order")
+    stops: List[RouteStop]
+
+
+class RouteClusterReport(BaseModel):
+    """Same-day route clustering of located bookings."""
+    event_date: date
+    max_distance_km: float
+    clusters: List[RouteCluster]
+    unlocated_booking_ids: List[UUID] = Field(default_factory=list)
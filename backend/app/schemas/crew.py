@@ -0,0 +1,110 @@
+"""
+Pydantic schemas for crew scheduling.
+"""
+from pydantic import BaseModel, EmailStr, Field, model_validator
+from typing import List, Optional
+from datetime import date, datetime
+from uuid import UUID
+
+from app.models.staff import StaffRole
+
+
+# Base schema
+class StaffBase(BaseModel):
+    """Base staff schema."""
+    full_name: str = Field(..., min_length=1, max_length=255)
+    email: EmailStr
+    role: StaffRole
+
+
+# Schema for staff creation
+class StaffCreate(StaffBase):
+    """Schema for adding a staff member."""
+    is_active: Optional[bool] = True
+
+
+# Schema for staff update
+class StaffUpdate(BaseModel):
+    """Schema for updating a staff member."""
+    full_name: Optional[str] = Field(None, min_length=1, max_length=255)
+    email: Optional[EmailStr] = None
+    role: Optional[StaffRole] = None
+    is_active: Optional[bool] = None
+
+
+# Schema for staff response
+class StaffResponse(StaffBase):
+    """Schema for staff response."""
+    id: UUID
+    is_active: bool
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+# Schema for a manual crew assignment
+class CrewAssignmentCreate(BaseModel):
+    """Schema for assigning a staff member to a booking."""
+    booking_id: UUID
+    staff_id: UUID
+
+
+# Schema for crew assignment response
+class CrewAssignmentResponse(BaseModel):
+    """Schema for crew assignment response."""
+    id: UUID
+    booking_id: UUID
+    staff_id: UUID
+    role: StaffRole
+    starts_at: datetime
+    ends_at: datetime
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+# Schema for an auto-assignment run
+class AutoAssignRequest(BaseModel):
+    """Schema for auto-assigning crew to bookings in a date window."""
+    date_from: date
+    date_to: date
+    dry_run: bool = False
+
+    @model_validator(mode="after")
+    def check_window(self):
+        if self.date_to < self.date_from:
+            raise ValueError("date_to must not be before date_from")
+        return self
+
+
+# Schemas for an auto-assignment result
+class PlannedAssignmentItem(BaseModel):
+    """One assignment made (or proposed) by auto-assignment."""
+    booking_id: UUID
+    staff_id: UUID
+    role: StaffRole
+    starts_at: datetime
+    ends_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class UnfilledSlotItem(BaseModel):
+    """A crew role auto-assignment could not fill."""
+    booking_id: UUID
+    role: StaffRole
+    reason: str
+
+    class Config:
+        from_attributes = True
+
+
+class AutoAssignResponse(BaseModel):
+    """Schema for an auto-assignment result."""
+    dry_run: bool
+    assigned: List[PlannedAssignmentItem]
+    unfilled: List[UnfilledSlotItem]
+    elapsed_ms: float
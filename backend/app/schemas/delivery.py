@@ -2,7 +2,7 @@
 Pydantic schemas for Delivery model.
 """
 from pydantic import BaseModel, Field, HttpUrl
-from typing import List, Optional, Dict, Any
+from typing import List, Literal, Optional, Dict, Any
 from datetime import datetime
 from uuid import UUID
 
@@ -49,3 +49,17 @@ class DeliveryResponse(DeliveryBase):
         json_encoders = {
             datetime: lambda v: v.isoformat()
         }
+
+
+# Schema for one entry of a multi-booking delivery lookup
+class DeliveryBatchItem(BaseModel):
+    """One entry of a multi-booking delivery lookup."""
+    status: Literal["ok", "not_found", "forbidden"]
+    detail: Optional[str] = None
+    delivery: Optional[DeliveryResponse] = None
+
+
+# Schema for a multi-booking delivery lookup
+class DeliveryBatchResponse(BaseModel):
+    """Schema for a multi-booking delivery lookup, keyed by booking ID."""
+    results: Dict[UUID, DeliveryBatchItem]
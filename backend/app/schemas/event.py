@@ -0,0 +1,10 @@
+"""
+Pydantic schemas for the event stream.
+"""
+from pydantic import BaseModel, Field
+
+
+class EventStreamTicketResponse(BaseModel):
+    """Schema for a single-use event stream ticket."""
+    ticket: str = Field(..., description="Pass as ?ticket= to GET /events/stream")
+    expires_in: int = Field(..., description="Seconds the ticket stays valid")
@@ -3,7 +3,7 @@ Pydantic schemas for Package model.
 """
 from pydantic import BaseModel, Field
 from typing import List, Optional
-from datetime import datetime
+from datetime import date, datetime
 from uuid import UUID
 from decimal import Decimal
 
@@ -49,3 +49,24 @@ class PackageResponse(PackageBase):
 
     class Config:
         from_attributes = True
+
+
+# Schema for package popularity and conversion
+class PackageStatsResponse(BaseModel):
+    """Flushed view, quote and booking counts of a package, with conversion rates."""
+    package_id: UUID
+    title: str
+    view_count: int = 0
+    quote_count: int = 0
+    booking_count: int = 0
+    view_to_booking: Optional[float] = Field(None, description="Bookings per view (None without views)")
+    quote_to_booking: Optional[float] = Field(None, description="Bookings per quote request (None without quotes)")
+
+
+# Schema for one date of a package's availability
+class DateAvailability(BaseModel):
+    """Demand and demand-adjusted package price on one date."""
+    event_date: date
+    bookings: int = Field(..., description="Bookings holding this date, across all packages")
+    multiplier: Decimal
+    price: Decimal
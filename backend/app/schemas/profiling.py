@@ -0,0 +1,28 @@
+"""
+Pydantic schemas for request profiles.
+"""
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+
+# Schema for a stored profile
+class ProfileSummary(BaseModel):
+    """Summary of a recorded request profile."""
+    id: str
+    method: str
+    path: str
+    route: Optional[str] = None
+    trigger: str = Field(..., description="What started the profile: header, route or sample")
+    status: Optional[int] = None
+    started_at: float
+    duration_ms: Optional[float] = None
+    samples: int
+    sql_statements: int
+    sql_ms: float
+
+
+# Schema for the profiling triggers of this worker
+class ProfilingConfig(BaseModel):
+    """Random sample rate and routes profiled on every request (this worker only)."""
+    sample_rate: float = Field(..., ge=0, le=1)
+    routes: List[str] = Field(default_factory=list, description='Entries like "GET /bookings/search"')
@@ -3,7 +3,8 @@ Pydantic schemas for User model.
 """
 from pydantic import BaseModel, EmailStr, Field
 from typing import Optional
-from datetime import datetime
+from datetime import date, datetime
+from decimal import Decimal
 from uuid import UUID
 
 from app.models.user import UserRole
@@ -57,3 +58,16 @@ class TokenData(BaseModel):
     user_id: UUID
     email: str
     role: UserRole
+
+
+# Schema for the per-user booking summary
+class UserBookingSummaryResponse(BaseModel):
+    """Schema for a client's booking summary."""
+    booking_count: int = 0
+    total_spent: Decimal = Decimal("0.00")
+    upcoming_booking_id: Optional[UUID] = None
+    upcoming_event_date: Optional[date] = None
+    last_delivery_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
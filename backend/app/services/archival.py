@@ -0,0 +1,130 @@
+"""
+Hot/cold archival of finished bookings.
+
+Bookings that are completed or rejected and whose event date is older than
+ARCHIVE_AFTER_DAYS are copied into the ``*_archive`` tables together with
+their add-ons and delivery, then deleted from the hot tables. Each batch is
+its own short transaction, so locks are held only for one bounded batch.
+With sharding the archive tables live next to the hot ones, and the shards
+are archived one after the other.
+"""
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import delete, insert, literal, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal, shard_router
+from app.models.archive import ArchivedBooking, ArchivedBookingAddOn, ArchivedDelivery
+from app.models.booking import Booking, BookingAddOn, BookingStatus
+from app.models.delivery import Delivery
+from app.models.staff import CrewAssignment
+
+ARCHIVABLE_STATUSES = (BookingStatus.COMPLETED, BookingStatus.REJECTED)
+
+
+def _copy_rows(db: Session, source, target, key_column, ids, extra: Optional[Dict] = None) -> None:
+    """INSERT INTO target SELECT ... FROM source WHERE key IN ids, matching columns by name."""
+    columns = [column.name for column in source.__table__.columns]
+    selected = [source.__table__.c[name] for name in columns]
+    target_columns = list(columns)
+    for name, value in (extra or {}).items():
+        selected.append(literal(value).label(name))
+        target_columns.append(name)
+
+    db.execute(
+        insert(target.__table__).from_select(
+            target_columns,
+            select(*selected).where(key_column.in_(ids))
+        )
+    )
+
+
+def archive_batch(db: Session, cutoff: date, batch_size: int) -> int:
+    """
+    Move one batch of finished bookings older than ``cutoff`` to the archive.
+
+    Args:
+        db: Database session (committed by this function)
+        cutoff: Bookings with an event date before this are archived
+        batch_size: Maximum number of bookings to move
+
+    Returns:
+        Number of bookings archived
+    """
+    ids = db.execute(
+        select(Booking.id)
+        .where(Booking.event_date < cutoff, Booking.status.in_(ARCHIVABLE_STATUSES))
+        .order_by(Booking.event_date)
+        .limit(batch_size)
+    ).scalars().all()
+    if not ids:
+        return 0
+
+    archived_at = datetime.utcnow()
+    _copy_rows(db, Booking, ArchivedBooking, Booking.id, ids, extra={"archived_at": archived_at})
+    _copy_rows(db, BookingAddOn, ArchivedBookingAddOn, BookingAddOn.booking_id, ids)
+    _copy_rows(db, Delivery, ArchivedDelivery, Delivery.booking_id, ids)
+
+    # Crew assignments of past events are not archived
+    db.execute(delete(CrewAssignment).where(CrewAssignment.booking_id.in_(ids)))
+    db.execute(delete(Delivery).where(Delivery.booking_id.in_(ids)))
+    db.execute(delete(BookingAddOn).where(BookingAddOn.booking_id.in_(ids)))
+    db.execute(delete(Booking).where(Booking.id.in_(ids)))
+    db.commit()
+    return len(ids)
+
+
+def archive_bookings(
+    older_than_days: int = None,
+    batch_size: int = None,
+    pause_seconds: float = None,
+    max_batches: Optional[int] = None,
+    session_factory: Callable[[], Session] = SessionLocal,
+    progress: Optional[Callable[[int], None]] = None
+) -> int:
+    """
+    Archive finished bookings in bounded batches until none are left, shard by shard.
+
+    Args:
+        older_than_days: Minimum age of the event date (defaults to ARCHIVE_AFTER_DAYS)
+        batch_size: Bookings per transaction (defaults to ARCHIVE_BATCH_SIZE)
+        pause_seconds: Sleep between batches to leave room for live traffic
+        max_batches: Stop after this many batches over all shards (None for no limit)
+        session_factory: Factory for the session each batch runs in
+        progress: Optional callback receiving the running total after each batch
+
+    Returns:
+        Total number of bookings archived
+    """
+    older_than_days = settings.ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+    pause_seconds = settings.ARCHIVE_BATCH_PAUSE_SECONDS if pause_seconds is None else pause_seconds
+    cutoff = date.today() - timedelta(days=older_than_days)
+
+    total = 0
+    batches = 0
+    for shard in range(shard_router.count):
+        while max_batches is None or batches < max_batches:
+            db = session_factory()
+            try:
+                shard_router.use_shard(db, shard)
+                moved = archive_batch(db, cutoff, batch_size)
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+
+            if not moved:
+                break
+            total += moved
+            batches += 1
+            if progress:
+                progress(total)
+            if moved < batch_size:
+                break
+            time.sleep(pause_seconds)
+    return total
@@ -0,0 +1,385 @@
+"""
+Batched online backfills for data migrations.
+
+A single ``UPDATE bookings SET ...`` over millions of rows holds its row
+locks (on SQLite, the database write lock) until the last row is written.
+``run_backfill`` walks the table in primary key order instead: each batch
+reads the next ``batch_size`` keys after the checkpoint, updates that key
+range and moves the checkpoint, all in one short transaction, then sleeps so
+live traffic gets the database in between. The sleep is at least
+``pause_seconds`` and grows with slow batches, so the backfill spends at
+most ``duty_cycle`` of the wall time in batches.
+
+The checkpoint is a ``backfill_checkpoints`` row named after the backfill.
+An interrupted run (or a failed ``alembic upgrade``) resumes after the last
+committed batch, and two runners of the same backfill lock the row in turn
+instead of repeating work.
+
+Rows written by live traffic behind the checkpoint are not revisited, so
+deploy the code that writes the new value first, and keep the update
+idempotent (``where=column.is_(None)`` for example). Give the backfill its
+own revision after the one changing the schema: the schema change is then
+committed and stamped before the backfill starts, and rerunning ``alembic
+upgrade`` after an interruption only resumes the backfill. Use lightweight
+table definitions rather than the app models::
+
+    # Revision 1: op.add_column("bookings", sa.Column("is_open", sa.Boolean(), nullable=True))
+    # Revision 2:
+    bookings = sa.table("bookings", sa.column("id"), sa.column("status"), sa.column("is_open"))
+    SET_IS_OPEN = Backfill(
+        "bookings_is_open", bookings,
+        values={"is_open": bookings.c.status.in_(["PENDING", "APPROVED"])},
+        where=bookings.c.is_open.is_(None),
+    )
+
+    def upgrade():
+        backfill_in_migration(SET_IS_OPEN)
+
+``python -m scripts.backfill <revision> --dry-run`` estimates how long a
+migration's backfills will take without changing anything: it runs the
+pending migrations up to it in a transaction, times a few batches of each
+backfill and rolls everything back. On PostgreSQL that transaction holds
+the migration's DDL locks for those few batches.
+"""
+import math
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.models.backfill import BackfillCheckpoint
+
+checkpoints = BackfillCheckpoint.__table__
+
+
+class Backfill:
+    """
+    One resumable backfill over a table.
+
+    Args:
+        name: Checkpoint name (unique per backfill, keep it stable)
+        table: Table (or ``sa.table``) to walk
+        values: Column name -> SQL expression for a set-based ``UPDATE``
+        where: Extra condition on the rows to update (with ``values``)
+        apply: Instead of ``values``, a callable ``(connection, keys)``
+            updating the given keys itself and returning the rows it changed
+        key: Primary key column name (single-column keys only)
+        batch_size: Rows per batch (defaults to BACKFILL_BATCH_SIZE)
+        pause_seconds: Minimum sleep between batches (defaults to BACKFILL_PAUSE_SECONDS)
+        duty_cycle: Most of the wall time spent in batches (defaults to BACKFILL_DUTY_CYCLE)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        table,
+        values: Optional[Dict] = None,
+        where=None,
+        apply: Optional[Callable[[Connection, List], Optional[int]]] = None,
+        key: str = "id",
+        batch_size: int = None,
+        pause_seconds: float = None,
+        duty_cycle: float = None
+    ):
+        if (values is None) == (apply is None):
+            raise ValueError("A backfill needs either values or apply")
+        self.name = name
+        self.table = table
+        self.values = values
+        self.where = where
+        self.apply = apply
+        self.key = table.c[key]
+        self.batch_size = batch_size or settings.BACKFILL_BATCH_SIZE
+        self.pause_seconds = settings.BACKFILL_PAUSE_SECONDS if pause_seconds is None else pause_seconds
+        self.duty_cycle = duty_cycle or settings.BACKFILL_DUTY_CYCLE
+
+    def sleep_after(self, batch_seconds: float) -> float:
+        """Seconds to sleep after a batch that took ``batch_seconds``."""
+        return max(self.pause_seconds, batch_seconds * (1 / self.duty_cycle - 1))
+
+    def key_value(self, text: Optional[str]):
+        """Checkpointed key text back to a value comparable with the key column."""
+        if text is None:
+            return None
+        try:
+            python_type = self.key.type.python_type
+        except NotImplementedError:
+            return text
+        return int(text) if issubclass(python_type, int) else text
+
+
+@dataclass
+class BackfillProgress:
+    """Totals of a backfill so far (rows and batches include earlier runs)."""
+
+    name: str
+    rows_visited: int
+    rows_updated: int
+    batches: int
+    total_rows: int
+    elapsed_seconds: float  # This run only
+    rows_this_run: int
+    done: bool = False
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        if self.done:
+            return 0.0
+        if not self.rows_this_run:
+            return None
+        remaining = max(self.total_rows - self.rows_visited, 0)
+        return remaining * self.elapsed_seconds / self.rows_this_run
+
+
+@dataclass
+class BackfillEstimate:
+    """Dry-run projection from a few sample batches (rolled back)."""
+
+    name: str
+    remaining_rows: int
+    batches: int
+    sample_batches: int
+    seconds_per_batch: float
+    sleep_per_batch: float
+    rows_updated_per_batch: float
+
+    @property
+    def estimated_seconds(self) -> float:
+        return self.batches * (self.seconds_per_batch + self.sleep_per_batch)
+
+
+def _read_checkpoint(connection: Connection, backfill: Backfill, lock: bool = False):
+    query = select(checkpoints).where(checkpoints.c.name == backfill.name)
+    if lock:
+        query = query.with_for_update()
+    return connection.execute(query).first()
+
+
+def _ensure_checkpoint(connection: Connection, backfill: Backfill) -> None:
+    """Create the checkpoint row if this backfill has none (not committed)."""
+    if _read_checkpoint(connection, backfill) is None:
+        now = datetime.utcnow()
+        connection.execute(insert(checkpoints).values(
+            name=backfill.name, table_name=backfill.table.name, last_key=None,
+            rows_visited=0, rows_updated=0, batches=0, started_at=now, updated_at=now,
+        ))
+
+
+def _remaining_rows(connection: Connection, backfill: Backfill, last_key: Optional[str]) -> int:
+    query = select(func.count()).select_from(backfill.table)
+    if last_key is not None:
+        query = query.where(backfill.key > backfill.key_value(last_key))
+    return connection.execute(query).scalar()
+
+
+def process_batch(connection: Connection, backfill: Backfill) -> Tuple[int, int]:
+    """
+    Update the next batch after the checkpoint and move the checkpoint.
+
+    Runs in the caller's transaction; the checkpoint row is locked first so
+    concurrent runners of the same backfill take turns.
+
+    Returns:
+        (rows visited, rows updated); (0, 0) once the table is done
+    """
+    checkpoint = _read_checkpoint(connection, backfill, lock=True)
+    if checkpoint.completed_at is not None:
+        return 0, 0
+    after = backfill.key_value(checkpoint.last_key)
+
+    query = select(backfill.key).order_by(backfill.key).limit(backfill.batch_size)
+    if after is not None:
+        query = query.where(backfill.key > after)
+    keys = connection.execute(query).scalars().all()
+    now = datetime.utcnow()
+    if not keys:
+        connection.execute(
+            update(checkpoints).where(checkpoints.c.name == backfill.name)
+            .values(completed_at=now, updated_at=now)
+        )
+        return 0, 0
+
+    if backfill.apply is not None:
+        updated = backfill.apply(connection, keys)
+        updated = len(keys) if updated is None else updated
+    else:
+        # The key range rather than IN (keys): one index range scan
+        statement = update(backfill.table).where(backfill.key <= keys[-1]).values(backfill.values)
+        if after is not None:
+            statement = statement.where(backfill.key > after)
+        if backfill.where is not None:
+            statement = statement.where(backfill.where)
+        updated = max(connection.execute(statement).rowcount, 0)
+
+    connection.execute(
+        update(checkpoints).where(checkpoints.c.name == backfill.name).values(
+            last_key=str(keys[-1]),
+            rows_visited=checkpoints.c.rows_visited + len(keys),
+            rows_updated=checkpoints.c.rows_updated + updated,
+            batches=checkpoints.c.batches + 1,
+            updated_at=now,
+        )
+    )
+    return len(keys), updated
+
+
+def run_backfill(
+    engine: Engine,
+    backfill: Backfill,
+    max_batches: Optional[int] = None,
+    progress: Optional[Callable[[BackfillProgress], None]] = None
+) -> BackfillProgress:
+    """
+    Run (or resume) a backfill until the table is done.
+
+    Every batch is its own transaction on a connection of ``engine``, so
+    call this outside any transaction holding locks on the table (in a
+    migration, use ``backfill_in_migration``).
+
+    Args:
+        engine: Database engine
+        backfill: Backfill to run
+        max_batches: Stop after this many batches (None for no limit)
+        progress: Optional callback receiving the totals after each batch
+
+    Returns:
+        Final totals
+    """
+    with engine.connect() as connection:
+        try:
+            with connection.begin():
+                _ensure_checkpoint(connection, backfill)
+        except IntegrityError:
+            pass  # Another runner created it first
+        with connection.begin():
+            checkpoint = _read_checkpoint(connection, backfill)
+            total = checkpoint.rows_visited + _remaining_rows(connection, backfill, checkpoint.last_key)
+        state = BackfillProgress(
+            name=backfill.name, rows_visited=checkpoint.rows_visited, rows_updated=checkpoint.rows_updated,
+            batches=checkpoint.batches, total_rows=total, elapsed_seconds=0.0, rows_this_run=0,
+            done=checkpoint.completed_at is not None,
+        )
+
+        started = time.perf_counter()
+        batches = 0
+        while not state.done and (max_batches is None or batches < max_batches):
+            batch_started = time.perf_counter()
+            with connection.begin():
+                visited, updated = process_batch(connection, backfill)
+            batch_seconds = time.perf_counter() - batch_started
+
+            batches += 1
+            state.rows_visited += visited
+            state.rows_updated += updated
+            state.rows_this_run += visited
+            state.batches += 1 if visited else 0
+            state.total_rows = max(state.total_rows, state.rows_visited)
+            state.done = not visited
+            state.elapsed_seconds = time.perf_counter() - started
+            if progress:
+                progress(state)
+            if not state.done:
+                time.sleep(backfill.sleep_after(batch_seconds))
+        return state
+
+
+def estimate_backfill(connection: Connection, backfill: Backfill, sample_batches: int = 3) -> BackfillEstimate:
+    """
+    Dry run: time a few batches from the checkpoint.
+
+    The batches run in the caller's transaction, which the caller must roll
+    back (see ``dry_run``).
+
+    Args:
+        connection: Connection inside a transaction
+        backfill: Backfill to estimate
+        sample_batches: Batches to time
+
+    Returns:
+        Projection for the rest of the table
+    """
+    _ensure_checkpoint(connection, backfill)
+    checkpoint = _read_checkpoint(connection, backfill)
+    remaining = 0 if checkpoint.completed_at else _remaining_rows(connection, backfill, checkpoint.last_key)
+    timings, updated_rows = [], 0
+    for _ in range(sample_batches):
+        batch_started = time.perf_counter()
+        visited, updated = process_batch(connection, backfill)
+        if not visited:
+            break
+        timings.append(time.perf_counter() - batch_started)
+        updated_rows += updated
+
+    seconds_per_batch = sum(timings) / len(timings) if timings else 0.0
+    return BackfillEstimate(
+        name=backfill.name,
+        remaining_rows=remaining,
+        batches=math.ceil(remaining / backfill.batch_size),
+        sample_batches=len(timings),
+        seconds_per_batch=seconds_per_batch,
+        sleep_per_batch=backfill.sleep_after(seconds_per_batch),
+        rows_updated_per_batch=updated_rows / len(timings) if timings else 0.0,
+    )
+
+
+# Set by dry_run(): backfill_in_migration estimates into this list instead of running
+_dry_run: Optional[Tuple[List[BackfillEstimate], int]] = None
+
+
+@contextmanager
+def dry_run(sample_batches: int = 3):
+    """
+    Make ``backfill_in_migration`` estimate instead of run.
+
+    Run the migration's ``upgrade()`` in a transaction inside this block and
+    roll it back afterwards; the yielded list collects the estimates.
+    """
+    global _dry_run
+    estimates: List[BackfillEstimate] = []
+    _dry_run = (estimates, sample_batches)
+    try:
+        yield estimates
+    finally:
+        _dry_run = None
+
+
+def print_progress(state: BackfillProgress) -> None:
+    """Progress callback printing one line per batch."""
+    percent = 100.0 * state.rows_visited / state.total_rows if state.total_rows else 100.0
+    eta = state.eta_seconds
+    eta_text = "done" if state.done else ("ETA unknown" if eta is None else f"ETA {eta:.0f} s")
+    print(f"Backfill {state.name}: {state.rows_visited}/{state.total_rows} rows ({percent:.1f}%), "
+          f"{state.rows_updated} updated, {eta_text}")
+
+
+def backfill_in_migration(
+    backfill: Backfill,
+    progress: Optional[Callable[[BackfillProgress], None]] = print_progress
+) -> Optional[BackfillProgress]:
+    """
+    Run a backfill from an Alembic migration.
+
+    The migration transaction so far (earlier revisions, with their DDL
+    and version stamps) is committed first, so the batches do not wait on
+    its locks; keep the backfill in a revision of its own. In offline
+    (``--sql``) mode nothing runs; a comment points to the script instead.
+    """
+    from alembic import op
+    from sqlalchemy import text
+
+    context = op.get_context()
+    if _dry_run is not None:
+        estimates, sample_batches = _dry_run
+        estimates.append(estimate_backfill(op.get_bind(), backfill, sample_batches))
+        return None
+    if context.as_sql:
+        op.execute(text(f"-- Backfill {backfill.name} not run in offline mode; run it with python -m scripts.backfill"))
+        return None
+    with context.autocommit_block():
+        return run_backfill(op.get_bind().engine, backfill, progress=progress)
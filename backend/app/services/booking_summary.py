@@ -0,0 +1,375 @@
+"""
+Per-user booking summaries (``user_booking_summary``).
+
+The summary row is updated in the flush that writes bookings or deliveries,
+so it commits or rolls back with them. New bookings and deliveries are
+applied as one atomic upsert per user (``INSERT ... ON CONFLICT DO UPDATE``
+with ``count = count + n``), so concurrent writers never lose each other's
+increments; a redelivery moves ``last_delivery_at`` through the same upsert. Status or price changes and deletions adjust the totals the
+same way and then re-read the user's next upcoming booking.
+
+Writes that bypass the ORM (bulk loads, archival) do not touch summaries;
+archival must not, since archived bookings still count. ``check_summaries``
+recomputes rows from the hot and archive tables in batches and repairs any
+that drifted. With sharding the summary lives on its user's shard, next to
+the bookings it sums up, and the check runs shard by shard.
+"""
+import time
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import Date, and_, bindparam, case, event, func, inspect, or_, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal, shard_router
+from app.models.archive import ArchivedBooking, ArchivedDelivery
+from app.models.booking import Booking, BookingStatus
+from app.models.delivery import Delivery
+from app.models.summary import UserBookingSummary
+from app.models.user import User
+
+# Statuses whose price counts as spent, and statuses of bookings still to come
+SPENT_STATUSES = (BookingStatus.APPROVED, BookingStatus.COMPLETED)
+UPCOMING_STATUSES = (BookingStatus.PENDING, BookingStatus.APPROVED)
+
+SUMMARY = UserBookingSummary.__table__
+ZERO = Decimal("0.00")
+
+
+def _spent(status, price) -> Decimal:
+    return Decimal(price or 0) if status in SPENT_STATUSES else ZERO
+
+
+# Upsert statement per dialect, built once with bind parameters so its compiled form is cached
+_upserts = {}
+
+
+def _upsert_statement(dialect_name: str):
+    statement = _upserts.get(dialect_name)
+    if statement is not None:
+        return statement
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+
+    statement = insert(SUMMARY).values(
+        user_id=bindparam("user_id"),
+        booking_count=bindparam("booking_count"),
+        total_spent=bindparam("total_spent"),
+        upcoming_booking_id=bindparam("upcoming_booking_id"),
+        upcoming_event_date=bindparam("upcoming_event_date"),
+        last_delivery_at=bindparam("last_delivery_at"),
+        updated_at=bindparam("updated_at"),
+    )
+    excluded = statement.excluded
+    take_upcoming = and_(
+        excluded.upcoming_event_date.isnot(None),
+        or_(
+            SUMMARY.c.upcoming_event_date.is_(None),
+            SUMMARY.c.upcoming_event_date < bindparam("today", type_=Date),
+            excluded.upcoming_event_date < SUMMARY.c.upcoming_event_date,
+        ),
+    )
+    take_delivery = and_(
+        excluded.last_delivery_at.isnot(None),
+        or_(SUMMARY.c.last_delivery_at.is_(None), excluded.last_delivery_at > SUMMARY.c.last_delivery_at),
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[SUMMARY.c.user_id],
+        set_={
+            "booking_count": SUMMARY.c.booking_count + excluded.booking_count,
+            "total_spent": SUMMARY.c.total_spent + excluded.total_spent,
+            "upcoming_booking_id": case((take_upcoming, excluded.upcoming_booking_id), else_=SUMMARY.c.upcoming_booking_id),
+            "upcoming_event_date": case((take_upcoming, excluded.upcoming_event_date), else_=SUMMARY.c.upcoming_event_date),
+            "last_delivery_at": case((take_delivery, excluded.last_delivery_at), else_=SUMMARY.c.last_delivery_at),
+            "updated_at": excluded.updated_at,
+        },
+    )
+    _upserts[dialect_name] = statement
+    return statement
+
+
+def _apply_deltas(connection: Connection, deltas: Dict[UUID, dict]) -> None:
+    """Add counts and totals to users' rows, keeping the earlier upcoming booking and the later delivery."""
+    if not deltas:
+        return
+    now = datetime.utcnow()
+    today = date.today()
+    connection.execute(_upsert_statement(connection.dialect.name), [
+        {
+            "user_id": user_id,
+            "booking_count": delta["count"],
+            "total_spent": delta["spent"],
+            "upcoming_booking_id": delta.get("upcoming_booking_id"),
+            "upcoming_event_date": delta.get("upcoming_event_date"),
+            "last_delivery_at": delta.get("last_delivery_at"),
+            "updated_at": now,
+            "today": today,
+        }
+        for user_id, delta in deltas.items()
+    ])
+
+
+def next_upcoming(connection, user_id: UUID) -> Tuple[Optional[UUID], Optional[date]]:
+    """(booking ID, event date) of a user's earliest pending or approved booking from today on."""
+    row = connection.execute(
+        select(Booking.id, Booking.event_date)
+        .where(
+            Booking.user_id == user_id,
+            Booking.status.in_(UPCOMING_STATUSES),
+            Booking.event_date >= date.today(),
+        )
+        .order_by(Booking.event_date, Booking.event_time)
+        .limit(1)
+    ).first()
+    return (row[0], row[1]) if row else (None, None)
+
+
+def _refresh_upcoming(connection: Connection, user_ids: Iterable[UUID]) -> None:
+    for user_id in user_ids:
+        booking_id, event_date = next_upcoming(connection, user_id)
+        connection.execute(
+            update(SUMMARY)
+            .where(SUMMARY.c.user_id == user_id)
+            .values(upcoming_booking_id=booking_id, upcoming_event_date=event_date)
+        )
+
+
+@event.listens_for(Session, "after_flush")
+def _maintain_summaries(session, flush_context):
+    new_bookings = [obj for obj in session.new if isinstance(obj, Booking)]
+    changed_bookings = [obj for obj in session.dirty if isinstance(obj, Booking)]
+    deleted_bookings = [obj for obj in session.deleted if isinstance(obj, Booking)]
+    # New deliveries and redeliveries (an update that moved delivered_at) advance last_delivery_at
+    deliveries = [obj for obj in session.new if isinstance(obj, Delivery)] + [
+        obj for obj in session.dirty
+        if isinstance(obj, Delivery) and inspect(obj).attrs.delivered_at.history.has_changes()
+    ]
+    if not (new_bookings or changed_bookings or deleted_bookings or deliveries):
+        return
+
+    deltas: Dict[UUID, dict] = defaultdict(lambda: {"count": 0, "spent": ZERO})
+    refresh = set()
+    today = date.today()
+
+    for booking in new_bookings:
+        delta = deltas[booking.user_id]
+        delta["count"] += 1
+        delta["spent"] += _spent(booking.status, booking.total_price)
+        if booking.status in UPCOMING_STATUSES and booking.event_date >= today:
+            if delta.get("upcoming_event_date") is None or booking.event_date < delta["upcoming_event_date"]:
+                delta["upcoming_booking_id"] = booking.id
+                delta["upcoming_event_date"] = booking.event_date
+
+    for booking in changed_bookings:
+        state = inspect(booking)
+        status, price, event_date = (state.attrs[name].history for name in ("status", "total_price", "event_date"))
+        if not (status.has_changes() or price.has_changes() or event_date.has_changes()):
+            continue
+        old_status = status.deleted[0] if status.deleted else booking.status
+        old_price = price.deleted[0] if price.deleted else booking.total_price
+        deltas[booking.user_id]["spent"] += _spent(booking.status, booking.total_price) - _spent(old_status, old_price)
+        refresh.add(booking.user_id)
+
+    for booking in deleted_bookings:
+        delta = deltas[booking.user_id]
+        delta["count"] -= 1
+        delta["spent"] -= _spent(booking.status, booking.total_price)
+        refresh.add(booking.user_id)
+
+    connection = session.connection(bind_arguments={"mapper": inspect(UserBookingSummary)})
+    if deliveries:
+        booking_users = dict(connection.execute(
+            select(Booking.id, Booking.user_id).where(Booking.id.in_({d.booking_id for d in deliveries}))
+        ).all())
+        for delivery in deliveries:
+            user_id = booking_users.get(delivery.booking_id)
+            if user_id is None:
+                continue
+            delta = deltas[user_id]
+            if delta.get("last_delivery_at") is None or delivery.delivered_at > delta["last_delivery_at"]:
+                delta["last_delivery_at"] = delivery.delivered_at
+
+    _apply_deltas(connection, deltas)
+    _refresh_upcoming(connection, refresh)
+
+
+def expected_summaries(db: Session, user_ids: List[UUID]) -> Dict[UUID, dict]:
+    """
+    Recompute summary values for users from the hot and archive tables.
+
+    Args:
+        db: Database session
+        user_ids: Users to compute (users without bookings are left out)
+
+    Returns:
+        Summary values per user ID
+    """
+    summaries: Dict[UUID, dict] = {}
+
+    def row_for(user_id):
+        return summaries.setdefault(user_id, {
+            "booking_count": 0, "total_spent": ZERO, "upcoming_booking_id": None,
+            "upcoming_event_date": None, "last_delivery_at": None,
+        })
+
+    for model in (Booking, ArchivedBooking):
+        spent = func.coalesce(func.sum(case((model.status.in_(SPENT_STATUSES), model.total_price), else_=0)), 0)
+        for user_id, count, total in db.execute(
+            select(model.user_id, func.count(), spent).where(model.user_id.in_(user_ids)).group_by(model.user_id)
+        ):
+            row = row_for(user_id)
+            row["booking_count"] += count
+            row["total_spent"] += Decimal(total)
+
+    for model, booking_model in ((Delivery, Booking), (ArchivedDelivery, ArchivedBooking)):
+        for user_id, delivered_at in db.execute(
+            select(booking_model.user_id, func.max(model.delivered_at))
+            .join(booking_model, booking_model.id == model.booking_id)
+            .where(booking_model.user_id.in_(user_ids))
+            .group_by(booking_model.user_id)
+        ):
+            row = row_for(user_id)
+            if row["last_delivery_at"] is None or delivered_at > row["last_delivery_at"]:
+                row["last_delivery_at"] = delivered_at
+
+    for user_id, booking_id, event_date in db.execute(
+        select(Booking.user_id, Booking.id, Booking.event_date)
+        .where(
+            Booking.user_id.in_(user_ids),
+            Booking.status.in_(UPCOMING_STATUSES),
+            Booking.event_date >= date.today(),
+        )
+        .order_by(Booking.user_id, Booking.event_date, Booking.event_time)
+    ):
+        row = row_for(user_id)
+        if row["upcoming_booking_id"] is None:
+            row["upcoming_booking_id"] = booking_id
+            row["upcoming_event_date"] = event_date
+
+    for row in summaries.values():
+        row["total_spent"] = Decimal(row["total_spent"]).quantize(Decimal("0.01"))
+    return summaries
+
+
+def _stored_values(summary: UserBookingSummary) -> dict:
+    return {
+        "booking_count": summary.booking_count,
+        "total_spent": Decimal(summary.total_spent).quantize(Decimal("0.01")),
+        "upcoming_booking_id": summary.upcoming_booking_id,
+        "upcoming_event_date": summary.upcoming_event_date,
+        "last_delivery_at": summary.last_delivery_at,
+    }
+
+
+def check_batch(db: Session, after_user_id: Optional[UUID], batch_size: int, fix: bool) -> Tuple[Optional[UUID], int, int]:
+    """
+    Compare (and optionally repair) the summaries of one batch of users.
+
+    The batch's summary rows are locked first, so a booking committed
+    concurrently is either seen by the recount or applied on top of it.
+
+    Args:
+        db: Database session (committed by this function when fixing); with
+            sharding, routed to the shard whose users are checked
+        after_user_id: Last user ID of the previous batch (None to start)
+        batch_size: Users per batch
+        fix: Rewrite rows that differ
+
+    Returns:
+        (last user ID of this batch or None when done, users checked, rows that differed)
+    """
+    query = select(User.id).order_by(User.id).limit(batch_size)
+    if after_user_id is not None:
+        query = query.where(User.id > after_user_id)
+    batch_ids = db.execute(query).scalars().all()
+    if not batch_ids:
+        return None, 0, 0
+    user_ids = [
+        user_id for user_id in batch_ids
+        if not shard_router.sharded or shard_router.shard_of(user_id) == db.shard
+    ]
+
+    stored = {
+        summary.user_id: summary
+        for summary in db.execute(
+            select(UserBookingSummary).where(UserBookingSummary.user_id.in_(user_ids)).with_for_update()
+        ).scalars()
+    }
+    expected = expected_summaries(db, user_ids)
+
+    mismatched = 0
+    for user_id in user_ids:
+        values = expected.get(user_id)
+        summary = stored.get(user_id)
+        if summary is None and values is None:
+            continue
+        if summary is not None and values is not None and _stored_values(summary) == values:
+            continue
+        mismatched += 1
+        if not fix:
+            continue
+        if values is None:
+            db.delete(summary)
+        elif summary is None:
+            db.add(UserBookingSummary(user_id=user_id, **values))
+        else:
+            for name, value in values.items():
+                setattr(summary, name, value)
+
+    if fix:
+        db.commit()
+    else:
+        db.rollback()
+    return batch_ids[-1], len(user_ids), mismatched
+
+
+def check_summaries(
+    batch_size: int = None,
+    fix: bool = True,
+    pause_seconds: float = 0.0,
+    session_factory: Callable[[], Session] = SessionLocal,
+    progress: Optional[Callable[[int, int], None]] = None
+) -> Tuple[int, int]:
+    """
+    Recount every user's summary in batches (shard by shard), repairing rows that drifted.
+
+    Args:
+        batch_size: Users per transaction (defaults to SUMMARY_CHECK_BATCH_SIZE)
+        fix: Rewrite differing rows (False only reports them)
+        pause_seconds: Sleep between batches to leave room for live traffic
+        session_factory: Factory for the session each batch runs in
+        progress: Optional callback receiving (users checked, rows differing) after each batch
+
+    Returns:
+        (users checked, rows that differed)
+    """
+    batch_size = batch_size or settings.SUMMARY_CHECK_BATCH_SIZE
+    checked = mismatched = 0
+    for shard in range(shard_router.count):
+        after_user_id = None
+        while True:
+            db = session_factory()
+            try:
+                shard_router.use_shard(db, shard)
+                after_user_id, batch_checked, batch_mismatched = check_batch(db, after_user_id, batch_size, fix)
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+
+            if after_user_id is None:
+                break
+            checked += batch_checked
+            mismatched += batch_mismatched
+            if progress:
+                progress(checked, mismatched)
+            time.sleep(pause_seconds)
+    return checked, mismatched
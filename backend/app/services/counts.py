@@ -0,0 +1,170 @@
+"""
+Total counts for paginated lists.
+
+Exact counts are cached per (table, filter combination) and invalidated when
+a transaction that wrote to the table commits in this process; entries also
+expire after COUNT_CACHE_TTL_SECONDS to pick up other workers' writes.
+Unfiltered counts of large tables come from planner statistics instead
+(``pg_class.reltuples`` on PostgreSQL, ``sqlite_stat1`` after ANALYZE on
+SQLite) and are flagged as estimates. Sharded tables are counted on every
+shard in parallel and summed.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+from sqlalchemy import event, table as table_clause, text
+from sqlalchemy.orm import Query, Session
+
+from app.core.config import settings
+from app.core.database import shard_router
+from app.core.sharding import SHARDED_TABLES
+
+
+class CountCache:
+    """Exact counts keyed by table and filters, with per-table write versions."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._versions: Dict[str, int] = {}
+        self._entries: "OrderedDict[Tuple, Tuple[int, int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def version(self, table: str) -> int:
+        return self._versions.get(table, 0)
+
+    def invalidate(self, tables: Iterable[str]) -> None:
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+
+    def get(self, key: Tuple) -> Optional[int]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            count, version, stored_at = entry
+            if version != self._versions.get(key[0], 0) or time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return count
+
+    def put(self, key: Tuple, version: int, count: int) -> None:
+        """Store a count computed while the table was at ``version`` (dropped if it moved on)."""
+        with self._lock:
+            if version != self._versions.get(key[0], 0):
+                return
+            self._entries[key] = (count, version, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+count_cache = CountCache(ttl_seconds=settings.COUNT_CACHE_TTL_SECONDS, max_entries=settings.COUNT_CACHE_MAX_ENTRIES)
+
+
+def _written_tables(session: Session) -> set:
+    return session.info.setdefault("written_tables", set())
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flushed_tables(session, flush_context):
+    written = _written_tables(session)
+    for instance in list(session.new) + list(session.dirty) + list(session.deleted):
+        written.add(instance.__table__.name)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_executed_tables(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _written_tables(orm_execute_state.session).add(orm_execute_state.statement.table.name)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_written_tables(session):
+    written = session.info.pop("written_tables", None)
+    if written:
+        count_cache.invalidate(written)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_written_tables(session):
+    session.info.pop("written_tables", None)
+
+
+def planner_estimate(db: Session, table: str) -> Optional[int]:
+    """
+    Row count from planner statistics, or None if there are none.
+
+    Args:
+        db: Session bound to the database to ask (routed to a shard for sharded tables)
+        table: Table name
+
+    Returns:
+        Estimated number of rows
+    """
+    connection = db.connection(bind_arguments={"clause": table_clause(table)})
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        estimate = connection.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"),
+            {"table": table}
+        ).scalar()
+        # -1 means the table has never been analyzed
+        return int(estimate) if estimate is not None and estimate >= 0 else None
+    if dialect == "sqlite":
+        has_stats = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+        ).scalar()
+        if not has_stats:
+            return None
+        stats = connection.execute(text("SELECT stat FROM sqlite_stat1 WHERE tbl = :table"), {"table": table}).scalars()
+        # The first number of each index's stat is the row count it was built from
+        counts = [int(stat.split()[0]) for stat in stats if stat]
+        return max(counts) if counts else None
+    return None
+
+
+def total_count(
+    db: Session,
+    table: str,
+    filters: Dict[str, Any],
+    build_query: Callable[[Session], Query],
+    shards: Optional[Sequence[int]] = None
+) -> Tuple[int, bool]:
+    """
+    Total number of rows a list would return without paging.
+
+    Args:
+        db: Session the list is read with
+        table: Table the list reads
+        filters: Active filters (None values are ignored); part of the cache key
+        build_query: Builds the list query for a session; paging and ordering are stripped
+        shards: Shards the list reads, for sharded tables (all by default)
+
+    Returns:
+        (total, whether it is a planner estimate)
+    """
+    def scatter(work):
+        if table in SHARDED_TABLES:
+            return shard_router.scatter(db, work, shards)
+        return [work(db)]
+
+    active = tuple(sorted((name, str(value)) for name, value in filters.items() if value is not None))
+    if not active:
+        estimates = scatter(lambda session: planner_estimate(session, table))
+        if None not in estimates and sum(estimates) >= settings.COUNT_ESTIMATE_MIN_ROWS:
+            return sum(estimates), True
+
+    key = (table,) + active
+    cached = count_cache.get(key)
+    if cached is not None:
+        return cached, False
+
+    version = count_cache.version(table)
+    count = sum(scatter(lambda session: build_query(session).limit(None).offset(None).order_by(None).count()))
+    count_cache.put(key, version, count)
+    return count, False
@@ -0,0 +1,340 @@
+"""
+Crew scheduling: per-staff schedules with O(log n) conflict checks and
+greedy auto-assignment of bookings that still need crew.
+
+A booking occupies its crew from ``event_date + event_time`` for the
+package duration, plus CREW_BUFFER_MINUTES of travel/setup time. One staff
+member's intervals never overlap, so a schedule is kept as parallel sorted
+arrays of starts and ends: an overlap check is a single bisect plus a look
+at the neighbouring interval, the same O(log n) query an interval tree
+gives for disjoint intervals, with far less overhead in Python.
+
+Schedules are built from the database for the date window being planned,
+inside the transaction that writes the new assignments; on PostgreSQL that
+transaction holds an advisory lock so concurrent planners cannot double-book.
+"""
+import heapq
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import date, datetime, time as time_of_day, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import insert, select, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import shard_router
+from app.models.booking import Booking, BookingStatus
+from app.models.package import Package
+from app.models.staff import CREW_REQUIREMENTS, CrewAssignment, StaffMember, StaffRole
+
+# Bookings that still get crew assigned
+SCHEDULABLE_STATUSES = (BookingStatus.PENDING, BookingStatus.APPROVED)
+
+# Arbitrary key for pg_advisory_xact_lock around schedule changes
+SCHEDULE_LOCK_KEY = 7_391_204
+
+# Serializes planners within one process (and on SQLite, which has no advisory locks)
+schedule_lock = threading.Lock()
+
+
+class ScheduleConflictError(Exception):
+    """Raised when a staff member is already busy during a booking."""
+
+
+def booking_span(event_date: date, event_time: time_of_day, duration_hours: Optional[int]) -> Tuple[datetime, datetime]:
+    """Start and end of the time a booking occupies its crew (without the buffer)."""
+    starts_at = datetime.combine(event_date, event_time)
+    hours = duration_hours or settings.CREW_DEFAULT_DURATION_HOURS
+    return starts_at, starts_at + timedelta(hours=hours)
+
+
+class StaffSchedule:
+    """Disjoint busy intervals of one staff member, sorted by start."""
+
+    __slots__ = ("starts", "ends", "busy_minutes")
+
+    def __init__(self):
+        self.starts: List[datetime] = []
+        self.ends: List[datetime] = []
+        self.busy_minutes = 0
+
+    def is_free(self, starts_at: datetime, ends_at: datetime) -> bool:
+        """Whether [starts_at, ends_at) overlaps no existing interval. O(log n)."""
+        index = bisect_left(self.starts, starts_at)
+        if index < len(self.starts) and self.starts[index] < ends_at:
+            return False
+        if index > 0 and self.ends[index - 1] > starts_at:
+            return False
+        return True
+
+    def add(self, starts_at: datetime, ends_at: datetime) -> None:
+        """Record an interval (the caller has checked it is free)."""
+        index = bisect_left(self.starts, starts_at)
+        self.starts.insert(index, starts_at)
+        self.ends.insert(index, ends_at)
+        self.busy_minutes += int((ends_at - starts_at).total_seconds() // 60)
+
+    def __len__(self):
+        return len(self.starts)
+
+
+@dataclass
+class PlannedAssignment:
+    """An assignment chosen by the planner, not yet written."""
+    booking_id: UUID
+    staff_id: UUID
+    role: StaffRole
+    starts_at: datetime
+    ends_at: datetime
+
+
+@dataclass
+class UnfilledSlot:
+    """A crew role of a booking the planner could not fill."""
+    booking_id: UUID
+    role: StaffRole
+    reason: str
+
+
+@dataclass
+class AssignmentPlan:
+    assigned: List[PlannedAssignment] = field(default_factory=list)
+    unfilled: List[UnfilledSlot] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+
+
+def _buffered(ends_at: datetime) -> datetime:
+    return ends_at + timedelta(minutes=settings.CREW_BUFFER_MINUTES)
+
+
+def lock_schedules(db: Session) -> None:
+    """Serialize schedule changes across workers for the rest of the transaction (PostgreSQL)."""
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SCHEDULE_LOCK_KEY})
+
+
+def load_schedules(
+    db: Session,
+    staff_ids: Iterable[UUID],
+    window_start: datetime,
+    window_end: datetime
+) -> Dict[UUID, StaffSchedule]:
+    """
+    Build schedules from existing assignments overlapping a window.
+
+    Args:
+        db: Database session
+        staff_ids: Staff to build schedules for
+        window_start: Start of the planning window
+        window_end: End of the planning window
+
+    Returns:
+        Schedule per staff ID (empty for staff with no assignments)
+    """
+    schedules = {staff_id: StaffSchedule() for staff_id in staff_ids}
+    if not schedules:
+        return schedules
+    # Widen by the longest plausible interval so spans crossing the window edges are included
+    margin = timedelta(days=2)
+    rows = db.execute(
+        select(CrewAssignment.staff_id, CrewAssignment.starts_at, CrewAssignment.ends_at)
+        .where(
+            CrewAssignment.staff_id.in_(list(schedules)),
+            CrewAssignment.starts_at < window_end + margin,
+            CrewAssignment.ends_at > window_start - margin,
+        )
+        .order_by(CrewAssignment.staff_id, CrewAssignment.starts_at)
+    )
+    for staff_id, starts_at, ends_at in rows:
+        schedules[staff_id].add(starts_at, _buffered(ends_at))
+    return schedules
+
+
+def check_assignment(db: Session, staff: StaffMember, booking: Booking) -> Tuple[datetime, datetime]:
+    """
+    Validate a manual assignment of ``staff`` to ``booking``.
+
+    Args:
+        db: Database session (call ``lock_schedules`` first in write transactions)
+        staff: Staff member to assign
+        booking: Booking with its package loaded
+
+    Returns:
+        (starts_at, ends_at) of the assignment
+
+    Raises:
+        ScheduleConflictError: If the staff member is busy during the booking
+    """
+    starts_at, ends_at = booking_span(booking.event_date, booking.event_time, booking.package.duration)
+    schedule = load_schedules(db, [staff.id], starts_at, _buffered(ends_at))[staff.id]
+    if not schedule.is_free(starts_at, _buffered(ends_at)):
+        raise ScheduleConflictError(f"{staff.full_name} is already assigned during this booking")
+    return starts_at, ends_at
+
+
+def schedulable_bookings(db: Session, date_from: date, date_to: date) -> List[tuple]:
+    """
+    (id, event_date, event_time, package duration, package category) of the bookings to staff.
+
+    With sharding the bookings are read from every shard in parallel and
+    their (global) packages are looked up separately, since they cannot be joined.
+    """
+    window = (
+        Booking.event_date >= date_from,
+        Booking.event_date <= date_to,
+        Booking.status.in_(SCHEDULABLE_STATUSES),
+    )
+    if not shard_router.sharded:
+        return db.execute(
+            select(Booking.id, Booking.event_date, Booking.event_time, Package.duration, Package.category)
+            .join(Package, Package.id == Booking.package_id)
+            .where(*window)
+        ).all()
+
+    rows = [
+        row
+        for shard_rows in shard_router.scatter(db, lambda session: session.execute(
+            select(Booking.id, Booking.event_date, Booking.event_time, Booking.package_id).where(*window)
+        ).all())
+        for row in shard_rows
+    ]
+    if not rows:
+        return []
+    packages = {
+        package_id: (duration, category)
+        for package_id, duration, category in db.execute(
+            select(Package.id, Package.duration, Package.category)
+            .where(Package.id.in_({row.package_id for row in rows}))
+        )
+    }
+    return [
+        (booking_id, event_date, event_time) + packages[package_id]
+        for booking_id, event_date, event_time, package_id in rows
+        if package_id in packages
+    ]
+
+
+def plan_assignments(db: Session, date_from: date, date_to: date) -> AssignmentPlan:
+    """
+    Greedily assign crew to schedulable bookings with event dates in a window.
+
+    Bookings are taken in order of start time (the classic greedy order for
+    interval scheduling); each missing role goes to the least-loaded free
+    staff member of that role, found through a heap per role.
+
+    Args:
+        db: Database session
+        date_from: First event date (inclusive)
+        date_to: Last event date (inclusive)
+
+    Returns:
+        The plan; nothing is written
+    """
+    started = time.perf_counter()
+    plan = AssignmentPlan()
+    window_start = datetime.combine(date_from, time_of_day.min)
+    window_end = datetime.combine(date_to + timedelta(days=1), time_of_day.min)
+
+    staff_by_role: Dict[StaffRole, List[UUID]] = {role: [] for role in StaffRole}
+    for staff_id, role in db.execute(
+        select(StaffMember.id, StaffMember.role).where(StaffMember.is_active == True).order_by(StaffMember.id)
+    ):
+        staff_by_role[role].append(staff_id)
+    schedules = load_schedules(
+        db, [staff_id for ids in staff_by_role.values() for staff_id in ids], window_start, window_end
+    )
+
+    bookings = schedulable_bookings(db, date_from, date_to)
+    staffed: Dict[UUID, set] = {}
+    if bookings:
+        if shard_router.sharded:
+            # Bookings cannot be joined; an assignment starts when its booking does
+            staffed_query = select(CrewAssignment.booking_id, CrewAssignment.role).where(
+                CrewAssignment.starts_at >= window_start, CrewAssignment.starts_at < window_end
+            )
+        else:
+            staffed_query = (
+                select(CrewAssignment.booking_id, CrewAssignment.role)
+                .join(Booking, Booking.id == CrewAssignment.booking_id)
+                .where(Booking.event_date >= date_from, Booking.event_date <= date_to)
+            )
+        for booking_id, role in db.execute(staffed_query):
+            staffed.setdefault(booking_id, set()).add(role)
+
+    # Least busy first; the index keeps heap entries comparable and the order stable
+    heaps = {
+        role: [(schedules[staff_id].busy_minutes, index, staff_id) for index, staff_id in enumerate(ids)]
+        for role, ids in staff_by_role.items()
+    }
+    for heap in heaps.values():
+        heapq.heapify(heap)
+
+    spans = sorted(
+        (booking_span(event_date, event_time, duration) + (booking_id, category))
+        for booking_id, event_date, event_time, duration, category in bookings
+    )
+    for starts_at, ends_at, booking_id, category in spans:
+        busy_until = _buffered(ends_at)
+        for role in CREW_REQUIREMENTS[category]:
+            if role in staffed.get(booking_id, ()):
+                continue
+            heap = heaps[role]
+            skipped = []
+            chosen = None
+            while heap:
+                entry = heapq.heappop(heap)
+                if schedules[entry[2]].is_free(starts_at, busy_until):
+                    chosen = entry
+                    break
+                skipped.append(entry)
+            for entry in skipped:
+                heapq.heappush(heap, entry)
+
+            if chosen is None:
+                plan.unfilled.append(UnfilledSlot(booking_id, role, "No staff available"))
+                continue
+            _, index, staff_id = chosen
+            schedule = schedules[staff_id]
+            schedule.add(starts_at, busy_until)
+            heapq.heappush(heap, (schedule.busy_minutes, index, staff_id))
+            plan.assigned.append(PlannedAssignment(booking_id, staff_id, role, starts_at, ends_at))
+
+    plan.elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+    return plan
+
+
+def auto_assign(db: Session, date_from: date, date_to: date, dry_run: bool = False) -> AssignmentPlan:
+    """
+    Plan crew for a date window and write the assignments in one transaction.
+
+    Args:
+        db: Database session (committed unless ``dry_run``)
+        date_from: First event date (inclusive)
+        date_to: Last event date (inclusive)
+        dry_run: Only plan; write nothing
+
+    Returns:
+        The plan that was (or would have been) written
+    """
+    with schedule_lock:
+        lock_schedules(db)
+        plan = plan_assignments(db, date_from, date_to)
+        if dry_run or not plan.assigned:
+            db.rollback()
+            return plan
+
+        now = datetime.utcnow()
+        db.execute(insert(CrewAssignment.__table__), [
+            {
+                "id": uuid.uuid4(), "booking_id": planned.booking_id, "staff_id": planned.staff_id,
+                "role": planned.role, "starts_at": planned.starts_at, "ends_at": planned.ends_at, "created_at": now,
+            }
+            for planned in plan.assigned
+        ])
+        db.commit()
+        return plan
@@ -0,0 +1,284 @@
+"""
+Demand-based date pricing multipliers.
+
+Bookings that still hold their date (pending, approved, completed) are
+counted per event date in a NumPy array spanning DEMAND_HORIZON_DAYS from
+today. A date's window sum is the count over DEMAND_WINDOW_DAYS either
+side of it (from one cumulative sum over the array), and its multiplier is
+
+    clip(1 + DEMAND_SENSITIVITY * ((window sum + prior) / (average + prior) - 1),
+         DEMAND_MIN_MULTIPLIER, DEMAND_MAX_MULTIPLIER)
+
+rounded to MULTIPLIER_STEP and stored as integer hundredths, so a lookup is
+one array index and prices stay exact in cents. The average is taken over
+the dates whose window holds any booking, so a mostly empty horizon does not
+make every booked date look busy, and the prior (DEMAND_PRIOR_BOOKINGS)
+keeps a handful of bookings from moving a date far from 1.00. Every date
+stays at 1.00 until the horizon holds DEMAND_MIN_BOOKINGS bookings.
+
+Bookings committed in this process adjust their day's count and the window
+sums around it, and the multipliers are recomputed from those sums in one
+vectorized pass. A full recount runs after DEMAND_REFRESH_SECONDS to pick up
+other workers' bookings and to move the horizon as days pass, so workers'
+curves can differ until then. Quotes with a date therefore carry a
+``quote_token`` (HMAC-signed package, date, multiplier and expiry), and
+``honour_quote`` lets a booking keep the signed multiplier while it is
+within DEMAND_QUOTE_TOLERANCE of the current one. The multiplier applies to the package price only; add-ons keep
+their list prices.
+"""
+import hashlib
+import hmac
+import threading
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, Optional
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal, shard_router
+from app.models.booking import Booking, BookingStatus
+
+# Statuses whose bookings occupy their date
+DEMAND_STATUSES = (BookingStatus.PENDING, BookingStatus.APPROVED, BookingStatus.COMPLETED)
+MULTIPLIER_STEP = 0.05
+NEUTRAL = 100  # Multiplier of 1.00, in hundredths
+
+
+class DemandCurve:
+    """Per-day booking counts and multipliers from ``first_day`` over the horizon."""
+
+    def __init__(self, first_day: date, counts: np.ndarray, window: int):
+        self.first_day = first_day
+        self.window = window
+        self.span = 2 * window + 1
+        # counts covers [first_day - window, first_day + horizon + window)
+        self.counts = counts
+        self.horizon = len(counts) - 2 * window
+        sums = np.concatenate(([0], np.cumsum(counts)))
+        # Bookings within each horizon day's window
+        self.window_sums = sums[self.span:] - sums[:-self.span]
+        self.multipliers = self._multipliers()
+
+    def _multipliers(self) -> np.ndarray:
+        booked = int(self.counts[self.window:self.window + self.horizon].sum())
+        if booked < max(settings.DEMAND_MIN_BOOKINGS, 1):
+            return np.full(self.horizon, NEUTRAL, dtype=np.int64)
+        # Average over the dates that carry bookings, shrunk toward it by the prior
+        average = self.window_sums[self.window_sums > 0].mean()
+        prior = settings.DEMAND_PRIOR_BOOKINGS
+        ratio = (self.window_sums + prior) / (average + prior)
+        raw = np.clip(
+            1 + settings.DEMAND_SENSITIVITY * (ratio - 1),
+            settings.DEMAND_MIN_MULTIPLIER,
+            settings.DEMAND_MAX_MULTIPLIER,
+        )
+        return (np.rint(raw / MULTIPLIER_STEP) * MULTIPLIER_STEP * 100).round().astype(np.int64)
+
+    def multiplier(self, day: date) -> int:
+        """Multiplier for a date in hundredths (100 outside the horizon)."""
+        position = (day - self.first_day).days
+        if 0 <= position < self.horizon:
+            return int(self.multipliers[position])
+        return NEUTRAL
+
+    def bookings(self, day: date) -> int:
+        """Bookings holding a date (0 outside the horizon)."""
+        position = (day - self.first_day).days
+        if 0 <= position < self.horizon:
+            return int(self.counts[position + self.window])
+        return 0
+
+    def add(self, deltas: Dict[date, int]) -> None:
+        """Apply booking count changes, updating only the windows that contain them."""
+        changed = False
+        for day, delta in deltas.items():
+            slot = (day - self.first_day).days + self.window
+            if not delta or not 0 <= slot < len(self.counts):
+                continue
+            self.counts[slot] += delta
+            # Horizon days whose window contains this slot
+            start = max(slot - 2 * self.window, 0)
+            stop = min(slot + 1, self.horizon)
+            if start < stop:
+                self.window_sums[start:stop] += delta
+                changed = True
+        if changed:
+            # The average moved too, so every multiplier is recomputed (one vectorized pass)
+            self.multipliers = self._multipliers()
+
+
+def load_curve(db: Session, today: Optional[date] = None) -> DemandCurve:
+    """Count bookings per event date (over all shards) and build the curve starting today."""
+    today = today or date.today()
+    window = settings.DEMAND_WINDOW_DAYS
+    origin = today - timedelta(days=window)
+    counts = np.zeros(settings.DEMAND_HORIZON_DAYS + 2 * window, dtype=np.int64)
+    query = (
+        select(Booking.event_date, func.count())
+        .where(
+            Booking.status.in_(DEMAND_STATUSES),
+            Booking.event_date >= origin,
+            Booking.event_date < origin + timedelta(days=len(counts)),
+        )
+        .group_by(Booking.event_date)
+    )
+    for rows in shard_router.scatter(db, lambda session: session.execute(query).all()):
+        for event_date, bookings in rows:
+            counts[(event_date - origin).days] += bookings
+    return DemandCurve(today, counts, window)
+
+
+class DemandPricing:
+    """Process-wide demand curve, recounted after ``refresh_seconds``."""
+
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self._curve: Optional[DemandCurve] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def curve(self) -> DemandCurve:
+        curve = self._curve
+        if curve is not None and time.monotonic() - self._loaded_at < self.refresh_seconds and curve.first_day == date.today():
+            return curve
+        with self._lock:
+            curve = self._curve
+            if curve is None or time.monotonic() - self._loaded_at >= self.refresh_seconds or curve.first_day != date.today():
+                db = SessionLocal()
+                try:
+                    curve = load_curve(db)
+                finally:
+                    db.close()
+                self._curve = curve
+                self._loaded_at = time.monotonic()
+            return curve
+
+    def multiplier(self, day: date) -> int:
+        return self.curve().multiplier(day)
+
+    def apply(self, deltas: Dict[date, int]) -> None:
+        """Add committed booking count changes (ignored until the curve is loaded)."""
+        with self._lock:
+            if self._curve is not None:
+                self._curve.add(deltas)
+
+
+demand_pricing = DemandPricing(refresh_seconds=settings.DEMAND_REFRESH_SECONDS)
+
+
+def apply_multiplier(price: Decimal, multiplier: int) -> Decimal:
+    """Package price for a date: ``price * multiplier / 100`` rounded half up to cents."""
+    return (Decimal(price) * multiplier / 100).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+
+def multiplier_decimal(multiplier: int) -> Decimal:
+    return (Decimal(multiplier) / 100).quantize(Decimal("0.01"))
+
+
+def sign_quote(package_id: UUID, day: date, multiplier: int, expires_at: int) -> str:
+    """
+    Quote token binding a multiplier to a package, date and expiry.
+
+    Args:
+        package_id: Quoted package
+        day: Event date of the quote
+        multiplier: Quoted multiplier in hundredths
+        expires_at: Unix time after which the token is not honoured
+
+    Returns:
+        ``package.date.multiplier.expiry.signature`` (HMAC-SHA256 with SECRET_KEY)
+    """
+    payload = f"{package_id.hex}.{day.isoformat()}.{multiplier}.{expires_at}"
+    signature = hmac.new(settings.SECRET_KEY.encode("utf-8"), payload.encode("utf-8"), hashlib.sha256).hexdigest()
+    return f"{payload}.{signature}"
+
+
+def quoted_multiplier(token: str, package_id: UUID, day: date) -> Optional[int]:
+    """Multiplier of a valid, unexpired quote token for this package and date (None otherwise)."""
+    parts = token.split(".")
+    if len(parts) != 5:
+        return None
+    payload = ".".join(parts[:4])
+    expected = hmac.new(settings.SECRET_KEY.encode("utf-8"), payload.encode("utf-8"), hashlib.sha256).hexdigest()
+    if not hmac.compare_digest(expected, parts[4]):
+        return None
+    token_package, token_day, multiplier, expires_at = parts[:4]
+    if token_package != package_id.hex or token_day != day.isoformat() or int(expires_at) < time.time():
+        return None
+    return int(multiplier)
+
+
+def honour_quote(current: int, quote_token: Optional[str], package_id: UUID, day: date) -> int:
+    """
+    Multiplier to book with, given the quote a client was issued.
+
+    Quotes may come from a worker whose curve has not caught up with (or has
+    moved past) this one's, so the multiplier of a quote token this server
+    signed for the same package and date, not yet expired and within
+    DEMAND_QUOTE_TOLERANCE of the current multiplier, is kept; anything else
+    gets the current multiplier.
+
+    Args:
+        current: This worker's multiplier for the date, in hundredths
+        quote_token: ``quote_token`` from the client's quote, if sent
+        package_id: Package being booked
+        day: Event date being booked
+
+    Returns:
+        Multiplier in hundredths
+    """
+    quoted = quoted_multiplier(quote_token, package_id, day) if quote_token else None
+    if quoted is not None and abs(quoted - current) <= round(settings.DEMAND_QUOTE_TOLERANCE * 100):
+        return quoted
+    return current
+
+
+def _holds_date(status) -> bool:
+    return status in DEMAND_STATUSES
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_demand_changes(session, flush_context):
+    deltas: Dict[date, int] = defaultdict(int)
+    for booking in session.new:
+        if isinstance(booking, Booking) and _holds_date(booking.status):
+            deltas[booking.event_date] += 1
+    for booking in session.deleted:
+        if isinstance(booking, Booking) and _holds_date(booking.status):
+            deltas[booking.event_date] -= 1
+    for booking in session.dirty:
+        if not isinstance(booking, Booking):
+            continue
+        state = inspect(booking)
+        status, event_date = state.attrs.status.history, state.attrs.event_date.history
+        if not (status.has_changes() or event_date.has_changes()):
+            continue
+        old_status = status.deleted[0] if status.deleted else booking.status
+        old_date = event_date.deleted[0] if event_date.deleted else booking.event_date
+        if _holds_date(old_status):
+            deltas[old_date] -= 1
+        if _holds_date(booking.status):
+            deltas[booking.event_date] += 1
+
+    if any(deltas.values()):
+        pending = session.info.setdefault("demand_deltas", defaultdict(int))
+        for day, delta in deltas.items():
+            pending[day] += delta
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_demand_changes(session):
+    deltas = session.info.pop("demand_deltas", None)
+    if deltas:
+        demand_pricing.apply(deltas)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_demand_changes(session):
+    session.info.pop("demand_deltas", None)
@@ -0,0 +1,158 @@
+"""
+Radius search and same-day route clustering over booking coordinates.
+
+Searches go through three filters, cheapest first: ``geo_cell`` ranges
+covering the bounding box (answered from the geo_cell indexes), the exact
+bounding box on latitude/longitude, and finally the haversine distance,
+computed with NumPy on the (id, latitude, longitude) of the remaining
+candidates only. Full booking rows are loaded for the results alone. With
+sharding every shard is searched in parallel and the results are merged by
+distance (or event time).
+"""
+import heapq
+from datetime import date
+from operator import itemgetter
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from app.core.database import shard_router
+from app.models.booking import Booking, BookingStatus
+from app.utils.geo import bounding_box, cell_ranges, cluster_points, haversine_km
+
+
+def nearby_bookings(
+    db: Session,
+    latitude: float,
+    longitude: float,
+    radius_km: float,
+    event_date: Optional[date] = None,
+    status: Optional[BookingStatus] = None,
+    limit: int = 50
+) -> List[Tuple[Booking, float]]:
+    """
+    Bookings within ``radius_km`` of a point, nearest first.
+
+    Args:
+        db: Database session
+        latitude: Latitude of the centre
+        longitude: Longitude of the centre
+        radius_km: Search radius in km
+        event_date: Only bookings on this date (optional)
+        status: Only bookings with this status (optional)
+        limit: Maximum number of bookings to return
+
+    Returns:
+        (booking, distance in km) pairs
+    """
+    per_shard = shard_router.scatter(
+        db, lambda session: _nearby_on_shard(session, latitude, longitude, radius_km, event_date, status, limit)
+    )
+    if len(per_shard) == 1:
+        return per_shard[0]
+    return list(heapq.merge(*per_shard, key=itemgetter(1)))[:limit]
+
+
+def _nearby_on_shard(
+    db: Session,
+    latitude: float,
+    longitude: float,
+    radius_km: float,
+    event_date: Optional[date],
+    status: Optional[BookingStatus],
+    limit: int
+) -> List[Tuple[Booking, float]]:
+    south, north, spans = bounding_box(latitude, longitude, radius_km)
+    cells = or_(*[Booking.geo_cell.between(low, high) for low, high in cell_ranges(south, north, spans)])
+    longitudes = or_(*[Booking.longitude.between(west, east) for west, east in spans])
+    query = select(Booking.id, Booking.latitude, Booking.longitude).where(
+        Booking.geo_cell.isnot(None), cells, Booking.latitude.between(south, north), longitudes
+    )
+    if event_date:
+        query = query.where(Booking.event_date == event_date)
+    if status:
+        query = query.where(Booking.status == status)
+
+    candidates = db.execute(query).all()
+    if not candidates:
+        return []
+    ids, latitudes, longitudes = zip(*candidates)
+    distances = haversine_km(latitude, longitude, latitudes, longitudes)
+    within = np.flatnonzero(distances <= radius_km)
+    nearest = within[np.argsort(distances[within], kind="stable")][:limit]
+    if not len(nearest):
+        return []
+
+    wanted = [ids[i] for i in nearest]
+    bookings = {booking.id: booking for booking in db.query(Booking).filter(Booking.id.in_(wanted))}
+    return [(bookings[ids[i]], float(distances[i])) for i in nearest if ids[i] in bookings]
+
+
+def route_clusters(db: Session, event_date: date, max_distance_km: float) -> dict:
+    """
+    Group a day's bookings into clusters that one crew could travel between.
+
+    Bookings within ``max_distance_km`` of each other (directly or through
+    other bookings) share a cluster; stops are listed in event time order
+    with the distance from the previous stop. Rejected bookings are left out.
+
+    Args:
+        db: Database session
+        event_date: Day to report on
+        max_distance_km: Linking distance between bookings
+
+    Returns:
+        Report matching ``RouteClusterReport``
+    """
+    query = (
+        select(Booking.id, Booking.event_time, Booking.location, Booking.latitude, Booking.longitude)
+        .where(Booking.event_date == event_date, Booking.status != BookingStatus.REJECTED)
+        .order_by(Booking.event_time, Booking.id)
+    )
+    rows = list(heapq.merge(
+        *shard_router.scatter(db, lambda session: session.execute(query).all()),
+        key=lambda row: (row.event_time, row.id),
+    ))
+    located = [row for row in rows if row.latitude is not None]
+    unlocated: List[UUID] = [row.id for row in rows if row.latitude is None]
+
+    clusters = []
+    if located:
+        latitudes = np.array([row.latitude for row in located])
+        longitudes = np.array([row.longitude for row in located])
+        labels = cluster_points(latitudes, longitudes, max_distance_km)
+        for label in range(int(labels.max()) + 1):
+            members = np.flatnonzero(labels == label)  # Already in event time order
+            stops, route_km = [], 0.0
+            for position, index in enumerate(members):
+                row = located[index]
+                step = None
+                if position:
+                    previous = members[position - 1]
+                    step = float(haversine_km(latitudes[previous], longitudes[previous], [row.latitude], [row.longitude])[0])
+                    route_km += step
+                stops.append({
+                    "booking_id": row.id,
+                    "event_time": row.event_time,
+                    "location": row.location,
+                    "latitude": row.latitude,
+                    "longitude": row.longitude,
+                    "km_from_previous": step,
+                })
+            clusters.append({
+                "cluster": label,
+                "center_latitude": float(latitudes[members].mean()),
+                "center_longitude": float(longitudes[members].mean()),
+                "route_km": route_km,
+                "stops": stops,
+            })
+
+    return {
+        "event_date": event_date,
+        "max_distance_km": max_distance_km,
+        "clusters": clusters,
+        "unlocated_booking_ids": unlocated,
+    }
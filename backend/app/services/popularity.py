@@ -0,0 +1,167 @@
+"""
+Write-behind package popularity counters (views, quote requests, bookings).
+
+Counting a ``GET /packages/{id}`` with a database write would turn the
+hottest read path into a write path. Instead each worker counts in memory,
+in shards with their own locks (picked by thread, so request threads rarely
+contend), and a background thread drains every shard each
+POPULARITY_FLUSH_SECONDS and adds the totals to ``package_stats`` with a
+single multi-row ``INSERT ... ON CONFLICT DO UPDATE SET n = n + excluded.n``.
+Increments from several workers therefore add up, and a crash loses at most
+one interval. A failed flush puts its counts back for the next one.
+"""
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.package_stats import PackageStats
+
+VIEWS, QUOTES, BOOKINGS = 0, 1, 2
+COLUMNS = ("view_count", "quote_count", "booking_count")
+
+
+class ShardedCounters:
+    """Per-package [views, quotes, bookings] counts split across locked shards."""
+
+    def __init__(self, shards: int):
+        self._shards: List[Dict[UUID, List[int]]] = [{} for _ in range(shards)]
+        self._locks = [threading.Lock() for _ in range(shards)]
+
+    def add(self, package_id: UUID, kind: int, amount: int = 1) -> None:
+        shard = threading.get_ident() % len(self._shards)
+        with self._locks[shard]:
+            counts = self._shards[shard].get(package_id)
+            if counts is None:
+                counts = self._shards[shard][package_id] = [0, 0, 0]
+            counts[kind] += amount
+
+    def drain(self) -> Dict[UUID, List[int]]:
+        """Take every shard's counts, leaving the shards empty."""
+        totals: Dict[UUID, List[int]] = {}
+        for shard, lock in enumerate(self._locks):
+            with lock:
+                counts, self._shards[shard] = self._shards[shard], {}
+            for package_id, values in counts.items():
+                total = totals.get(package_id)
+                if total is None:
+                    totals[package_id] = values
+                else:
+                    for kind in (VIEWS, QUOTES, BOOKINGS):
+                        total[kind] += values[kind]
+        return totals
+
+    def restore(self, totals: Dict[UUID, List[int]]) -> None:
+        """Add drained counts back (after a failed flush)."""
+        for package_id, values in totals.items():
+            for kind in (VIEWS, QUOTES, BOOKINGS):
+                if values[kind]:
+                    self.add(package_id, kind, values[kind])
+
+
+def upsert_counts(db: Session, totals: Dict[UUID, List[int]]) -> None:
+    """Add counts to package_stats in one statement (not committed)."""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+
+    table = PackageStats.__table__
+    now = datetime.utcnow()
+    # Sorted so concurrent flushes from several workers lock rows in the same order
+    rows = [
+        {"package_id": package_id, **dict(zip(COLUMNS, values)), "updated_at": now}
+        for package_id, values in sorted(totals.items(), key=lambda item: str(item[0]))
+    ]
+    statement = insert(table).values(rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.package_id],
+        set_={
+            **{name: table.c[name] + statement.excluded[name] for name in COLUMNS},
+            "updated_at": statement.excluded.updated_at,
+        },
+    )
+    db.execute(statement)
+
+
+class PopularityCounters:
+    """Process-wide counters plus the thread that flushes them."""
+
+    def __init__(
+        self,
+        shards: int,
+        flush_seconds: float,
+        session_factory: Callable[[], Session] = SessionLocal
+    ):
+        self.counters = ShardedCounters(shards)
+        self.flush_seconds = flush_seconds
+        self.session_factory = session_factory
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def record_view(self, package_id: UUID) -> None:
+        self.counters.add(package_id, VIEWS)
+
+    def record_quotes(self, package_ids: Iterable[UUID]) -> None:
+        for package_id in set(package_ids):
+            self.counters.add(package_id, QUOTES)
+
+    def record_booking(self, package_id: UUID) -> None:
+        self.counters.add(package_id, BOOKINGS)
+
+    def flush(self) -> int:
+        """
+        Write pending counts to package_stats.
+
+        Returns:
+            Number of packages written (0 when nothing was pending)
+        """
+        with self._flush_lock:
+            totals = self.counters.drain()
+            if not totals:
+                return 0
+            db = self.session_factory()
+            try:
+                upsert_counts(db, totals)
+                db.commit()
+            except Exception:
+                db.rollback()
+                self.counters.restore(totals)
+                raise
+            finally:
+                db.close()
+            return len(totals)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="popularity-flush", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the flush thread and write what is still pending."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_seconds):
+            try:
+                self.flush()
+            except Exception as exc:
+                # Counts were restored; try again next interval
+                print(f"Popularity flush failed: {exc}")
+
+
+popularity = PopularityCounters(
+    shards=settings.POPULARITY_SHARDS,
+    flush_seconds=settings.POPULARITY_FLUSH_SECONDS,
+)
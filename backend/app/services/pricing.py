@@ -0,0 +1,226 @@
+"""
+In-memory price table and batch quote engine.
+
+Prices are held as int64 cents in NumPy arrays indexed by package/add-on
+position, so pricing thousands of candidate combinations is a handful of
+vectorized operations. Totals follow the same rules as ``create_booking``:
+the package must exist and be active, inactive or unknown add-ons are
+skipped, each add-on line adds ``price * quantity``, and a quote with an
+``event_date`` has the date's demand multiplier applied to the package price.
+"""
+import threading
+import time
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.demand import NEUTRAL, demand_pricing, multiplier_decimal, sign_quote
+from app.models.addon import AddOn
+from app.models.package import Package
+
+PACKAGE_UNAVAILABLE = "Package not found or not active"
+
+
+def to_cents(amount: Decimal) -> int:
+    """Convert a 2-decimal money amount to integer cents."""
+    return int((Decimal(amount) * 100).to_integral_value())
+
+
+def from_cents(cents: int) -> Decimal:
+    """Convert integer cents back to a 2-decimal Decimal."""
+    return (Decimal(int(cents)) / 100).quantize(Decimal("0.01"))
+
+
+class PriceTable:
+    """Snapshot of package and add-on prices in cents."""
+
+    def __init__(self, packages: Sequence[Tuple], addons: Sequence[Tuple]):
+        self.package_index: Dict[UUID, int] = {row[0]: i for i, row in enumerate(packages)}
+        self.package_cents = np.array([to_cents(row[1]) for row in packages], dtype=np.int64)
+        self.package_active = np.array([bool(row[2]) for row in packages], dtype=bool)
+
+        self.addon_index: Dict[UUID, int] = {row[0]: i for i, row in enumerate(addons)}
+        self.addon_cents = np.array([to_cents(row[1]) for row in addons], dtype=np.int64)
+        self.addon_active = np.array([bool(row[2]) for row in addons], dtype=bool)
+
+    @classmethod
+    def load(cls, db) -> "PriceTable":
+        packages = db.query(Package.id, Package.price, Package.is_active).all()
+        addons = db.query(AddOn.id, AddOn.price, AddOn.is_active).all()
+        return cls(packages, addons)
+
+    def quote(self, quotes: Sequence) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Price many (package, add-on lines) combinations at once.
+
+        Args:
+            quotes: Items with ``package_id`` and ``addon_ids`` (addon_id, quantity)
+
+        Returns:
+            Arrays of package cents, add-on cents and a validity mask, one entry per quote
+        """
+        count = len(quotes)
+        package_idx = np.fromiter(
+            (self.package_index.get(q.package_id, -1) for q in quotes), dtype=np.int64, count=count
+        )
+        valid = package_idx >= 0
+        valid[valid] = self.package_active[package_idx[valid]]
+        package_cents = np.zeros(count, dtype=np.int64)
+        package_cents[valid] = self.package_cents[package_idx[valid]]
+
+        # Flatten every add-on line of every quote into parallel arrays
+        line_quote, line_addon, line_qty = [], [], []
+        addon_index = self.addon_index
+        for position, q in enumerate(quotes):
+            for item in q.addon_ids or ():
+                line_quote.append(position)
+                line_addon.append(addon_index.get(item.addon_id, -1))
+                line_qty.append(item.quantity)
+
+        addon_cents = np.zeros(count, dtype=np.int64)
+        if line_quote:
+            line_quote = np.asarray(line_quote, dtype=np.int64)
+            line_addon = np.asarray(line_addon, dtype=np.int64)
+            line_qty = np.asarray(line_qty, dtype=np.int64)
+
+            known = line_addon >= 0
+            known[known] = self.addon_active[line_addon[known]]
+            line_cents = self.addon_cents[line_addon[known]] * line_qty[known]
+            np.add.at(addon_cents, line_quote[known], line_cents)
+
+        addon_cents[~valid] = 0
+        return package_cents, addon_cents, valid
+
+
+class PriceTableCache:
+    """
+    Lazily rebuilt price table.
+
+    A committed insert, update or delete of a Package or AddOn in this
+    process marks the table stale (at commit, not flush, so a rebuild never
+    caches prices that are still uncommitted); it is also rebuilt after
+    PRICE_TABLE_TTL_SECONDS to pick up changes made by other workers.
+    """
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._table: Optional[PriceTable] = None
+        self._built_at = 0.0
+        self._version = 0
+        self._built_version = -1
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        self._version += 1
+
+    def get(self) -> PriceTable:
+        now = time.monotonic()
+        table = self._table
+        if table is not None and self._built_version == self._version and now - self._built_at < self.ttl_seconds:
+            return table
+
+        with self._lock:
+            if self._table is not None and self._built_version == self._version and now - self._built_at < self.ttl_seconds:
+                return self._table
+            version = self._version
+            db = SessionLocal()
+            try:
+                self._table = PriceTable.load(db)
+            finally:
+                db.close()
+            self._built_version = version
+            self._built_at = time.monotonic()
+            return self._table
+
+
+price_tables = PriceTableCache(ttl_seconds=settings.PRICE_TABLE_TTL_SECONDS)
+
+
+PRICED_TABLES = {Package.__tablename__, AddOn.__tablename__}
+
+
+@event.listens_for(Session, "after_flush")
+def _track_price_changes(session, flush_context):
+    if any(isinstance(obj, (Package, AddOn)) for obj in list(session.new) + list(session.dirty) + list(session.deleted)):
+        session.info["price_table_stale"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_executed_price_changes(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        if orm_execute_state.statement.table.name in PRICED_TABLES:
+            orm_execute_state.session.info["price_table_stale"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_price_table(session):
+    if session.info.pop("price_table_stale", False):
+        price_tables.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_price_changes(session):
+    session.info.pop("price_table_stale", None)
+
+
+def quote_many(quotes: Sequence) -> List[dict]:
+    """
+    Price a batch of candidate bookings.
+
+    Args:
+        quotes: Items with ``package_id``, ``addon_ids`` and an optional ``event_date``
+
+    Returns:
+        One dict per quote with package_price, addons_price, total_price,
+        date_multiplier and quote_token (when a date was given) and error
+    """
+    package_cents, addon_cents, valid = price_tables.get().quote(quotes)
+    curve = demand_pricing.curve()
+    multipliers = np.fromiter(
+        (curve.multiplier(q.event_date) if q.event_date else NEUTRAL for q in quotes), dtype=np.int64, count=len(quotes)
+    )
+    # Same rounding as apply_multiplier: half up to whole cents
+    package_cents = (package_cents * multipliers + 50) // 100
+    totals = (package_cents + addon_cents).tolist()
+    package_cents = package_cents.tolist()
+    addon_cents = addon_cents.tolist()
+    valid = valid.tolist()
+    expires_at = int(time.time()) + settings.DEMAND_QUOTE_TTL_SECONDS
+    tokens: Dict[tuple, str] = {}
+
+    results = []
+    for position, q in enumerate(quotes):
+        if not valid[position]:
+            results.append({
+                "package_id": q.package_id,
+                "package_price": None,
+                "addons_price": None,
+                "total_price": None,
+                "date_multiplier": None,
+                "quote_token": None,
+                "error": PACKAGE_UNAVAILABLE,
+            })
+            continue
+        multiplier = int(multipliers[position])
+        token = None
+        if q.event_date:
+            key = (q.package_id, q.event_date, multiplier)
+            token = tokens.get(key)
+            if token is None:
+                token = tokens[key] = sign_quote(q.package_id, q.event_date, multiplier, expires_at)
+        results.append({
+            "package_id": q.package_id,
+            "package_price": from_cents(package_cents[position]),
+            "addons_price": from_cents(addon_cents[position]),
+            "total_price": from_cents(totals[position]),
+            "date_multiplier": multiplier_decimal(multiplier) if q.event_date else None,
+            "quote_token": token,
+            "error": None,
+        })
+    return results
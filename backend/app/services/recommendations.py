@@ -0,0 +1,453 @@
+"""
+"Frequently booked together" add-on recommendations.
+
+Booking add-on rows are counted into two dense NumPy matrices: bookings of
+each package that included each add-on (package × add-on), and bookings that
+included both of two add-ons (add-on × add-on, whose diagonal is the number
+of bookings with that add-on). The matrices are sized by the catalog, not by
+the number of bookings, and are built from ``booking_addons`` in chunks:
+each chunk's (booking, add-on) pairs become integer codes, and the pairs
+within a booking are generated and tallied with ``np.bincount``.
+
+The counts are kept in the shared ``addon_cooccurrence`` table, which
+``python -m scripts.rebuild_recommendations`` (and the admin endpoint)
+recount with the matrices above, together with every row of
+``addon_recommendations`` (what ``GET /packages/{id}/recommended-addons``
+reads). Between rebuilds each worker collects the increments of the bookings
+it creates, and a background thread adds them to ``addon_cooccurrence``
+every RECOMMENDATIONS_FLUSH_SECONDS with one upsert, like the popularity
+counters, then re-ranks the touched packages and add-ons from the shared
+counts, so every worker's bookings are included and no worker reads
+``booking_addons``. With sharding each shard's bookings are counted in turn
+(a booking's add-ons always live on its shard).
+"""
+import threading
+from datetime import datetime
+from itertools import repeat
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import String, cast, delete, func, insert, inspect, select, tuple_
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal, shard_router
+from app.models.addon import AddOn
+from app.models.booking import Booking, BookingAddOn
+from app.models.package import Package
+from app.models.recommendation import AddOnCoOccurrence, AddOnRecommendation
+
+PACKAGE_SOURCE = "package"
+ADDON_SOURCE = "addon"
+LOAD_CHUNK_ROWS = 200000
+
+
+class CoOccurrence:
+    """Package × add-on and add-on × add-on booking counts."""
+
+    def __init__(self, package_ids: Sequence[UUID], addon_ids: Sequence[UUID]):
+        self.package_ids = list(package_ids)
+        self.addon_ids = list(addon_ids)
+        self.package_index: Dict[UUID, int] = {package_id: i for i, package_id in enumerate(self.package_ids)}
+        self.addon_index: Dict[UUID, int] = {addon_id: i for i, addon_id in enumerate(self.addon_ids)}
+        self.package_bookings = np.zeros(len(self.package_ids), dtype=np.int64)
+        self.package_addon = np.zeros((len(self.package_ids), len(self.addon_ids)), dtype=np.int64)
+        self.addon_addon = np.zeros((len(self.addon_ids), len(self.addon_ids)), dtype=np.int64)
+
+    def add_codes(self, booking_codes: np.ndarray, package_codes: np.ndarray, addon_codes: np.ndarray) -> None:
+        """
+        Count booking add-on rows given as integer codes.
+
+        Rows must be grouped by booking (codes non-decreasing) and each
+        booking must be complete within the call. Repeated add-ons in one
+        booking count once.
+        """
+        if not len(booking_codes) or not self.addon_ids:
+            return
+        addons_total = len(self.addon_ids)
+        first_rows = np.flatnonzero(np.r_[True, booking_codes[1:] != booking_codes[:-1]])
+        booking_package = np.zeros(int(booking_codes[-1]) + 1, dtype=np.int64)
+        booking_package[booking_codes[first_rows]] = package_codes[first_rows]
+
+        # One entry per (booking, add-on), sorted by booking then add-on
+        keys = np.unique(booking_codes * addons_total + addon_codes)
+        bookings, addons = np.divmod(keys, addons_total)
+        self.package_addon += np.bincount(
+            booking_package[bookings] * addons_total + addons, minlength=self.package_addon.size
+        ).reshape(self.package_addon.shape)
+
+        # Every ordered pair of add-ons within a booking, including (a, a)
+        starts = np.flatnonzero(np.r_[True, bookings[1:] != bookings[:-1]])
+        sizes = np.diff(np.r_[starts, len(keys)])
+        row_group = np.repeat(np.arange(len(starts)), sizes)
+        repeats = sizes[row_group]
+        left = np.repeat(np.arange(len(keys)), repeats)
+        offsets = np.arange(len(left)) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+        right = np.repeat(starts[row_group], repeats) + offsets
+        self.addon_addon += np.bincount(
+            addons[left] * addons_total + addons[right], minlength=self.addon_addon.size
+        ).reshape(self.addon_addon.shape)
+
+    def add_rows(self, rows: Sequence[Tuple[str, str, str]], package_index: Dict[str, int], addon_index: Dict[str, int]) -> None:
+        """Count (booking ID, package ID, add-on ID) string rows grouped by booking."""
+        booking_col, package_col, addon_col = zip(*rows)
+        count = len(rows)
+        # Only booking boundaries matter, so bookings are compared by string hash
+        hashes = np.fromiter(map(hash, booking_col), dtype=np.int64, count=count)
+        booking_codes = np.cumsum(np.r_[True, hashes[1:] != hashes[:-1]]) - 1
+        package_codes = np.fromiter(map(package_index.get, package_col, repeat(-1, count)), dtype=np.int64, count=count)
+        addon_codes = np.fromiter(map(addon_index.get, addon_col, repeat(-1, count)), dtype=np.int64, count=count)
+        # Rows for packages or add-ons created after the catalog was read are skipped
+        known = (package_codes >= 0) & (addon_codes >= 0)
+        if not known.all():
+            booking_codes, package_codes, addon_codes = booking_codes[known], package_codes[known], addon_codes[known]
+        self.add_codes(booking_codes, package_codes, addon_codes)
+
+
+def load_cooccurrence(
+    connection: Connection,
+    chunk_rows: int = LOAD_CHUNK_ROWS,
+    booking_connections: Optional[Sequence[Connection]] = None
+) -> CoOccurrence:
+    """
+    Build the co-occurrence counts from the bookings and booking_addons tables.
+
+    IDs are read as strings and streamed in booking order, so no per-row
+    UUID objects are created and each chunk is counted with NumPy. The
+    catalog is read from ``connection``, the bookings from
+    ``booking_connections`` (one per shard; ``connection`` by default).
+    """
+    package_ids = connection.execute(select(Package.id).order_by(Package.id)).scalars().all()
+    addon_ids = connection.execute(select(AddOn.id).order_by(AddOn.id)).scalars().all()
+    matrices = CoOccurrence(package_ids, addon_ids)
+    package_index = {str(package_id): i for package_id, i in matrices.package_index.items()}
+    addon_index = {str(addon_id): i for addon_id, i in matrices.addon_index.items()}
+
+    for booking_connection in booking_connections or [connection]:
+        for package_id, bookings in booking_connection.execute(
+            select(Booking.package_id, func.count()).group_by(Booking.package_id)
+        ):
+            index = matrices.package_index.get(package_id)
+            if index is not None:
+                matrices.package_bookings[index] += bookings
+
+        result = booking_connection.execution_options(stream_results=True).execute(
+            select(cast(BookingAddOn.booking_id, String), cast(Booking.package_id, String), cast(BookingAddOn.addon_id, String))
+            .join(Booking, Booking.id == BookingAddOn.booking_id)
+            .order_by(BookingAddOn.booking_id)
+        )
+        carry: list = []
+        for rows in result.partitions(chunk_rows):
+            rows = carry + rows
+            # Hold back the last booking: its remaining rows may be in the next chunk
+            cut = len(rows)
+            while cut and rows[cut - 1][0] == rows[-1][0]:
+                cut -= 1
+            if cut:
+                matrices.add_rows(rows[:cut], package_index, addon_index)
+            carry = rows[cut:]
+        if carry:
+            matrices.add_rows(carry, package_index, addon_index)
+    return matrices
+
+
+def top_k(counts: np.ndarray, totals: np.ndarray, k: int, min_support: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Best columns per row by ``counts / totals``, ignoring counts below min_support.
+
+    Returns:
+        (column indexes, scores), both shaped (rows, k), best first; unusable entries score 0
+    """
+    k = min(k, counts.shape[1])
+    scores = np.where(counts >= min_support, counts / np.maximum(totals, 1)[:, None], 0.0)
+    if k == 0 or not len(scores):
+        return np.zeros((len(scores), 0), dtype=np.int64), np.zeros((len(scores), 0))
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind="stable")
+    return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+
+def recommendation_rows(
+    matrices: CoOccurrence,
+    k: int,
+    min_support: int,
+    packages: Optional[Sequence[int]] = None,
+    addons: Optional[Sequence[int]] = None
+) -> List[dict]:
+    """
+    Top-k rows for the given package and add-on indexes (all when None).
+    """
+    packages = np.arange(len(matrices.package_ids)) if packages is None else np.asarray(packages, dtype=np.int64)
+    addons = np.arange(len(matrices.addon_ids)) if addons is None else np.asarray(addons, dtype=np.int64)
+    now = datetime.utcnow()
+    rows = []
+
+    sources = (
+        (PACKAGE_SOURCE, packages, matrices.package_ids, matrices.package_addon[packages], matrices.package_bookings[packages], None),
+        (ADDON_SOURCE, addons, matrices.addon_ids, matrices.addon_addon[addons], matrices.addon_addon[addons, addons], addons),
+    )
+    for source_type, indexes, ids, counts, totals, own_columns in sources:
+        if own_columns is not None and len(indexes):
+            counts = counts.copy()
+            counts[np.arange(len(indexes)), own_columns] = 0  # An add-on is not recommended with itself
+        columns, scores = top_k(counts, totals, k, min_support)
+        for position, index in enumerate(indexes):
+            rank = 0
+            for column, score in zip(columns[position], scores[position]):
+                if score <= 0:
+                    break
+                rank += 1
+                rows.append({
+                    "source_type": source_type,
+                    "source_id": ids[index],
+                    "rank": rank,
+                    "addon_id": matrices.addon_ids[column],
+                    "score": float(score),
+                    "together_count": int(counts[position, column]),
+                    "updated_at": now,
+                })
+    return rows
+
+
+def cooccurrence_rows(matrices: CoOccurrence) -> List[dict]:
+    """
+    Rows of addon_cooccurrence for the counts in the matrices (non-zero counts only).
+    """
+    now = datetime.utcnow()
+    rows = [
+        {"source_type": PACKAGE_SOURCE, "source_id": package_id, "addon_id": package_id,
+         "together_count": int(bookings), "updated_at": now}
+        for package_id, bookings in zip(matrices.package_ids, matrices.package_bookings) if bookings
+    ]
+    for source_type, ids, counts in (
+        (PACKAGE_SOURCE, matrices.package_ids, matrices.package_addon),
+        (ADDON_SOURCE, matrices.addon_ids, matrices.addon_addon),
+    ):
+        for row, column in zip(*np.nonzero(counts)):
+            rows.append({
+                "source_type": source_type,
+                "source_id": ids[row],
+                "addon_id": matrices.addon_ids[column],
+                "together_count": int(counts[row, column]),
+                "updated_at": now,
+            })
+    return rows
+
+
+def upsert_cooccurrence(db: Session, increments: Dict[Tuple[str, UUID, UUID], int]) -> None:
+    """Add co-occurrence increments to addon_cooccurrence in one statement (not committed)."""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as upsert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as upsert
+
+    table = AddOnCoOccurrence.__table__
+    now = datetime.utcnow()
+    # Sorted so concurrent flushes from several workers lock rows in the same order
+    rows = [
+        {"source_type": source_type, "source_id": source_id, "addon_id": addon_id,
+         "together_count": count, "updated_at": now}
+        for (source_type, source_id, addon_id), count in sorted(
+            increments.items(), key=lambda item: (item[0][0], str(item[0][1]), str(item[0][2]))
+        )
+    ]
+    statement = upsert(table).values(rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.source_type, table.c.source_id, table.c.addon_id],
+        set_={
+            "together_count": table.c.together_count + statement.excluded.together_count,
+            "updated_at": statement.excluded.updated_at,
+        },
+    )
+    db.execute(statement)
+
+
+def ranked_rows(db: Session, sources: Sequence[Tuple[str, UUID]], k: int, min_support: int) -> List[dict]:
+    """
+    Top-k recommendation rows of some sources, ranked from the stored addon_cooccurrence counts.
+    """
+    table = AddOnCoOccurrence.__table__
+    totals: Dict[Tuple[str, UUID], int] = {}
+    candidates: Dict[Tuple[str, UUID], List[Tuple[UUID, int]]] = {source: [] for source in sources}
+    for source_type, source_id, addon_id, count in db.execute(
+        select(table.c.source_type, table.c.source_id, table.c.addon_id, table.c.together_count)
+        .where(tuple_(table.c.source_type, table.c.source_id).in_(sources))
+    ):
+        if addon_id == source_id:
+            totals[(source_type, source_id)] = count  # Also keeps an add-on from recommending itself
+        elif count >= min_support:
+            candidates[(source_type, source_id)].append((addon_id, count))
+
+    now = datetime.utcnow()
+    rows = []
+    for source, addons in candidates.items():
+        total = max(totals.get(source, 0), 1)
+        # Highest score first (one total per source, so the highest count), ties by add-on ID
+        best = sorted(addons, key=lambda item: (-item[1], str(item[0])))[:k]
+        for rank, (addon_id, count) in enumerate(best, start=1):
+            rows.append({
+                "source_type": source[0],
+                "source_id": source[1],
+                "rank": rank,
+                "addon_id": addon_id,
+                "score": count / total,
+                "together_count": count,
+                "updated_at": now,
+            })
+    return rows
+
+
+def write_recommendations(
+    db: Session,
+    rows: List[dict],
+    sources: Optional[Iterable[Tuple[str, UUID]]] = None
+) -> None:
+    """
+    Replace the stored recommendations of some sources (all when None); not committed.
+    """
+    table = AddOnRecommendation.__table__
+    if sources is None:
+        db.execute(delete(table))
+    else:
+        sources = list(sources)
+        if not sources:
+            return
+        db.execute(delete(table).where(tuple_(table.c.source_type, table.c.source_id).in_(sources)))
+    if rows:
+        db.execute(insert(table), rows)
+
+
+class Recommender:
+    """Per-worker co-occurrence increments plus the thread that flushes and re-ranks them."""
+
+    def __init__(
+        self,
+        top_k: int,
+        min_support: int,
+        flush_seconds: float,
+        session_factory: Callable[[], Session] = SessionLocal
+    ):
+        self.top_k = top_k
+        self.min_support = min_support
+        self.flush_seconds = flush_seconds
+        self.session_factory = session_factory
+        self._increments: Dict[Tuple[str, UUID, UUID], int] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def record_booking(self, package_id: UUID, addon_ids: Iterable[UUID]) -> None:
+        """Queue a committed booking's co-occurrence increments for the next flush."""
+        addons = set(addon_ids)  # Repeated add-ons in one booking count once
+        keys = [(PACKAGE_SOURCE, package_id, package_id)]
+        keys += [(PACKAGE_SOURCE, package_id, addon_id) for addon_id in addons]
+        keys += [(ADDON_SOURCE, addon_id, other) for addon_id in addons for other in addons]
+        with self._lock:
+            for key in keys:
+                self._increments[key] = self._increments.get(key, 0) + 1
+
+    def load(self) -> CoOccurrence:
+        """Count every booking's co-occurrences from booking_addons."""
+        db = self.session_factory()
+        try:
+            if shard_router.sharded:
+                with shard_router.shard_sessions(self.session_factory) as sessions:
+                    return load_cooccurrence(db.connection(), booking_connections=[
+                        session.connection(bind_arguments={"mapper": inspect(Booking)}) for session in sessions
+                    ])
+            return load_cooccurrence(db.connection())
+        finally:
+            db.close()
+
+    def rebuild(self) -> int:
+        """
+        Recount the co-occurrences and rewrite them and every stored recommendation.
+
+        Increments still pending in this worker are dropped, since the
+        recount reads their bookings.
+
+        Returns:
+            Number of recommendation rows written
+        """
+        with self._flush_lock:
+            with self._lock:
+                self._increments.clear()
+            matrices = self.load()
+            rows = recommendation_rows(matrices, self.top_k, self.min_support)
+            db = self.session_factory()
+            try:
+                db.execute(delete(AddOnCoOccurrence.__table__))
+                counts = cooccurrence_rows(matrices)
+                if counts:
+                    db.execute(insert(AddOnCoOccurrence.__table__), counts)
+                write_recommendations(db, rows)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+            return len(rows)
+
+    def flush(self) -> int:
+        """
+        Add pending increments to addon_cooccurrence and re-rank the sources they touch.
+
+        Returns:
+            Number of sources rewritten
+        """
+        with self._flush_lock:
+            with self._lock:
+                increments, self._increments = self._increments, {}
+            if not increments:
+                return 0
+            sources = sorted({key[:2] for key in increments}, key=lambda source: (source[0], str(source[1])))
+
+            db = self.session_factory()
+            try:
+                upsert_cooccurrence(db, increments)
+                write_recommendations(db, ranked_rows(db, sources, self.top_k, self.min_support), sources)
+                db.commit()
+            except Exception:
+                db.rollback()
+                with self._lock:
+                    for key, count in increments.items():
+                        self._increments[key] = self._increments.get(key, 0) + count
+                raise
+            finally:
+                db.close()
+            return len(sources)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="recommendations", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread and write what is still pending."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_seconds):
+            try:
+                self.flush()
+            except Exception as exc:
+                # Increments were restored; try again next interval
+                print(f"Recommendation update failed: {exc}")
+
+
+recommender = Recommender(
+    top_k=settings.RECOMMENDATIONS_TOP_K,
+    min_support=settings.RECOMMENDATIONS_MIN_SUPPORT,
+    flush_seconds=settings.RECOMMENDATIONS_FLUSH_SECONDS,
+)
@@ -0,0 +1,69 @@
+"""
+Helpers for multi-ID batch endpoints.
+"""
+from typing import List
+from uuid import UUID
+
+from fastapi import HTTPException, Request, status
+from fastapi.responses import RedirectResponse
+
+from app.core.config import settings
+
+
+def redirect_to_list(request: Request) -> RedirectResponse:
+    """
+    Redirect a batch lookup sent without IDs to the collection's list route.
+
+    Batch lookups sit at the prefix without a trailing slash, where a plain
+    ``GET`` used to be redirected to the list at ``prefix/``; requests
+    without IDs keep getting that redirect, query string included.
+    """
+    return RedirectResponse(
+        str(request.url.replace(path=request.url.path + "/")),
+        status_code=status.HTTP_307_TEMPORARY_REDIRECT,
+    )
+
+
+def parse_id_list(values: List[str], name: str = "ids") -> List[UUID]:
+    """
+    Parse IDs given as repeated query params and/or comma-separated lists.
+
+    Args:
+        values: Raw query values, e.g. ["a,b", "c"]
+        name: Query parameter name, for error messages
+
+    Returns:
+        Unique UUIDs in first-seen order
+
+    Raises:
+        HTTPException: If an ID is malformed or too many IDs are given
+    """
+    ids = []
+    seen = set()
+    for value in values:
+        for part in value.split(","):
+            part = part.strip()
+            if not part:
+                continue
+            try:
+                parsed = UUID(part)
+            except ValueError:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail=f"Invalid UUID in {name}: {part}"
+                )
+            if parsed not in seen:
+                seen.add(parsed)
+                ids.append(parsed)
+
+    if not ids:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"{name} must contain at least one ID"
+        )
+    if len(ids) > settings.BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.BATCH_MAX_IDS} {name} per request"
+        )
+    return ids
@@ -6,25 +6,29 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from typing import Optional
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.core.security import decode_access_token
 from app.models.user import User, UserRole
 from app.schemas.user import TokenData
+from app.utils.lookups import user_by_id
 
 # HTTP Bearer token security scheme
 security = HTTPBearer()
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+def _user_from_credentials(
+    credentials: HTTPAuthorizationCredentials,
+    db: Session,
+    primary: Optional[Session] = None
 ) -> User:
     """
-    Get the current authenticated user from JWT token.
+    Resolve a bearer token to its user.
 
     Args:
         credentials: HTTP Bearer token credentials
-        db: Database session
+        db: Session to look the user up with
+        primary: Primary session to retry with when ``db`` is a replica that
+            does not have the user yet
 
     Returns:
         The authenticated user
@@ -53,7 +57,9 @@ def get_current_user(
         )
 
     # Get user from database
-    user = db.query(User).filter(User.id == user_id).first()
+    user = user_by_id(db, user_id)
+    if user is None and primary is not None and db.info.get("read_only"):
+        user = user_by_id(primary, user_id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -64,6 +70,55 @@ def get_current_user(
     return user
 
 
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> User:
+    """
+    Get the current authenticated user from JWT token.
+
+    The user is loaded with the request's primary session, the same one a
+    write handler gets from ``get_db``.
+
+    Args:
+        credentials: HTTP Bearer token credentials
+        db: Database session
+
+    Returns:
+        The authenticated user
+
+    Raises:
+        HTTPException: If token is invalid or user not found
+    """
+    return _user_from_credentials(credentials, db)
+
+
+def get_read_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    read_db: Session = Depends(get_read_db),
+    db: Session = Depends(get_db)
+) -> User:
+    """
+    Get the current authenticated user for a GET handler using ``get_read_db``.
+
+    The user is loaded with the handler's read session, which may be a
+    replica. A user not replicated yet (e.g. just registered) is looked up
+    with the request's primary session, which only connects in that case.
+
+    Args:
+        credentials: HTTP Bearer token credentials
+        read_db: Read session shared with the handler
+        db: Primary session, for users missing from the replica
+
+    Returns:
+        The authenticated user
+
+    Raises:
+        HTTPException: If token is invalid or user not found
+    """
+    return _user_from_credentials(credentials, read_db, primary=db)
+
+
 def get_current_client(
     current_user: User = Depends(get_current_user)
 ) -> User:
@@ -87,6 +142,15 @@ def get_current_client(
     return current_user
 
 
+def _require_admin(user: User) -> User:
+    if user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized. Admin access required."
+        )
+    return user
+
+
 def get_current_admin(
     current_user: User = Depends(get_current_user)
 ) -> User:
@@ -102,9 +166,22 @@ def get_current_admin(
     Raises:
         HTTPException: If user is not an admin
     """
-    if current_user.role != UserRole.ADMIN:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized. Admin access required."
-        )
-    return current_user
+    return _require_admin(current_user)
+
+
+def get_read_admin(
+    current_user: User = Depends(get_read_user)
+) -> User:
+    """
+    Ensure the current user is an admin, for GET handlers using ``get_read_db``.
+
+    Args:
+        current_user: The authenticated user
+
+    Returns:
+        The authenticated admin user
+
+    Raises:
+        HTTPException: If user is not an admin
+    """
+    return _require_admin(current_user)
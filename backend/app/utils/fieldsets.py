@@ -0,0 +1,150 @@
+"""
+Sparse fieldsets (``?fields=`` and ``?include=``) for list endpoints.
+
+The selection is pushed into SQL: only the requested columns are loaded
+(``load_only``) and only the requested relationships are eager-loaded, and
+each row is serialized with a Pydantic model derived from the full response
+schema that has just the selected fields. Derived models are cached, so a
+given combination is built once per process.
+"""
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Type
+
+from fastapi import HTTPException, Response, status
+from pydantic import BaseModel, ConfigDict, create_model
+from sqlalchemy.orm import load_only, selectinload
+
+from app.core.streaming import stream_json_array
+
+# Always returned so clients can key rows, whatever ``fields`` says
+ALWAYS_INCLUDED = ("id",)
+
+
+class Selection(NamedTuple):
+    """Resolved ``fields`` and ``include`` of a request."""
+    fields: FrozenSet[str]
+    includes: FrozenSet[str]
+
+
+def _split(value: Optional[str]) -> List[str]:
+    if not value:
+        return []
+    return [part.strip() for part in value.split(",") if part.strip()]
+
+
+@lru_cache(maxsize=256)
+def _derive_model(schema: Type[BaseModel], fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """Build a model with only ``fields`` of ``schema`` (aliases and defaults kept)."""
+    definitions = {
+        name: (info.annotation, info)
+        for name, info in schema.model_fields.items()
+        if name in fields
+    }
+    return create_model(
+        f"{schema.__name__}Fields{abs(hash(fields)):x}",
+        __config__=ConfigDict(from_attributes=True, populate_by_name=True),
+        **definitions
+    )
+
+
+class Fieldset:
+    """
+    Sparse fieldset definition for one response schema.
+
+    Args:
+        schema: Full response schema of a single row
+        relationships: Include name (a field of ``schema``) mapped to the
+            relationship path to eager-load, e.g. ``("booking_addons", "addon")``
+        foreign_keys: Include name mapped to the local column its loader needs
+    """
+
+    def __init__(
+        self,
+        schema: Type[BaseModel],
+        relationships: Optional[Dict[str, Sequence[str]]] = None,
+        foreign_keys: Optional[Dict[str, str]] = None
+    ):
+        self.schema = schema
+        self.relationships = dict(relationships or {})
+        self.foreign_keys = dict(foreign_keys or {})
+        self.columns = tuple(name for name in schema.model_fields if name not in self.relationships)
+
+    def resolve(self, fields: Optional[str], include: Optional[str]) -> Optional[Selection]:
+        """
+        Validate the query parameters.
+
+        Args:
+            fields: Comma-separated column fields, or None for all of them
+            include: Comma-separated relationships, or None for none of them
+
+        Returns:
+            The selection, or None when neither parameter was given (full response)
+
+        Raises:
+            HTTPException: If a field or include name is unknown
+        """
+        if fields is None and include is None:
+            return None
+
+        requested = _split(fields) if fields is not None else list(self.columns)
+        unknown = [name for name in requested if name not in self.columns]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(self.columns)}"
+            )
+
+        includes = _split(include)
+        unknown = [name for name in includes if name not in self.relationships]
+        if unknown:
+            allowed = ", ".join(self.relationships) or "none"
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown include: {', '.join(unknown)}. Allowed: {allowed}"
+            )
+
+        return Selection(frozenset(requested).union(ALWAYS_INCLUDED), frozenset(includes))
+
+    def options(self, model, selection: Selection) -> list:
+        """
+        Loader options for ``model`` (the hot or the archive mapping).
+
+        Args:
+            model: ORM class whose attribute names match the schema's fields
+            selection: Resolved selection
+
+        Returns:
+            ``load_only`` for the selected columns plus one eager loader per include
+        """
+        columns = set(selection.fields)
+        columns.update(self.foreign_keys[name] for name in selection.includes if name in self.foreign_keys)
+        options = [load_only(*(getattr(model, name) for name in sorted(columns)))]
+
+        for name in sorted(selection.includes):
+            path = self.relationships[name]
+            attribute = getattr(model, path[0])
+            loader = selectinload(attribute)
+            for step in path[1:]:
+                attribute = getattr(attribute.property.mapper.class_, step)
+                loader = loader.selectinload(attribute)
+            options.append(loader)
+        return options
+
+    def model_for(self, selection: Selection) -> Type[BaseModel]:
+        """Derived (cached) response model for a selection, in schema field order."""
+        wanted = selection.fields | selection.includes
+        return _derive_model(self.schema, tuple(name for name in self.schema.model_fields if name in wanted))
+
+
+def sparse_response(rows: Iterable, schema: Type[BaseModel]) -> Response:
+    """
+    Serialize rows with a derived model, bypassing the route's full response_model.
+
+    Args:
+        rows: ORM objects loaded with the selection's options
+        schema: Model from :meth:`Fieldset.model_for`
+
+    Returns:
+        JSON array response
+    """
+    return Response(content=b"".join(stream_json_array(rows, schema)), media_type="application/json")
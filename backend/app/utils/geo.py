@@ -0,0 +1,134 @@
+"""
+Grid index and distance helpers for booking coordinates (no PostGIS needed).
+
+The globe is cut into CELL_DEGREES x CELL_DEGREES cells numbered row by row
+(``row * COLUMNS + column``), so the cells of one latitude row are a
+contiguous integer range. A radius search covers its bounding box with one
+``geo_cell BETWEEN lo AND hi`` range per row, which a B-tree index answers
+directly; the bounding box then trims the rows and the haversine distance
+decides.
+"""
+import math
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+# Changing the cell size invalidates stored geo_cell values (recompute them in a migration)
+CELL_DEGREES = 0.1
+ROWS = int(round(180 / CELL_DEGREES))
+COLUMNS = int(round(360 / CELL_DEGREES))
+KM_PER_DEGREE_LAT = math.pi * EARTH_RADIUS_KM / 180
+
+
+def cell_of(latitude: Optional[float], longitude: Optional[float]) -> Optional[int]:
+    """Grid cell of a coordinate (None without one)."""
+    if latitude is None or longitude is None:
+        return None
+    row = min(int((latitude + 90) / CELL_DEGREES), ROWS - 1)
+    column = min(int((longitude + 180) / CELL_DEGREES), COLUMNS - 1)
+    return row * COLUMNS + column
+
+
+def bounding_box(latitude: float, longitude: float, radius_km: float) -> Tuple[float, float, List[Tuple[float, float]]]:
+    """
+    Box around a circle.
+
+    Returns:
+        (south, north, longitude spans); there are two spans when the box
+        crosses the antimeridian and one full span near the poles
+    """
+    delta_lat = radius_km / KM_PER_DEGREE_LAT
+    south, north = max(latitude - delta_lat, -90.0), min(latitude + delta_lat, 90.0)
+    widest = max(abs(south), abs(north))
+    if widest >= 90.0 or radius_km >= EARTH_RADIUS_KM * math.pi / 2:
+        return south, north, [(-180.0, 180.0)]
+    delta_lon = math.degrees(radius_km / (EARTH_RADIUS_KM * math.cos(math.radians(widest))))
+    if delta_lon >= 180:
+        return south, north, [(-180.0, 180.0)]
+    west, east = longitude - delta_lon, longitude + delta_lon
+    if west < -180:
+        return south, north, [(west + 360, 180.0), (-180.0, east)]
+    if east > 180:
+        return south, north, [(west, 180.0), (-180.0, east - 360)]
+    return south, north, [(west, east)]
+
+
+def cell_ranges(south: float, north: float, spans: List[Tuple[float, float]]) -> List[Tuple[int, int]]:
+    """Inclusive geo_cell ranges covering a bounding box, one per grid row and longitude span."""
+    first_row = cell_of(south, 0) // COLUMNS
+    last_row = cell_of(north, 0) // COLUMNS
+    ranges = []
+    for row in range(first_row, last_row + 1):
+        for west, east in spans:
+            first_column = cell_of(0, west) % COLUMNS
+            last_column = cell_of(0, east) % COLUMNS
+            ranges.append((row * COLUMNS + first_column, row * COLUMNS + last_column))
+    return ranges
+
+
+def haversine_km(latitude: float, longitude: float, latitudes, longitudes) -> np.ndarray:
+    """Great-circle distances in km from one point to many."""
+    lat1, lon1 = math.radians(latitude), math.radians(longitude)
+    lat2, lon2 = np.radians(np.asarray(latitudes, dtype=float)), np.radians(np.asarray(longitudes, dtype=float))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def cluster_points(latitudes, longitudes, max_distance_km: float) -> np.ndarray:
+    """
+    Single-linkage clusters: points within max_distance_km of each other share a cluster.
+
+    Points are bucketed into cells at least max_distance_km wide, so each
+    point is only compared with the points of its own and the 8 neighbouring
+    buckets.
+
+    Returns:
+        Cluster number per point (0-based, in order of first appearance)
+    """
+    latitudes = np.asarray(latitudes, dtype=float)
+    longitudes = np.asarray(longitudes, dtype=float)
+    count = len(latitudes)
+    parent = list(range(count))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    cell_lat = max(max_distance_km / KM_PER_DEGREE_LAT, 1e-9)
+    widest = float(np.abs(latitudes).max()) if count else 0.0
+    cell_lon = min(cell_lat / max(math.cos(math.radians(min(widest, 89.0))), 1e-9), 360.0)
+    # Longitude buckets wrap around, so points either side of the antimeridian are neighbours
+    columns = max(int(360.0 // cell_lon), 1)
+    buckets = {}
+    keys = list(zip(
+        (latitudes // cell_lat).astype(np.int64).tolist(),
+        ((longitudes + 180.0) * (columns / 360.0)).astype(np.int64).clip(0, columns - 1).tolist(),
+    ))
+    for i, key in enumerate(keys):
+        buckets.setdefault(key, []).append(i)
+
+    for i, (row, column) in enumerate(keys):
+        nearby_columns = {(column + d_column) % columns for d_column in (-1, 0, 1)}
+        neighbours = [
+            j
+            for d_row in (-1, 0, 1) for nearby_column in nearby_columns
+            for j in buckets.get((row + d_row, nearby_column), ())
+            if j > i
+        ]
+        if not neighbours:
+            continue
+        distances = haversine_km(latitudes[i], longitudes[i], latitudes[neighbours], longitudes[neighbours])
+        for j, distance in zip(neighbours, distances.tolist()):
+            if distance <= max_distance_km:
+                root_i, root_j = find(i), find(j)
+                if root_i != root_j:
+                    parent[root_j] = root_i
+
+    labels = np.empty(count, dtype=np.int64)
+    numbers = {}
+    for i in range(count):
+        labels[i] = numbers.setdefault(find(i), len(numbers))
+    return labels
@@ -0,0 +1,81 @@
+"""
+Prebuilt statements for the hottest single-row lookups.
+
+``db.query(Model).filter(...).first()`` builds a new Query, a new WHERE
+clause and a new LIMIT on every call before SQLAlchemy can even look up its
+compiled form. These statements are built once at import with a bound
+parameter, so each call only binds the value and hits the compiled cache
+directly; ``python -m scripts.benchmark_lookups`` measures the difference.
+
+With shards, booking and delivery lookups first route the session to the
+shard the booking ID hashes to. Bookings moved by ``scripts.split_shards``
+keep IDs from before sharding, so a miss there is looked up on every shard.
+"""
+from typing import Callable, Optional, TypeVar
+from uuid import UUID
+
+from sqlalchemy import bindparam, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from app.core.database import shard_router
+from app.models.archive import ArchivedBooking
+from app.models.booking import Booking
+from app.models.delivery import Delivery
+from app.models.package import Package
+from app.models.user import User
+
+USER_BY_ID = select(User).where(User.id == bindparam("id"))
+PACKAGE_BY_ID = select(Package).where(Package.id == bindparam("id"))
+BOOKING_BY_ID = select(Booking).where(Booking.id == bindparam("id"))
+DELIVERY_BY_BOOKING_ID = select(Delivery).where(Delivery.booking_id == bindparam("booking_id"))
+BOOKING_EXISTS = union_all(
+    select(literal(1)).where(Booking.id == bindparam("id")),
+    select(literal(1)).where(ArchivedBooking.id == bindparam("id")),
+)
+
+T = TypeVar("T")
+
+
+def user_by_id(db: Session, user_id: UUID) -> Optional[User]:
+    return db.execute(USER_BY_ID, {"id": user_id}).scalars().first()
+
+
+def package_by_id(db: Session, package_id: UUID) -> Optional[Package]:
+    return db.execute(PACKAGE_BY_ID, {"id": package_id}).scalars().first()
+
+
+def booking_shard(db: Session, booking_id: UUID) -> Optional[int]:
+    """Shard holding a booking, hot or archived (None if no shard has it)."""
+    held = shard_router.scatter(
+        db, lambda session: session.execute(BOOKING_EXISTS, {"id": booking_id}).first() is not None
+    )
+    return next((shard for shard, found in enumerate(held) if found), None)
+
+
+def on_booking_shard(db: Session, booking_id: UUID, lookup: Callable[[], Optional[T]]) -> Optional[T]:
+    """
+    Run ``lookup`` with ``db`` routed to the shard of a booking.
+
+    A session that is not routed yet goes to the shard the ID hashes to; if
+    ``lookup`` finds nothing there, the booking is looked for on every shard.
+    """
+    if not shard_router.sharded or db.shard is not None:
+        return lookup()
+    shard_router.route(db, booking_id)
+    result = lookup()
+    if result is None:
+        shard = booking_shard(db, booking_id)
+        if shard is not None and shard != db.shard:
+            db.use_shard(shard)
+            result = lookup()
+    return result
+
+
+def booking_by_id(db: Session, booking_id: UUID) -> Optional[Booking]:
+    return on_booking_shard(db, booking_id, lambda: db.execute(BOOKING_BY_ID, {"id": booking_id}).scalars().first())
+
+
+def delivery_by_booking_id(db: Session, booking_id: UUID) -> Optional[Delivery]:
+    return on_booking_shard(
+        db, booking_id, lambda: db.execute(DELIVERY_BY_BOOKING_ID, {"booking_id": booking_id}).scalars().first()
+    )
@@ -0,0 +1,46 @@
+"""
+Pagination helpers shared by list endpoints.
+"""
+from typing import Any, Tuple
+
+from fastapi import HTTPException, Response, status
+
+from app.core.config import settings
+
+
+def enforce_page_size(limit: int, stream: bool = False) -> None:
+    """
+    Reject page sizes above MAX_PAGE_SIZE for regular (buffered) responses.
+
+    Args:
+        limit: Requested number of records
+        stream: Whether the response is streamed; streamed responses are not capped
+
+    Raises:
+        HTTPException: If limit exceeds the configured maximum
+    """
+    if not stream and limit > settings.MAX_PAGE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"limit must not exceed {settings.MAX_PAGE_SIZE}; use stream=true for larger exports"
+        )
+
+
+def with_total_count(result: Any, response: Response, total: Tuple[int, bool]) -> Any:
+    """
+    Report a list's total in ``X-Total-Count`` (``X-Total-Count-Estimated: true`` for estimates).
+
+    Args:
+        result: What the handler returns; headers go on it if it is a Response
+        response: The handler's injected response, used otherwise
+        total: (count, is_estimate) from ``total_count``
+
+    Returns:
+        ``result``, unchanged
+    """
+    target = result if isinstance(result, Response) else response
+    count, estimated = total
+    target.headers["X-Total-Count"] = str(count)
+    if estimated:
+        target.headers["X-Total-Count-Estimated"] = "true"
+    return result
@@ -1,13 +1,35 @@
 """
 Main FastAPI application entry point.
 """
+# Imported first so cold-start timings cover every other import
+from app.core.startup import (
+    startup_metrics,
+    schema_strategy,
+    verify_schema_revision,
+    prewarm,
+    include_lazy_routers,
+    FirstRequestTimer,
+)
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
-from app.core.database import init_db
-from app.routers import auth, packages, addons, bookings, delivery
+from app.core.database import engine, init_db, replica_router, shard_router, write_queue
+from app.core.compression import CompressionMiddleware
+from app.core.idempotency import IdempotencyMiddleware
+from app.core.traffic import TrafficCaptureMiddleware
+from app.core.profiling import ProfilingMiddleware
+from app.services.popularity import popularity
+from app.services.recommendations import recommender
+from app.routers import auth, packages, addons, bookings, delivery, events, users
+
+# Staff-only routers, imported on first request (prefix -> module); client routes stay eager
+LAZY_ROUTERS = {
+    "/admin": "app.routers.admin",
+    "/crew": "app.routers.crew",
+}
 
 
 @asynccontextmanager
@@ -15,11 +37,31 @@ async def lifespan(app: FastAPI):
     """
     Lifespan context manager for application startup and shutdown.
     """
-    # Startup: Initialize database tables
-    init_db()
-    print("Database initialized successfully")
+    # Startup: Make sure the schema matches the code, then warm up
+    strategy = schema_strategy()
+    if strategy == "verify":
+        revision = verify_schema_revision(engine)
+        print(f"Database schema verified at revision {revision}")
+    elif strategy == "create":
+        init_db()
+        print("Database initialized successfully")
+
+    prewarm(engine, settings.POOL_PREWARM_CONNECTIONS)
+    for replica_engine in replica_router.engines:
+        prewarm(replica_engine, settings.POOL_PREWARM_CONNECTIONS)
+    for shard_engine in dict.fromkeys(shard_router.engines):
+        if shard_engine is not engine:
+            prewarm(shard_engine, settings.POOL_PREWARM_CONNECTIONS)
+    popularity.start()
+    recommender.start()
+    startup_metrics.mark_started()
+    print(f"Startup completed in {startup_metrics.as_dict()['time_to_ready_ms']} ms")
     yield
     # Shutdown: Clean up resources
+    popularity.stop()
+    recommender.stop()
+    if write_queue is not None:
+        write_queue.stop()
     print("Application shutting down")
 
 
@@ -39,6 +81,20 @@ if "http://127.0.0.1:5173" not in allowed_origins:
   allowed_origins.append("http://127.0.0.1:5173")
 print(f"CORS allowed origins: {allowed_origins}")
 
+# Replay stored responses for retried POSTs carrying an Idempotency-Key
+app.add_middleware(
+    IdempotencyMiddleware,
+    paths=["/bookings/", "/auth/register"],
+)
+
+# Compress large and streamed responses (outside idempotency so replays are re-encoded per client)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=allowed_origins,
@@ -48,12 +104,29 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+# Record sanitized request traces for replay (opt-in)
+if settings.TRAFFIC_CAPTURE_PATH:
+    app.add_middleware(
+        TrafficCaptureMiddleware,
+        path=settings.TRAFFIC_CAPTURE_PATH,
+        sample_rate=settings.TRAFFIC_CAPTURE_SAMPLE_RATE,
+        max_body_bytes=settings.TRAFFIC_CAPTURE_MAX_BODY_BYTES,
+    )
+
+# Profile requests on demand (admin X-Profile header, PROFILE_ROUTES, PROFILE_SAMPLE_RATE)
+app.add_middleware(ProfilingMiddleware)
+
+app.add_middleware(FirstRequestTimer)
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(packages.router)
 app.include_router(addons.router)
 app.include_router(bookings.router)
 app.include_router(delivery.router)
+app.include_router(events.router)
+app.include_router(users.router)
+include_lazy_routers(app, LAZY_ROUTERS)
 
 
 @app.get("/")
@@ -74,7 +147,11 @@ def health_check():
     """
     Health check endpoint.
     """
-    return {"status": "healthy", "service": settings.APP_NAME}
+    return {
+        "status": "healthy",
+        "service": settings.APP_NAME,
+        "startup": startup_metrics.as_dict()
+    }
 
 
 if __name__ == "__main__":
@@ -0,0 +1,31 @@
+"""
+Move finished bookings older than ARCHIVE_AFTER_DAYS into the archive tables.
+
+Usage (from the backend directory, e.g. nightly from cron):
+    python -m scripts.archive_bookings --older-than-days 365 --batch-size 500
+"""
+import argparse
+
+from app.services.archival import archive_bookings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--older-than-days", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--pause", type=float, default=None, help="Seconds to sleep between batches")
+    parser.add_argument("--max-batches", type=int, default=None)
+    args = parser.parse_args()
+
+    total = archive_bookings(
+        older_than_days=args.older_than_days,
+        batch_size=args.batch_size,
+        pause_seconds=args.pause,
+        max_batches=args.max_batches,
+        progress=lambda archived: print(f"Archived {archived} bookings so far"),
+    )
+    print(f"Done: archived {total} bookings")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Run, resume or estimate the backfills defined in a migration.
+
+A migration's backfills are the module-level ``Backfill`` objects in its
+file under alembic/versions. They normally run inside ``alembic upgrade``
+(see app.services.backfill). This script estimates them beforehand with
+--dry-run: the migrations up to it run in a transaction, a few batches of
+each backfill are timed, and everything is rolled back. Once the
+migration is applied it also resumes an interrupted backfill, or reruns
+one with --restart.
+
+Usage (from the backend directory):
+    python -m scripts.backfill c9e4a7b2d6f1 --dry-run
+    python -m scripts.backfill c9e4a7b2d6f1 --name bookings_is_open
+    python -m scripts.backfill --status
+"""
+import argparse
+import sys
+from pathlib import Path
+
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, delete, event, select
+
+from app.core.database import engine
+from app.services.backfill import (
+    Backfill, checkpoints, dry_run, estimate_backfill, print_progress, run_backfill
+)
+
+ALEMBIC_DIR = Path(__file__).resolve().parent.parent / "alembic"
+
+
+def load_revision(revision: str):
+    """
+    The Alembic revision (full id or unique prefix) and the revisions the
+    database still lacks up to it, oldest first (empty once applied).
+    """
+    config = Config()
+    config.set_main_option("script_location", str(ALEMBIC_DIR))
+    script = ScriptDirectory.from_config(config)
+    migration = script.get_revision(revision)
+    if migration is None:
+        sys.exit(f"Unknown revision {revision!r}")
+    with engine.connect() as connection:
+        heads = MigrationContext.configure(connection).get_current_heads()
+    pending = list(script.iterate_revisions(migration.revision, heads or "base"))
+    return migration, pending[::-1]
+
+
+def transactional_engine():
+    """
+    Engine whose transactions also roll back DDL.
+
+    pysqlite runs ALTER TABLE outside the transaction it opens for DML, so
+    SQLite connections get an explicit BEGIN instead.
+    """
+    if engine.dialect.name != "sqlite":
+        return engine
+    sqlite_engine = create_engine(engine.url)
+
+    @event.listens_for(sqlite_engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(sqlite_engine, "begin")
+    def _begin(connection):
+        connection.exec_driver_sql("BEGIN")
+
+    return sqlite_engine
+
+
+def estimate(pending, backfills, sample_batches: int):
+    """
+    Estimate backfills, rolling back every change.
+
+    Migrations the database still lacks run first in the same transaction,
+    so the backfills see the schema they expect.
+    """
+    with transactional_engine().connect() as connection:
+        transaction = connection.begin()
+        try:
+            if not pending:
+                return [estimate_backfill(connection, backfill, sample_batches) for backfill in backfills]
+            names = {backfill.name for backfill in backfills}
+            with dry_run(sample_batches) as estimates, Operations.context(MigrationContext.configure(connection)):
+                for revision in pending:
+                    revision.module.upgrade()
+            return [item for item in estimates if item.name in names]
+        finally:
+            transaction.rollback()
+
+
+def print_status():
+    with engine.connect() as connection:
+        rows = connection.execute(select(checkpoints).order_by(checkpoints.c.started_at)).all()
+    if not rows:
+        print("No backfills recorded")
+    for row in rows:
+        state = f"completed {row.completed_at:%Y-%m-%d %H:%M}" if row.completed_at else f"at key {row.last_key}"
+        print(f"{row.name} ({row.table_name}): {row.rows_visited} rows visited, "
+              f"{row.rows_updated} updated in {row.batches} batches, {state}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("revision", nargs="?", help="Migration revision (or a unique prefix)")
+    parser.add_argument("--name", help="Only this backfill of the migration")
+    parser.add_argument("--dry-run", action="store_true", help="Estimate the run time without changing anything")
+    parser.add_argument("--sample-batches", type=int, default=3, help="Batches timed by --dry-run")
+    parser.add_argument("--max-batches", type=int, default=None)
+    parser.add_argument("--restart", action="store_true", help="Discard the checkpoint and start from the first row")
+    parser.add_argument("--status", action="store_true", help="List recorded backfills and exit")
+    args = parser.parse_args()
+
+    if args.status:
+        print_status()
+        return
+    if not args.revision:
+        parser.error("a revision is required unless --status is given")
+
+    migration, pending = load_revision(args.revision)
+    backfills = [
+        value for value in vars(migration.module).values()
+        if isinstance(value, Backfill) and args.name in (None, value.name)
+    ]
+    if not backfills:
+        sys.exit("No matching backfills in that migration")
+
+    if args.dry_run:
+        for item in estimate(pending, backfills, args.sample_batches):
+            print(f"{item.name}: {item.remaining_rows} rows left in {item.batches} batches; "
+                  f"{item.seconds_per_batch * 1000:.1f} ms per batch + {item.sleep_per_batch * 1000:.1f} ms "
+                  f"pause, ~{item.rows_updated_per_batch:.0f} rows updated per batch "
+                  f"(from {item.sample_batches} sample batches): about {item.estimated_seconds:.0f} s")
+        return
+    if pending:
+        sys.exit(f"{migration.revision} is not applied; run alembic upgrade (it runs the backfills)")
+
+    for backfill in backfills:
+        if args.restart:
+            with engine.begin() as connection:
+                connection.execute(delete(checkpoints).where(checkpoints.c.name == backfill.name))
+        state = run_backfill(engine, backfill, max_batches=args.max_batches, progress=print_progress)
+        print(f"{backfill.name}: {'done' if state.done else 'stopped'}, {state.rows_updated} rows updated")
+
+
+if __name__ == "__main__":
+    main()
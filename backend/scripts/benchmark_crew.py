@@ -0,0 +1,84 @@
+"""
+Time crew auto-assignment for a month of bookings.
+
+Creates a throwaway SQLite database with a generated catalog, STAFF staff
+members and BOOKINGS pending bookings spread over 30 days, then times
+``plan_assignments`` (planning only) and ``auto_assign`` (planning plus the
+bulk insert). The target is under one second for 200 staff.
+
+Usage (from the backend directory):
+    python -m scripts.benchmark_crew --staff 200 --bookings 10000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import uuid
+from datetime import date, datetime, time as time_of_day, timedelta
+from decimal import Decimal
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models import Booking, BookingStatus, StaffMember, StaffRole
+from app.services.crew import auto_assign, plan_assignments
+from scripts.dataset import generate_dataset
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--staff", type=int, default=200)
+    parser.add_argument("--bookings", type=int, default=10000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    temp_dir = tempfile.TemporaryDirectory()
+    engine = create_engine(f"sqlite:///{os.path.join(temp_dir.name, 'crew.db')}")
+    Base.metadata.create_all(bind=engine)
+    ids = generate_dataset(engine, users=1000, bookings=0, seed=args.seed)
+
+    now = datetime.utcnow()
+    first_day = date.today() + timedelta(days=30)
+    staff_rows = [
+        {"id": uuid.uuid4(), "full_name": f"Staff {i}", "email": f"staff{i}@dataset.example.com",
+         "role": StaffRole.PHOTOGRAPHER if i % 2 == 0 else StaffRole.VIDEOGRAPHER,
+         "is_active": True, "created_at": now}
+        for i in range(args.staff)
+    ]
+    booking_rows = [
+        {"id": uuid.uuid4(), "user_id": rng.choice(ids["clients"]), "package_id": rng.choice(ids["packages"]),
+         "event_type": "wedding", "event_date": first_day + timedelta(days=rng.randrange(args.days)),
+         "event_time": time_of_day(rng.randint(8, 20), rng.choice([0, 30])), "location": "1 Main Street, Paris",
+         "status": BookingStatus.PENDING, "total_price": Decimal(500), "notes": None, "admin_notes": None,
+         "created_at": now, "updated_at": now}
+        for _ in range(args.bookings)
+    ]
+    with engine.begin() as connection:
+        connection.execute(insert(StaffMember.__table__), staff_rows)
+        connection.execute(insert(Booking.__table__), booking_rows)
+
+    session_factory = sessionmaker(bind=engine)
+    last_day = first_day + timedelta(days=args.days - 1)
+    print(f"{args.bookings} bookings over {args.days} days, {args.staff} staff")
+
+    with session_factory() as db:
+        plan = plan_assignments(db, first_day, last_day)
+    print(f"plan_assignments: {plan.elapsed_ms:.0f} ms, "
+          f"{len(plan.assigned)} assigned, {len(plan.unfilled)} unfilled")
+
+    with session_factory() as db:
+        started = time.perf_counter()
+        plan = auto_assign(db, first_day, last_day)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+    print(f"auto_assign (with insert): {elapsed_ms:.0f} ms, {len(plan.assigned)} assignments written")
+
+    engine.dispose()
+    temp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
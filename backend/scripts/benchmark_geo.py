@@ -0,0 +1,97 @@
+"""
+Time radius searches over booking coordinates.
+
+A throwaway SQLite database gets a generated dataset of BOOKINGS bookings
+(90% with coordinates around eight cities), then SEARCHES random points near
+those cities are searched with ``nearby_bookings`` (geo_cell ranges, then the
+bounding box, then haversine) with and without a date, and compared with a
+plain bounding box query that has no index to use. The busiest day's route
+cluster report is timed last.
+
+Usage (from the backend directory):
+    python -m scripts.benchmark_geo --bookings 1000000 --radius 5
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import create_engine, func, or_, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.booking import Booking
+from app.services.geo_search import nearby_bookings, route_clusters
+from app.utils.geo import bounding_box
+from scripts.dataset import CITY_CENTRES, generate_dataset
+
+
+def timed(function, repeat: int) -> float:
+    """Mean milliseconds per call."""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - started) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bookings", type=int, default=1_000_000)
+    parser.add_argument("--searches", type=int, default=50)
+    parser.add_argument("--radius", type=float, default=5.0, help="Search radius in km")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    temp_dir = tempfile.TemporaryDirectory()
+    engine = create_engine(f"sqlite:///{os.path.join(temp_dir.name, 'geo.db')}")
+    Base.metadata.create_all(bind=engine)
+    started = time.perf_counter()
+    generate_dataset(engine, bookings=args.bookings, seed=args.seed)
+    print(f"Generated {args.bookings} bookings in {time.perf_counter() - started:.1f} s")
+
+    rng = random.Random(args.seed)
+    centres = list(CITY_CENTRES.values())
+    points = [
+        (lat + rng.uniform(-0.2, 0.2), lon + rng.uniform(-0.25, 0.25))
+        for lat, lon in (rng.choice(centres) for _ in range(args.searches))
+    ]
+    session = sessionmaker(bind=engine)()
+    busiest = session.execute(
+        select(Booking.event_date).group_by(Booking.event_date).order_by(func.count().desc()).limit(1)
+    ).scalar()
+
+    results = []
+
+    def search_all(event_date=None):
+        results.clear()
+        for lat, lon in points:
+            results.append(len(nearby_bookings(session, lat, lon, args.radius, event_date=event_date, limit=100)))
+
+    def scan_all():
+        for lat, lon in points:
+            south, north, spans = bounding_box(lat, lon, args.radius)
+            session.execute(
+                select(func.count()).select_from(Booking).where(
+                    Booking.latitude.between(south, north),
+                    or_(*[Booking.longitude.between(west, east) for west, east in spans]),
+                )
+            ).scalar()
+
+    print(f"nearby, any date:   {timed(search_all, 1) / args.searches:7.2f} ms/search "
+          f"({sum(results) / len(results):.0f} results on average, limit 100)")
+    print(f"nearby, {busiest}: {timed(lambda: search_all(busiest), 1) / args.searches:7.2f} ms/search "
+          f"({sum(results) / len(results):.1f} results on average)")
+    print(f"bounding box scan:  {timed(scan_all, 1) / args.searches:7.2f} ms/search (no geo_cell index)")
+    report = {}
+    elapsed = timed(lambda: report.update(route_clusters(session, busiest, 15.0)), 5)
+    stops = sum(len(cluster["stops"]) for cluster in report["clusters"])
+    print(f"route clusters for {busiest}: {elapsed:.2f} ms ({stops} stops in {len(report['clusters'])} clusters)")
+
+    session.close()
+    engine.dispose()
+    temp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Compare ORM Query lookups with the prebuilt statements in app/utils/lookups.py.
+
+Each lookup runs against a throwaway SQLite database filled by
+scripts/dataset.py, with the identity map cleared between calls so every
+call builds (or reuses) its statement and executes it, as a request does.
+The "request" row repeats the lookups GET /delivery/{booking_id} makes:
+user, booking and delivery.
+
+Usage (from the backend directory):
+    python -m scripts.benchmark_lookups --iterations 5000
+"""
+import argparse
+import os
+import tempfile
+import timeit
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models import Booking, Delivery, Package, User
+from app.utils.lookups import booking_by_id, delivery_by_booking_id, package_by_id, user_by_id
+from scripts.dataset import generate_dataset
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3, help="Best of this many runs is reported")
+    args = parser.parse_args()
+
+    temp_dir = tempfile.TemporaryDirectory()
+    engine = create_engine(f"sqlite:///{os.path.join(temp_dir.name, 'lookups.db')}")
+    Base.metadata.create_all(bind=engine)
+    generate_dataset(engine, users=500, bookings=5000)
+
+    db = sessionmaker(bind=engine)()
+    user_id = db.execute(select(User.id).limit(1)).scalar()
+    package_id = db.execute(select(Package.id).limit(1)).scalar()
+    booking_id = db.execute(select(Delivery.booking_id).limit(1)).scalar()
+
+    def orm_request():
+        db.query(User).filter(User.id == user_id).first()
+        db.query(Booking).filter(Booking.id == booking_id).first()
+        db.query(Delivery).filter(Delivery.booking_id == booking_id).first()
+
+    def prebuilt_request():
+        user_by_id(db, user_id)
+        booking_by_id(db, booking_id)
+        delivery_by_booking_id(db, booking_id)
+
+    cases = [
+        ("user by id",
+         lambda: db.query(User).filter(User.id == user_id).first(),
+         lambda: user_by_id(db, user_id)),
+        ("package by id",
+         lambda: db.query(Package).filter(Package.id == package_id).first(),
+         lambda: package_by_id(db, package_id)),
+        ("booking by id",
+         lambda: db.query(Booking).filter(Booking.id == booking_id).first(),
+         lambda: booking_by_id(db, booking_id)),
+        ("delivery by booking_id",
+         lambda: db.query(Delivery).filter(Delivery.booking_id == booking_id).first(),
+         lambda: delivery_by_booking_id(db, booking_id)),
+        ("request (user, booking, delivery)", orm_request, prebuilt_request),
+    ]
+
+    def per_call_us(lookup) -> float:
+        def call():
+            lookup()
+            db.expunge_all()
+
+        call()  # Warm the compiled cache
+        best = min(timeit.repeat(call, number=args.iterations, repeat=args.repeat))
+        return best / args.iterations * 1e6
+
+    print(f"{'lookup':36s} {'ORM query':>12s} {'prebuilt':>12s} {'saved':>8s}")
+    for name, orm_lookup, prebuilt_lookup in cases:
+        orm_us = per_call_us(orm_lookup)
+        prebuilt_us = per_call_us(prebuilt_lookup)
+        print(f"{name:36s} {orm_us:9.1f} us {prebuilt_us:9.1f} us {(1 - prebuilt_us / orm_us) * 100:7.1f}%")
+
+    db.close()
+    engine.dispose()
+    temp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
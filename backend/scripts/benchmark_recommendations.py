@@ -0,0 +1,88 @@
+"""
+Time the add-on co-occurrence rebuild.
+
+Two measurements:
+
+1. Counting: ROWS synthetic booking add-on rows (1-4 add-ons per booking,
+   already decoded to integer codes) are counted in LOAD_CHUNK_ROWS chunks,
+   as ``load_cooccurrence`` does after reading them. The target is a few
+   seconds for 10M rows.
+2. End to end: a throwaway SQLite database with a generated dataset of
+   BOOKINGS bookings is read, counted and written to addon_cooccurrence and
+   addon_recommendations with ``Recommender.rebuild``.
+
+Usage (from the backend directory):
+    python -m scripts.benchmark_recommendations --rows 10000000 --bookings 200000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models import AddOnRecommendation, BookingAddOn
+from app.services.recommendations import LOAD_CHUNK_ROWS, CoOccurrence, Recommender
+from scripts.dataset import generate_dataset
+
+
+def synthetic_codes(rows: int, packages: int, addons: int, seed: int):
+    """Booking, package and add-on codes for about ``rows`` rows, grouped by booking."""
+    rng = np.random.default_rng(seed)
+    sizes = rng.integers(1, 5, size=rows // 2 + 1)
+    sizes = sizes[:np.searchsorted(np.cumsum(sizes), rows) + 1]
+    booking_codes = np.repeat(np.arange(len(sizes)), sizes)
+    package_codes = rng.integers(0, packages, size=len(sizes))[booking_codes]
+    addon_codes = rng.integers(0, addons, size=len(booking_codes))
+    return booking_codes, package_codes, addon_codes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--bookings", type=int, default=200_000)
+    parser.add_argument("--packages", type=int, default=50)
+    parser.add_argument("--addons", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    booking_codes, package_codes, addon_codes = synthetic_codes(args.rows, args.packages, args.addons, args.seed)
+    matrices = CoOccurrence(range(args.packages), range(args.addons))
+    started = time.perf_counter()
+    start = 0
+    while start < len(booking_codes):
+        # Chunks end on a booking boundary, like the streamed load
+        end = min(start + LOAD_CHUNK_ROWS, len(booking_codes))
+        while end < len(booking_codes) and booking_codes[end] == booking_codes[end - 1]:
+            end += 1
+        matrices.add_codes(booking_codes[start:end], package_codes[start:end], addon_codes[start:end])
+        start = end
+    elapsed = time.perf_counter() - started
+    print(f"Counting: {len(booking_codes)} rows ({booking_codes[-1] + 1} bookings) in {elapsed:.2f} s")
+
+    temp_dir = tempfile.TemporaryDirectory()
+    engine = create_engine(f"sqlite:///{os.path.join(temp_dir.name, 'recommendations.db')}")
+    Base.metadata.create_all(bind=engine)
+    generate_dataset(engine, packages=args.packages, addons=args.addons, bookings=args.bookings, seed=args.seed)
+    with engine.connect() as connection:
+        addon_rows = connection.execute(select(func.count()).select_from(BookingAddOn)).scalar()
+
+    recommender = Recommender(top_k=10, min_support=2, flush_seconds=5,
+                              session_factory=sessionmaker(bind=engine))
+    started = time.perf_counter()
+    written = recommender.rebuild()
+    elapsed = time.perf_counter() - started
+    with engine.connect() as connection:
+        stored = connection.execute(select(func.count()).select_from(AddOnRecommendation)).scalar()
+    print(f"Rebuild from SQLite: {addon_rows} booking_addons rows in {elapsed:.2f} s "
+          f"({written} recommendations written, {stored} stored)")
+
+    engine.dispose()
+    temp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Compare SQLite write throughput with and without the single-writer queue.
+
+A throwaway SQLite database (WAL, synchronous=FULL in both modes) gets a small
+generated dataset. Then WRITERS threads each create bookings the way
+``POST /bookings/`` does for SECONDS: look up the package, add a booking
+with one add-on, commit. That includes the user_booking_summary upkeep.
+"direct" commits on each thread's own pooled connection; "queue" hands
+the commit to app.core.write_queue. Failed commits (e.g. ``database is
+locked``) are counted, not retried. The cost of a one-row commit is
+printed first, since that is what group commit saves.
+
+Usage (from the backend directory):
+    python -m scripts.benchmark_write_queue --writers 1 16 64 --seconds 5
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+import uuid
+from datetime import date, time as time_of_day, timedelta
+from decimal import Decimal
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.core.write_queue import QueuedSession, WriteQueue
+from app.models.addon import AddOn
+from app.models.booking import Booking, BookingAddOn, BookingStatus
+from app.models.package import Package
+from app.services import booking_summary  # noqa: F401 - summary upkeep runs in the commit, as in the app
+from scripts.dataset import generate_dataset
+
+
+def create_booking(session_factory, ids, rng) -> None:
+    db = session_factory()
+    try:
+        package = db.get(Package, rng.choice(ids["packages"]))
+        addon = db.get(AddOn, rng.choice(ids["addons"]))
+        booking = Booking(
+            id=uuid.uuid4(), user_id=rng.choice(ids["clients"]), package_id=package.id,
+            event_type="wedding", event_date=date.today() + timedelta(days=rng.randint(1, 365)),
+            event_time=time_of_day(10, 0), location="1 Main Street, Paris", status=BookingStatus.PENDING,
+            total_price=Decimal(package.price) + addon.price,
+        )
+        db.add(booking)
+        db.add(BookingAddOn(booking_id=booking.id, addon_id=addon.id, quantity=1))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def commit_cost_ms(engine, commits: int = 200) -> float:
+    """Mean time of a one-row commit: roughly this disk's fsync cost, which group commit shares out."""
+    with engine.connect() as connection:
+        connection.execute(text("CREATE TABLE fsync_probe (n INTEGER)"))
+        connection.commit()
+        started = time.perf_counter()
+        for n in range(commits):
+            connection.execute(text("INSERT INTO fsync_probe VALUES (:n)"), {"n": n})
+            connection.commit()
+        elapsed = time.perf_counter() - started
+        connection.execute(text("DROP TABLE fsync_probe"))
+        connection.commit()
+    return elapsed / commits * 1000
+
+
+def run(session_factory, ids, writers: int, seconds: float):
+    """Commits, errors and sorted latencies (ms) of ``writers`` threads over ``seconds``."""
+    latencies, errors = [], []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def writer(seed):
+        rng = random.Random(seed)
+        own_latencies, own_errors = [], 0
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                create_booking(session_factory, ids, rng)
+            except OperationalError:
+                own_errors += 1
+                continue
+            own_latencies.append((time.perf_counter() - started) * 1000)
+        with lock:
+            latencies.extend(own_latencies)
+            errors.append(own_errors)
+
+    threads = [threading.Thread(target=writer, args=(seed,)) for seed in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(latencies), sum(errors), sorted(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--max-batch", type=int, default=64)
+    args = parser.parse_args()
+
+    temp_dir = tempfile.TemporaryDirectory()
+    url = f"sqlite:///{os.path.join(temp_dir.name, 'writes.db')}"
+    engine = create_engine(url, pool_size=max(args.writers) + 5)
+
+    @event.listens_for(engine, "connect")
+    def _wal(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=FULL")
+        cursor.close()
+
+    Base.metadata.create_all(bind=engine)
+    ids = generate_dataset(engine, users=200, bookings=1000)
+    # On fast disks the queue mostly trims tail latency; the slower the fsync, the more batching pays
+    print(f"One-row commit on this disk: {commit_cost_ms(engine):.2f} ms")
+
+    print(f"{'mode':<7}{'writers':>8}{'commits/s':>11}{'p50 ms':>9}{'p99 ms':>9}{'errors':>8}{'avg batch':>11}")
+    for writers in args.writers:
+        for mode in ("direct", "queue"):
+            write_queue = None
+            if mode == "queue":
+                write_queue = WriteQueue(engine, max_batch=args.max_batch, timeout_seconds=60)
+                session_factory = sessionmaker(bind=engine, autoflush=False, class_=QueuedSession, write_queue=write_queue)
+            else:
+                session_factory = sessionmaker(bind=engine, autoflush=False)
+            commits, errors, latencies = run(session_factory, ids, writers, args.seconds)
+            batch = "-"
+            if write_queue is not None:
+                write_queue.stop()
+                batch = f"{write_queue.jobs_committed / max(write_queue.batches_committed, 1):.1f}"
+            p50 = latencies[len(latencies) // 2] if latencies else 0.0
+            p99 = latencies[int(len(latencies) * 0.99)] if latencies else 0.0
+            print(f"{mode:<7}{writers:>8}{commits / args.seconds:>11.0f}{p50:>9.1f}{p99:>9.1f}{errors:>8}{batch:>11}")
+
+    engine.dispose()
+    temp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+Recount user_booking_summary from the booking, delivery and archive tables.
+
+Runs in batches of users, one transaction each, so it can run against a live
+database. Rows that differ are rewritten unless --dry-run is given; also
+fills the table after the migration that creates it.
+
+Usage (from the backend directory):
+    python -m scripts.check_booking_summary --batch-size 500
+    python -m scripts.check_booking_summary --dry-run
+"""
+import argparse
+
+from app.services.booking_summary import check_summaries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between batches")
+    parser.add_argument("--dry-run", action="store_true", help="Report differing rows without fixing them")
+    args = parser.parse_args()
+
+    checked, mismatched = check_summaries(
+        batch_size=args.batch_size,
+        fix=not args.dry_run,
+        pause_seconds=args.pause,
+        progress=lambda checked, mismatched: print(f"Checked {checked} users, {mismatched} summaries differed"),
+    )
+    action = "found" if args.dry_run else "fixed"
+    print(f"Done: checked {checked} users, {action} {mismatched} differing summaries")
+
+
+if __name__ == "__main__":
+    main()
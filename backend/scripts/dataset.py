@@ -0,0 +1,153 @@
+"""
+Synthetic dataset generator shared by the audit, benchmark and replay scripts.
+
+Rows are inserted with Core executemany in chunks, so a few hundred thousand
+bookings take seconds on SQLite. Never point this at a production database.
+"""
+import random
+import uuid
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Dict, List
+
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+
+from app.core.security import get_password_hash
+from app.models.addon import AddOn, AddOnCategory
+from app.models.booking import Booking, BookingAddOn, BookingStatus
+from app.models.delivery import Delivery
+from app.models.package import Package, PackageCategory
+from app.models.user import User, UserRole
+from app.utils.geo import cell_of
+
+DATASET_PASSWORD = "dataset-password"
+EVENT_TYPES = ["wedding", "birthday", "corporate", "graduation", "concert", "portrait"]
+CITIES = ["Addis Ababa", "Nairobi", "Paris", "Berlin", "Lisbon", "Austin", "Toronto", "Osaka"]
+CITY_CENTRES = {
+    "Addis Ababa": (9.03, 38.74), "Nairobi": (-1.29, 36.82), "Paris": (48.86, 2.35), "Berlin": (52.52, 13.40),
+    "Lisbon": (38.72, -9.14), "Austin": (30.27, -97.74), "Toronto": (43.65, -79.38), "Osaka": (34.69, 135.50),
+}
+# Share of generated bookings with coordinates
+LOCATED_SHARE = 0.9
+
+
+def _insert_chunked(engine: Engine, table, rows: List[dict], chunk_size: int = 5000) -> None:
+    with engine.begin() as connection:
+        for start in range(0, len(rows), chunk_size):
+            connection.execute(insert(table), rows[start:start + chunk_size])
+
+
+def generate_dataset(
+    engine: Engine,
+    users: int = 1000,
+    packages: int = 50,
+    addons: int = 30,
+    bookings: int = 20000,
+    seed: int = 42
+) -> Dict[str, List[uuid.UUID]]:
+    """
+    Insert a reproducible synthetic dataset.
+
+    Args:
+        engine: Target engine (tables must already exist)
+        users: Number of client users (one admin is always added)
+        packages: Number of packages (about 80% active)
+        addons: Number of add-ons (about 80% active)
+        bookings: Number of bookings (add-ons and deliveries are derived)
+        seed: Random seed
+
+    Returns:
+        Generated ids by kind: "admins", "clients", "packages", "addons", "bookings"
+    """
+    rng = random.Random(seed)
+    # Coordinates draw from their own generator, so LOCATED_SHARE does not reshuffle the other columns
+    geo_rng = random.Random(seed + 1)
+    now = datetime.utcnow()
+    today = date.today()
+    # One bcrypt hash shared by every generated user keeps generation fast
+    password = get_password_hash(DATASET_PASSWORD)
+
+    def new_id():
+        return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+    admin_ids = [new_id()]
+    client_ids = [new_id() for _ in range(users)]
+    user_rows = [
+        {"id": user_id, "email": f"admin{i}@dataset.example.com", "password": password, "full_name": f"Admin {i}",
+         "role": UserRole.ADMIN, "created_at": now, "updated_at": now}
+        for i, user_id in enumerate(admin_ids)
+    ] + [
+        {"id": user_id, "email": f"client{i}@dataset.example.com", "password": password, "full_name": f"Client {i}",
+         "role": UserRole.CLIENT, "created_at": now, "updated_at": now}
+        for i, user_id in enumerate(client_ids)
+    ]
+
+    package_ids = [new_id() for _ in range(packages)]
+    package_rows = [
+        {"id": package_id, "title": f"Package {i}", "description": "Generated package",
+         "category": rng.choice(list(PackageCategory)), "price": Decimal(rng.randint(100, 3000)),
+         "duration": rng.randint(1, 10), "features": ["coverage", "editing"],
+         "is_active": rng.random() < 0.8, "created_at": now, "updated_at": now}
+        for i, package_id in enumerate(package_ids)
+    ]
+
+    addon_ids = [new_id() for _ in range(addons)]
+    addon_rows = [
+        {"id": addon_id, "name": f"Add-on {i}", "description": None,
+         "category": rng.choice(list(AddOnCategory)), "price": Decimal(rng.randint(10, 500)),
+         "is_active": rng.random() < 0.8, "created_at": now}
+        for i, addon_id in enumerate(addon_ids)
+    ]
+
+    booking_ids = []
+    booking_rows, booking_addon_rows, delivery_rows = [], [], []
+    statuses = list(BookingStatus)
+    for _ in range(bookings):
+        booking_id = new_id()
+        booking_ids.append(booking_id)
+        event_date = today + timedelta(days=rng.randint(-730, 365))
+        created_at = now - timedelta(days=rng.randint(0, 900), seconds=rng.randint(0, 86400))
+        status = rng.choice(statuses)
+        city = rng.choice(CITIES)
+        latitude = longitude = None
+        if geo_rng.random() < LOCATED_SHARE:
+            # Within about 30 km of the city centre
+            centre_lat, centre_lon = CITY_CENTRES[city]
+            latitude = round(centre_lat + geo_rng.uniform(-0.27, 0.27), 6)
+            longitude = round(centre_lon + geo_rng.uniform(-0.35, 0.35), 6)
+        booking_rows.append({
+            "id": booking_id, "user_id": rng.choice(client_ids), "package_id": rng.choice(package_ids),
+            "event_type": rng.choice(EVENT_TYPES), "event_date": event_date,
+            "event_time": time(rng.randint(8, 20), rng.choice([0, 30])),
+            "location": f"{rng.randint(1, 999)} Main Street, {city}",
+            "latitude": latitude, "longitude": longitude, "geo_cell": cell_of(latitude, longitude),
+            "status": status, "total_price": Decimal(rng.randint(100, 5000)),
+            "notes": None, "admin_notes": None, "created_at": created_at, "updated_at": created_at,
+        })
+        for addon_id in rng.sample(addon_ids, k=min(len(addon_ids), rng.randint(0, 3))):
+            booking_addon_rows.append({
+                "id": new_id(), "booking_id": booking_id, "addon_id": addon_id,
+                "quantity": rng.randint(1, 3), "created_at": created_at,
+            })
+        if status == BookingStatus.COMPLETED and rng.random() < 0.7:
+            delivery_rows.append({
+                "id": new_id(), "booking_id": booking_id, "photo_urls": ["https://example.com/p.jpg"],
+                "video_urls": [], "download_links": [], "notes": None,
+                "delivered_at": created_at, "created_at": created_at,
+            })
+
+    _insert_chunked(engine, User.__table__, user_rows)
+    _insert_chunked(engine, Package.__table__, package_rows)
+    _insert_chunked(engine, AddOn.__table__, addon_rows)
+    _insert_chunked(engine, Booking.__table__, booking_rows)
+    _insert_chunked(engine, BookingAddOn.__table__, booking_addon_rows)
+    _insert_chunked(engine, Delivery.__table__, delivery_rows)
+
+    return {
+        "admins": admin_ids,
+        "clients": client_ids,
+        "packages": package_ids,
+        "addons": addon_ids,
+        "bookings": booking_ids,
+    }
@@ -0,0 +1,66 @@
+"""
+Measure worker cold start: time from process spawn to first served request, and memory.
+
+Usage (from the backend directory):
+    python -m scripts.measure_cold_start --runs 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+
+def measure_once(port: int, timeout: float) -> dict:
+    """Start one uvicorn worker, wait for /health and collect its startup metrics."""
+    spawned = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        env=dict(os.environ, DEBUG="false"),
+    )
+    try:
+        deadline = spawned + timeout
+        while time.perf_counter() < deadline:
+            try:
+                response = httpx.get(f"http://127.0.0.1:{port}/health", timeout=1.0)
+                if response.status_code == 200:
+                    served = time.perf_counter()
+                    # The first request is only recorded once it completes, so ask again
+                    startup = httpx.get(f"http://127.0.0.1:{port}/health", timeout=1.0).json().get("startup", {})
+                    return {
+                        "spawn_to_first_response_ms": round((served - spawned) * 1000, 1),
+                        **startup,
+                    }
+            except httpx.TransportError:
+                pass
+            time.sleep(0.02)
+        raise RuntimeError(f"Worker did not answer /health within {timeout}s")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    results = [measure_once(args.port, args.timeout) for _ in range(args.runs)]
+    for index, result in enumerate(results, 1):
+        print(f"run {index}: {result}")
+
+    for key in ("spawn_to_first_response_ms", "time_to_ready_ms", "time_to_first_request_ms", "rss_after_first_request_mb"):
+        values = [result[key] for result in results if result.get(key) is not None]
+        if values:
+            print(f"{key}: median={round(statistics.median(values), 1)} min={min(values)} max={max(values)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Run the routers' queries under EXPLAIN and flag full scans and temp sorts.
+
+SQLite uses EXPLAIN QUERY PLAN, PostgreSQL uses EXPLAIN ANALYZE. By default a
+throwaway SQLite database is created and filled with a generated dataset;
+pass --database-url with --generate to audit a scratch PostgreSQL database.
+
+The audited queries mirror the ones built in app/routers; keep AUDITED_QUERIES
+in sync when a router's query changes.
+
+Usage (from the backend directory):
+    python -m scripts.query_plan_audit --bookings 50000
+    python -m scripts.query_plan_audit --database-url postgresql://localhost/audit --generate --strict
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+from datetime import date, timedelta
+from typing import Callable, List, Tuple
+
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.engine import Engine
+
+from app.core.database import Base
+from app.models import (
+    AddOn,
+    ArchivedBooking,
+    Booking,
+    BookingStatus,
+    Delivery,
+    Package,
+    User,
+)
+from app.services.booking_search import BookingSearch
+from scripts.dataset import generate_dataset
+
+
+def audited_queries(ids, dialect: str = "sqlite") -> List[Tuple[str, Callable]]:
+    """(name, statement) pairs mirroring the routers' queries, with sample parameters."""
+    rng = random.Random(7)
+    user_id = rng.choice(ids["clients"])
+    booking_id = rng.choice(ids["bookings"])
+    package_id = rng.choice(ids["packages"])
+    cutoff = date.today() - timedelta(days=365)
+    today = date.today()
+
+    def search(**filters):
+        builder = BookingSearch(select(Booking), dialect)
+        builder.event_dates(filters.get("date_from"), filters.get("date_to"))
+        builder.event_type(filters.get("event_type")).location(filters.get("location"))
+        builder.price_range(filters.get("price_min"), filters.get("price_max"))
+        builder.client_email(filters.get("client_email")).sort(filters.get("sort", "-created_at"))
+        return builder.statement.offset(0).limit(100)
+
+    return [
+        ("auth.login: user by email",
+         select(User).where(User.email == "client1@dataset.example.com").limit(1)),
+        ("dependencies.get_current_user: user by id",
+         select(User).where(User.id == user_id).limit(1)),
+        ("packages.get_packages: active catalog",
+         select(Package).where(Package.is_active == True).offset(0).limit(100)),
+        ("packages.get_packages: active catalog by category",
+         select(Package).where(Package.is_active == True, Package.category == "PHOTOGRAPHY").offset(0).limit(100)),
+        ("packages.get_package: by id",
+         select(Package).where(Package.id == package_id).limit(1)),
+        ("addons.get_addons: active catalog",
+         select(AddOn).where(AddOn.is_active == True).offset(0).limit(100)),
+        ("addons.get_addons: active catalog by category",
+         select(AddOn).where(AddOn.is_active == True, AddOn.category == "EQUIPMENT").offset(0).limit(100)),
+        ("bookings.get_user_bookings: by user",
+         select(Booking).where(Booking.user_id == user_id)),
+        ("bookings.get_user_bookings: archived by user",
+         select(ArchivedBooking).where(ArchivedBooking.user_id == user_id)),
+        ("bookings.get_all_bookings: newest first",
+         select(Booking).order_by(Booking.created_at.desc()).offset(200).limit(100)),
+        ("bookings.get_all_bookings: status filter, newest first",
+         select(Booking).where(Booking.status == "PENDING").order_by(Booking.created_at.desc()).offset(200).limit(100)),
+        ("bookings.get_booking: by id",
+         select(Booking).where(Booking.id == booking_id).limit(1)),
+        ("delivery.get_delivery: by booking id",
+         select(Delivery).where(Delivery.booking_id == booking_id).limit(1)),
+        ("bookings.search_bookings: no filters, newest first",
+         search()),
+        ("bookings.search_bookings: event date range, by event date",
+         search(date_from=today, date_to=today + timedelta(days=30), sort="event_date")),
+        ("bookings.search_bookings: event type and date range, by event date",
+         search(event_type="wedding", date_from=today, date_to=today + timedelta(days=90), sort="event_date")),
+        ("bookings.search_bookings: price range, by price",
+         search(price_min=1000, price_max=1200, sort="total_price")),
+        ("bookings.search_bookings: location text",
+         search(location="Lisbon")),
+        ("bookings.search_bookings: client email, by event date",
+         search(client_email="client1@dataset.example.com", sort="-event_date")),
+        ("archival.archive_batch: finished bookings past cutoff",
+         select(Booking.id).where(
+             Booking.event_date < cutoff,
+             Booking.status.in_([BookingStatus.COMPLETED, BookingStatus.REJECTED])
+         ).order_by(Booking.event_date).limit(500)),
+    ]
+
+
+# Known plan lines that are not problems, by query name
+ACCEPTED = {
+    # The matches of a text search have to be sorted; the trigram index narrows them first
+    "bookings.search_bookings: location text": ("USE TEMP B-TREE FOR ORDER BY",),
+}
+
+
+def explain(engine: Engine, statement) -> List[str]:
+    """Return the plan lines for a statement on this engine's dialect."""
+    compiled = statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True})
+    sql = str(compiled)
+    with engine.connect() as connection:
+        if engine.dialect.name == "sqlite":
+            rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+            return [row[-1] for row in rows]
+        rows = connection.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS) {sql}").fetchall()
+        return [row[0] for row in rows]
+
+
+def find_problems(dialect: str, plan: List[str]) -> List[str]:
+    """Flag full table scans and temporary sort structures in a plan."""
+    problems = []
+    for line in plan:
+        stripped = line.strip()
+        if dialect == "sqlite":
+            if stripped.startswith("SCAN ") and "USING" not in stripped and ":M" not in stripped:
+                problems.append(f"full scan: {stripped}")
+            if "USE TEMP B-TREE" in stripped:
+                problems.append(f"temp b-tree: {stripped}")
+        else:
+            if "Seq Scan on" in stripped:
+                problems.append(f"full scan: {stripped}")
+            if stripped.startswith("Sort Method: external"):
+                problems.append(f"on-disk sort: {stripped}")
+            elif "-> Sort " in line or stripped.startswith("Sort "):
+                problems.append(f"sort: {stripped}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="Defaults to a temporary SQLite file")
+    parser.add_argument("--generate", action="store_true", help="Create tables and generate data at --database-url")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--bookings", type=int, default=50000)
+    parser.add_argument("--strict", action="store_true", help="Exit with status 1 if any query is flagged")
+    args = parser.parse_args()
+
+    temp_dir = None
+    if args.database_url is None:
+        temp_dir = tempfile.TemporaryDirectory()
+        args.database_url = f"sqlite:///{os.path.join(temp_dir.name, 'audit.db')}"
+        args.generate = True
+
+    engine = create_engine(args.database_url)
+    if not args.generate:
+        sys.exit("Refusing to audit without generated data; pass --generate for a scratch database")
+
+    Base.metadata.create_all(bind=engine)
+    print(f"Generating {args.bookings} bookings for {args.users} users...")
+    ids = generate_dataset(engine, users=args.users, bookings=args.bookings)
+    with engine.begin() as connection:
+        connection.execute(text("ANALYZE"))
+
+    flagged = 0
+    queries = audited_queries(ids, engine.dialect.name)
+    for name, statement in queries:
+        plan = explain(engine, statement)
+        problems = [
+            problem for problem in find_problems(engine.dialect.name, plan)
+            if not any(accepted in problem for accepted in ACCEPTED.get(name, ()))
+        ]
+        marker = "FLAG" if problems else "ok  "
+        print(f"[{marker}] {name}")
+        for line in plan:
+            print(f"         {line}")
+        for problem in problems:
+            print(f"       ! {problem}")
+        flagged += bool(problems)
+
+    print(f"\n{flagged} of {len(queries)} queries flagged")
+    engine.dispose()
+    if temp_dir:
+        temp_dir.cleanup()
+    if args.strict and flagged:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""
+Recount add-on co-occurrences into addon_cooccurrence and rewrite
+addon_recommendations.
+
+Running workers add their bookings to the shared counts incrementally; run
+this after the migrations that create the tables, and nightly to settle any
+drift (such as increments lost when a worker crashed before its flush).
+
+Usage (from the backend directory):
+    python -m scripts.rebuild_recommendations
+"""
+import argparse
+import time
+
+from app.services.recommendations import recommender
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.parse_args()
+
+    started = time.perf_counter()
+    written = recommender.rebuild()
+    print(f"Done: wrote {written} recommendations in {time.perf_counter() - started:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
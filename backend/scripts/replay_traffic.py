@@ -0,0 +1,377 @@
+"""
+Replay a captured traffic trace and report per-route latency distributions.
+
+Traces are recorded by TrafficCaptureMiddleware (set TRAFFIC_CAPTURE_PATH).
+Every request is rebuilt from its route template with IDs, emails and
+callers remapped onto a generated dataset: the same pseudonym always maps to
+the same dataset row, so two runs over the same trace and seed send
+identical traffic. Redacted strings are replaced by filler of the same
+length and passwords by the dataset password.
+
+By default the trace is replayed against ``main.app`` in-process, on a
+throwaway SQLite database filled by scripts/dataset.py. With --target the
+requests go to a running server instead; --database-url must then point at
+that server's database (generated with --generate, or earlier) so callers
+and IDs can be looked up, and SECRET_KEY must match the server's so the
+replay can sign tokens for dataset users.
+
+Usage (from the backend directory):
+    python -m scripts.replay_traffic run traces.ndjson --speed 2 --output before.json
+    python -m scripts.replay_traffic run traces.ndjson --speed 0 --concurrency 32 --output after.json
+    python -m scripts.replay_traffic run traces.ndjson --target http://localhost:8000 --database-url postgresql://localhost/replay
+    python -m scripts.replay_traffic diff before.json after.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+# Pseudonym key names -> dataset pool the ID is drawn from
+ID_POOLS = {
+    "booking_id": "bookings",
+    "booking_ids": "bookings",
+    "ids": "bookings",
+    "package_id": "packages",
+    "addon_id": "addons",
+    "user_id": "clients",
+}
+DEFAULT_ID_POOL = "bookings"
+PATH_PARAM_PATTERN = re.compile(r"{(\w+)(:\w+)?}")
+FILLER = "replay traffic "
+
+
+def load_trace(path: str) -> List[dict]:
+    """Read an NDJSON trace, oldest request first."""
+    with open(path, encoding="utf-8") as trace_file:
+        records = [json.loads(line) for line in trace_file if line.strip()]
+    records = [record for record in records if record.get("route") != "<unmatched>"]
+    records.sort(key=lambda record: record["ts"])
+    return records
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    values = sorted(latencies)
+    return {
+        "count": len(values),
+        "mean_ms": round(sum(values) / len(values), 3) if values else 0.0,
+        "p50_ms": round(percentile(values, 0.50), 3),
+        "p90_ms": round(percentile(values, 0.90), 3),
+        "p99_ms": round(percentile(values, 0.99), 3),
+        "max_ms": round(values[-1], 3) if values else 0.0,
+    }
+
+
+class IdentityMap:
+    """
+    Deterministic mapping of trace pseudonyms onto dataset rows.
+
+    Args:
+        pools: Dataset IDs by pool ("admins", "clients", "packages", "addons", "bookings")
+        emails: Email per user ID
+        bookings_by_user: Booking IDs per client, so clients replay against their own bookings
+        password: Password of every dataset user
+    """
+
+    def __init__(self, pools: Dict[str, list], emails: Dict, bookings_by_user: Dict, password: str):
+        self.pools = {name: sorted(ids, key=str) for name, ids in pools.items()}
+        self.emails = emails
+        self.bookings_by_user = {user_id: sorted(ids, key=str) for user_id, ids in bookings_by_user.items()}
+        self.password = password
+        self._tokens: Dict = {}
+
+    @staticmethod
+    def _pick(pool: list, pseudonym: str):
+        return pool[int(pseudonym, 16) % len(pool)] if pool else None
+
+    def caller(self, record: dict):
+        """Dataset user ID standing in for the record's caller (None if anonymous)."""
+        if not record.get("user"):
+            return None
+        pool = "admins" if record.get("role") == "admin" else "clients"
+        return self._pick(self.pools[pool], record["user"])
+
+    def token(self, user_id) -> str:
+        from app.core.security import create_access_token
+        from datetime import timedelta
+
+        if user_id not in self._tokens:
+            role = "admin" if user_id in self.pools["admins"] else "client"
+            self._tokens[user_id] = create_access_token(
+                {"user_id": str(user_id), "email": self.emails[user_id], "role": role},
+                expires_delta=timedelta(days=1),
+            )
+        return self._tokens[user_id]
+
+    def resolve(self, value, key: Optional[str], caller):
+        """Turn a sanitized trace value back into a concrete one."""
+        if isinstance(value, list):
+            return [self.resolve(item, key, caller) for item in value]
+        if isinstance(value, dict):
+            if "$id" in value:
+                pool = ID_POOLS.get(key or "", DEFAULT_ID_POOL)
+                if pool == "bookings" and caller is not None and self.bookings_by_user.get(caller):
+                    return str(self._pick(self.bookings_by_user[caller], value["$id"]))
+                return str(self._pick(self.pools[pool], value["$id"]))
+            if "$email" in value:
+                return self.emails[self._pick(self.pools["clients"], value["$email"])]
+            if "$secret" in value:
+                if key == "password":
+                    return self.password
+                return self.token(caller) if caller is not None else ""
+            if "$bytes" in value:
+                return None
+            return {name: self.resolve(item, name, caller) for name, item in value.items()}
+        if isinstance(value, str) and value.startswith("$str:"):
+            length = int(value[5:])
+            return (FILLER * (length // len(FILLER) + 1))[:length]
+        return value
+
+
+def build_request(record: dict, identities: IdentityMap) -> Tuple[str, str, list, Optional[dict], dict]:
+    """(method, path, query, json body, headers) for one trace record."""
+    caller = identities.caller(record)
+    path_params = record.get("path_params") or {}
+
+    def substitute(match):
+        name = match.group(1)
+        return str(identities.resolve(path_params.get(name), name, caller))
+
+    path = PATH_PARAM_PATTERN.sub(substitute, record["route"])
+    query = [
+        (name, identities.resolve(value, name, caller))
+        for name, values in (record.get("query") or {}).items()
+        for value in values
+    ]
+    body = identities.resolve(record["body"], None, caller) if record.get("body") is not None else None
+    headers = {"Authorization": f"Bearer {identities.token(caller)}"} if caller is not None else {}
+    return record["method"], path, query, body, headers
+
+
+def load_identities(engine, password: str) -> IdentityMap:
+    """Read dataset users, catalog and bookings from the database the target uses."""
+    from sqlalchemy import select
+
+    from app.models import AddOn, Booking, Package, User, UserRole
+
+    with engine.connect() as connection:
+        users = connection.execute(select(User.id, User.email, User.role)).all()
+        bookings = connection.execute(select(Booking.id, Booking.user_id)).all()
+        pools = {
+            "admins": [user_id for user_id, _, role in users if role == UserRole.ADMIN],
+            "clients": [user_id for user_id, _, role in users if role != UserRole.ADMIN],
+            "packages": connection.execute(select(Package.id)).scalars().all(),
+            "addons": connection.execute(select(AddOn.id)).scalars().all(),
+            "bookings": [booking_id for booking_id, _ in bookings],
+        }
+    bookings_by_user = defaultdict(list)
+    for booking_id, user_id in bookings:
+        bookings_by_user[user_id].append(booking_id)
+    return IdentityMap(pools, {user_id: email for user_id, email, _ in users}, bookings_by_user, password)
+
+
+async def replay(client, records: List[dict], identities: IdentityMap, speed: float, concurrency: int) -> dict:
+    """
+    Send every record, paced by recorded offsets divided by ``speed`` (0 for no pacing).
+
+    Returns:
+        Per-route summaries of replayed and recorded latencies
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    results: Dict[str, dict] = defaultdict(lambda: {"latencies": [], "recorded": [], "statuses": defaultdict(int)})
+    lags: List[float] = []
+    first_ts = records[0]["ts"] if records else 0.0
+    started = time.perf_counter()
+
+    async def send(record):
+        method, path, query, body, headers = build_request(record, identities)
+        route = results[f"{record['method']} {record['route']}"]
+        async with semaphore:
+            request_started = time.perf_counter()
+            try:
+                response = await client.request(method, path, params=query, json=body, headers=headers)
+                status_code = response.status_code
+            except Exception as exc:
+                status_code = type(exc).__name__
+            route["latencies"].append((time.perf_counter() - request_started) * 1000)
+        route["recorded"].append(record["duration_ms"])
+        route["statuses"][str(status_code)] += 1
+
+    tasks = []
+    for record in records:
+        if speed > 0:
+            due = (record["ts"] - first_ts) / speed
+            delay = due - (time.perf_counter() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                lags.append(-delay * 1000)
+        tasks.append(asyncio.create_task(send(record)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": len(records),
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(len(records) / elapsed, 1) if elapsed else 0.0,
+        "max_schedule_lag_ms": round(max(lags), 3) if lags else 0.0,
+        "routes": {
+            key: {
+                **summarize(route["latencies"]),
+                "recorded_p50_ms": round(percentile(sorted(route["recorded"]), 0.50), 3),
+                "recorded_p99_ms": round(percentile(sorted(route["recorded"]), 0.99), 3),
+                "statuses": dict(route["statuses"]),
+            }
+            for key, route in sorted(results.items())
+        },
+        "overall": summarize([latency for route in results.values() for latency in route["latencies"]]),
+    }
+
+
+def print_report(report: dict) -> None:
+    print(f"{report['requests']} requests in {report['elapsed_seconds']} s "
+          f"({report['throughput_rps']} req/s, max schedule lag {report['max_schedule_lag_ms']} ms)")
+    print(f"{'route':58s} {'n':>6s} {'p50':>8s} {'p90':>8s} {'p99':>8s} {'max':>8s} {'rec p50':>8s}  statuses")
+    for key, route in report["routes"].items():
+        statuses = " ".join(f"{status}x{count}" for status, count in sorted(route["statuses"].items()))
+        print(f"{key[:58]:58s} {route['count']:6d} {route['p50_ms']:8.1f} {route['p90_ms']:8.1f} "
+              f"{route['p99_ms']:8.1f} {route['max_ms']:8.1f} {route['recorded_p50_ms']:8.1f}  {statuses}")
+    overall = report["overall"]
+    print(f"{'overall':58s} {overall['count']:6d} {overall['p50_ms']:8.1f} {overall['p90_ms']:8.1f} "
+          f"{overall['p99_ms']:8.1f} {overall['max_ms']:8.1f}")
+
+
+def diff_reports(before: dict, after: dict) -> None:
+    """Print per-route latency changes between two runs of the same trace."""
+    def change(old: float, new: float) -> str:
+        return f"{(new - old) / old * 100:+7.1f}%" if old else "    n/a"
+
+    print(f"{'route':58s} {'p50 before':>10s} {'after':>8s} {'':8s} {'p99 before':>10s} {'after':>8s}")
+    for key in sorted(set(before["routes"]) | set(after["routes"])):
+        old, new = before["routes"].get(key), after["routes"].get(key)
+        if old is None or new is None:
+            print(f"{key[:58]:58s} only in {'after' if old is None else 'before'}")
+            continue
+        print(f"{key[:58]:58s} {old['p50_ms']:10.1f} {new['p50_ms']:8.1f} {change(old['p50_ms'], new['p50_ms'])} "
+              f"{old['p99_ms']:10.1f} {new['p99_ms']:8.1f} {change(old['p99_ms'], new['p99_ms'])}")
+        if old["statuses"] != new["statuses"]:
+            print(f"{'':58s} statuses changed: {old['statuses']} -> {new['statuses']}")
+    old, new = before["overall"], after["overall"]
+    print(f"{'overall':58s} {old['p50_ms']:10.1f} {new['p50_ms']:8.1f} {change(old['p50_ms'], new['p50_ms'])} "
+          f"{old['p99_ms']:10.1f} {new['p99_ms']:8.1f} {change(old['p99_ms'], new['p99_ms'])}")
+
+
+async def run_in_process(args, records: List[dict]) -> dict:
+    import httpx
+
+    from app.core.database import Base, engine
+    from scripts.dataset import DATASET_PASSWORD, generate_dataset
+    import main
+
+    if args.generate:
+        Base.metadata.create_all(bind=engine)
+        print(f"Generating {args.bookings} bookings for {args.users} users...")
+        generate_dataset(engine, users=args.users, bookings=args.bookings, seed=args.seed)
+    identities = load_identities(engine, DATASET_PASSWORD)
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with main.app.router.lifespan_context(main.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://replay") as client:
+            return await replay(client, records, identities, args.speed, args.concurrency)
+
+
+async def run_against_target(args, records: List[dict]) -> dict:
+    import httpx
+    from sqlalchemy import create_engine
+
+    from app.core.database import Base
+    from scripts.dataset import DATASET_PASSWORD, generate_dataset
+
+    engine = create_engine(args.database_url)
+    if args.generate:
+        Base.metadata.create_all(bind=engine)
+        print(f"Generating {args.bookings} bookings for {args.users} users...")
+        generate_dataset(engine, users=args.users, bookings=args.bookings, seed=args.seed)
+    identities = load_identities(engine, DATASET_PASSWORD)
+    engine.dispose()
+
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.target, limits=limits, timeout=60.0) as client:
+        return await replay(client, records, identities, args.speed, args.concurrency)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Replay a trace and report latencies")
+    run_parser.add_argument("trace", help="NDJSON file written by TrafficCaptureMiddleware")
+    run_parser.add_argument("--target", default=None, help="Base URL of a running server (default: main.app in-process)")
+    run_parser.add_argument("--database-url", default=None, help="Database with the dataset (default: temporary SQLite)")
+    run_parser.add_argument("--generate", action="store_true", help="Create tables and generate the dataset first")
+    run_parser.add_argument("--speed", type=float, default=1.0, help="Pacing multiplier; 0 sends as fast as possible")
+    run_parser.add_argument("--concurrency", type=int, default=64, help="Maximum requests in flight")
+    run_parser.add_argument("--users", type=int, default=1000)
+    run_parser.add_argument("--bookings", type=int, default=20000)
+    run_parser.add_argument("--seed", type=int, default=42)
+    run_parser.add_argument("--output", default=None, help="Write the report as JSON (input for `diff`)")
+
+    diff_parser = commands.add_parser("diff", help="Compare two reports of the same trace")
+    diff_parser.add_argument("before")
+    diff_parser.add_argument("after")
+    args = parser.parse_args()
+
+    if args.command == "diff":
+        with open(args.before, encoding="utf-8") as before, open(args.after, encoding="utf-8") as after:
+            diff_reports(json.load(before), json.load(after))
+        return
+
+    records = load_trace(args.trace)
+    if not records:
+        sys.exit("Trace has no replayable requests")
+
+    temp_dir = None
+    if args.target is None:
+        if args.database_url is None:
+            temp_dir = tempfile.TemporaryDirectory()
+            args.database_url = f"sqlite:///{os.path.join(temp_dir.name, 'replay.db')}"
+            args.generate = True
+        # The app reads its settings at import, so configure it before importing anything from app
+        os.environ.update(
+            DATABASE_URL=args.database_url,
+            DATABASE_REPLICA_URLS="",
+            DB_SCHEMA_STRATEGY="create" if args.database_url.startswith("sqlite") else "verify",
+            TRAFFIC_CAPTURE_PATH="",
+            DEBUG="false",
+        )
+        report = asyncio.run(run_in_process(args, records))
+    else:
+        if args.database_url is None:
+            sys.exit("--target needs --database-url pointing at the target's database")
+        report = asyncio.run(run_against_target(args, records))
+
+    report["trace"] = os.path.abspath(args.trace)
+    report["speed"] = args.speed
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(report, output, indent=2)
+    if temp_dir:
+        temp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
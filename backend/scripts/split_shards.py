@@ -0,0 +1,131 @@
+"""
+Move per-user booking data onto the shards in DATABASE_SHARD_URLS.
+
+Run after setting DATABASE_SHARD_URLS on a database that was not sharded
+(rows are read from DATABASE_URL), or after changing the shard list (pass
+the old shard URLs with --source). Bookings are copied in batches to their
+owner's shard together with their add-ons and delivery, and so are the
+archive tables and user_booking_summary. With --delete the moved rows are
+removed from the source, which also makes an interrupted run resumable;
+without it, rows already present on the target are skipped.
+
+Moved bookings keep their IDs, which do not hash to their shard like new
+ones; lookups by ID find them by asking every shard.
+
+Usage (from the backend directory, with DATABASE_SHARD_URLS set):
+    python -m scripts.split_shards --dry-run
+    python -m scripts.split_shards --batch-size 1000 --delete
+    python -m scripts.split_shards --source sqlite:///./shard0.db --source sqlite:///./shard1.db --delete
+"""
+import argparse
+import sys
+from collections import defaultdict
+
+from sqlalchemy import create_engine, delete, insert, select
+from sqlalchemy.engine import Engine, make_url
+
+from app.core.config import settings
+from app.core.database import engine, init_db, shard_router
+from app.core.startup import schema_strategy
+from app.models.archive import ArchivedBooking, ArchivedBookingAddOn, ArchivedDelivery
+from app.models.booking import Booking, BookingAddOn
+from app.models.delivery import Delivery
+from app.models.summary import UserBookingSummary
+
+# Owner-keyed table -> tables that follow it through their booking_id
+GROUPS = (
+    (Booking, (BookingAddOn, Delivery)),
+    (ArchivedBooking, (ArchivedBookingAddOn, ArchivedDelivery)),
+    (UserBookingSummary, ()),
+)
+
+
+def source_engine(url: str) -> Engine:
+    """Engine for a source URL, shared with the app's engines where the URL matches."""
+    for candidate in [engine] + shard_router.engines:
+        if make_url(url) == candidate.url:
+            return candidate
+    return create_engine(url)
+
+
+def move_group(source: Engine, model, children, batch_size: int, remove: bool, dry_run: bool) -> int:
+    """
+    Move the rows of one owner-keyed table (and their children) that belong on another shard.
+
+    Returns:
+        Number of owner-keyed rows moved (or that would be moved)
+    """
+    table = model.__table__
+    key = table.c.id if "id" in table.c else table.c.user_id
+    child_tables = [child.__table__ for child in children]
+    moved = 0
+    after = None
+    while True:
+        query = select(table).order_by(key).limit(batch_size)
+        if after is not None:
+            query = query.where(key > after)
+        with source.connect() as connection:
+            rows = connection.execute(query).all()
+        if not rows:
+            break
+        after = rows[-1]._mapping[key.name]
+
+        by_shard = defaultdict(list)
+        for row in rows:
+            shard = shard_router.shard_of(row.user_id)
+            if shard_router.engines[shard] is not source:
+                by_shard[shard].append(row)
+
+        for shard, shard_rows in by_shard.items():
+            keys = [row._mapping[key.name] for row in shard_rows]
+            moved += len(keys)
+            if dry_run:
+                continue
+            with source.connect() as connection:
+                child_rows = {
+                    child: connection.execute(select(child).where(child.c.booking_id.in_(keys))).all()
+                    for child in child_tables
+                }
+            with shard_router.engines[shard].begin() as target:
+                present = set(target.execute(select(key).where(key.in_(keys))).scalars())
+                missing = [row for row in shard_rows if row._mapping[key.name] not in present]
+                if missing:
+                    target.execute(insert(table), [dict(row._mapping) for row in missing])
+                for child, found in child_rows.items():
+                    found = [row for row in found if row.booking_id not in present]
+                    if found:
+                        target.execute(insert(child), [dict(row._mapping) for row in found])
+            if remove:
+                with source.begin() as connection:
+                    for child in child_tables:
+                        connection.execute(delete(child).where(child.c.booking_id.in_(keys)))
+                    connection.execute(delete(table).where(key.in_(keys)))
+    return moved
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--source", action="append", default=None,
+        help="Database to move rows out of (repeatable; defaults to DATABASE_URL)"
+    )
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--delete", action="store_true", help="Delete moved rows from the source")
+    parser.add_argument("--dry-run", action="store_true", help="Only count the rows that would move")
+    args = parser.parse_args()
+
+    if not shard_router.sharded:
+        sys.exit("DATABASE_SHARD_URLS is not set; there is nothing to split into.")
+    if schema_strategy() == "create" and not args.dry_run:
+        init_db()
+
+    for url in args.source or [settings.DATABASE_URL]:
+        source = source_engine(url)
+        for model, children in GROUPS:
+            moved = move_group(source, model, children, args.batch_size, args.delete, args.dry_run)
+            action = "Would move" if args.dry_run else "Moved"
+            print(f"{action} {moved} {model.__tablename__} rows from {source.url.render_as_string()}")
+
+
+if __name__ == "__main__":
+    main()
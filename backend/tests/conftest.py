@@ -0,0 +1,22 @@
+"""
+Shared test setup: a throwaway SQLite database whose tables are created on app startup.
+"""
+import os
+import tempfile
+
+import pytest
+
+# Settings and engines are built on import, so point them at a fresh database before any app import
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='photobooking-tests-'), 'test.db')}"
+os.environ["DB_SCHEMA_STRATEGY"] = "create"
+os.environ.setdefault("DEBUG", "false")
+
+
+@pytest.fixture
+def client():
+    from fastapi.testclient import TestClient
+
+    from main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
@@ -0,0 +1,38 @@
+"""
+Tests for the per-user booking summaries.
+"""
+import time
+
+
+def auth(client, email, role="client"):
+    response = client.post(
+        "/auth/register", json={"email": email, "full_name": "Test", "password": "secret1", "role": role}
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def test_redelivery_moves_last_delivery_at(client):
+    admin = auth(client, "summary-admin@example.com", role="admin")
+    user = auth(client, "summary-client@example.com")
+    package_id = client.post("/packages/", headers=admin, json={
+        "title": "Wedding", "description": "Full day", "category": "photography",
+        "price": "100.00", "duration": 8, "features": ["album"],
+    }).json()["id"]
+    booking_id = client.post("/bookings/", headers=user, json={
+        "package_id": package_id, "event_type": "wedding", "event_date": "2030-06-01",
+        "event_time": "10:00:00", "location": "Paris", "addon_ids": [],
+    }).json()["id"]
+    client.put(f"/bookings/{booking_id}/status", headers=admin, json={"status": "completed"})
+
+    delivered = client.post("/delivery/", headers=admin, json={"booking_id": booking_id, "photo_urls": ["a"]})
+    assert delivered.status_code == 201, delivered.text
+    first = client.get("/users/me/summary", headers=user).json()["last_delivery_at"]
+    assert first == delivered.json()["delivered_at"]
+
+    time.sleep(0.01)
+    redelivered = client.put(f"/delivery/{booking_id}", headers=admin, json={"photo_urls": ["a", "b"]})
+    assert redelivered.status_code == 200, redelivered.text
+
+    summary = client.get("/users/me/summary", headers=user).json()
+    assert summary["last_delivery_at"] == redelivered.json()["delivered_at"]
+    assert summary["last_delivery_at"] > first
@@ -0,0 +1,73 @@
+"""
+Tests for the Idempotency-Key middleware and its store.
+"""
+import asyncio
+
+import httpx
+
+from app.core.idempotency import IdempotencyMiddleware, IdempotencyStore
+
+
+def make_app(calls: dict, release: asyncio.Event):
+    """ASGI app that counts calls per Idempotency-Key and waits for ``release`` before answering."""
+
+    async def app(scope, receive, send):
+        key = dict(scope["headers"]).get(b"idempotency-key", b"").decode()
+        calls[key] = calls.get(key, 0) + 1
+        await receive()
+        await release.wait()
+        await send({"type": "http.response.start", "status": 201, "headers": [(b"content-type", b"text/plain")]})
+        await send({"type": "http.response.body", "body": key.encode()})
+
+    return app
+
+
+def test_full_store_keeps_in_flight_entries():
+    async def scenario():
+        calls = {}
+        release = asyncio.Event()
+        store = IdempotencyStore(ttl_seconds=60, max_entries=2)
+        app = IdempotencyMiddleware(make_app(calls, release), paths=["/bookings/"], store=store)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            def post(key):
+                return client.post("/bookings/", content=b"{}", headers={"Idempotency-Key": key})
+
+            first = asyncio.create_task(post("a"))
+            second = asyncio.create_task(post("b"))
+            await asyncio.sleep(0.05)
+            duplicate = asyncio.create_task(post("a"))
+            await asyncio.sleep(0.05)
+
+            # Both slots hold running requests: a new key is refused, nothing is evicted
+            refused = await asyncio.wait_for(post("c"), 5)
+            release.set()
+            responses = await asyncio.wait_for(asyncio.gather(first, second, duplicate), 5)
+        return calls, refused, responses
+
+    calls, refused, (first, second, duplicate) = asyncio.run(scenario())
+
+    assert refused.status_code == 503
+    assert calls == {"a": 1, "b": 1}
+    assert first.status_code == duplicate.status_code == 201
+    assert duplicate.headers.get("idempotent-replayed") == "true"
+    assert duplicate.text == "a"
+
+
+def test_completed_entries_make_room():
+    async def scenario():
+        calls = {}
+        release = asyncio.Event()
+        release.set()
+        store = IdempotencyStore(ttl_seconds=60, max_entries=2)
+        app = IdempotencyMiddleware(make_app(calls, release), paths=["/bookings/"], store=store)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            statuses = []
+            for key in ("a", "b", "c", "c"):
+                response = await client.post("/bookings/", content=b"{}", headers={"Idempotency-Key": key})
+                statuses.append(response.status_code)
+        return calls, statuses
+
+    calls, statuses = asyncio.run(scenario())
+
+    assert statuses == [201, 201, 201, 201]
+    assert calls == {"a": 1, "b": 1, "c": 1}
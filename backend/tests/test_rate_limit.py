@@ -0,0 +1,20 @@
+"""
+Tests for the token-bucket rate limiters.
+"""
+from app.core.rate_limit import TokenBucketLimiter, hit_all
+
+
+def test_rejected_hit_consumes_from_no_bucket():
+    ip_limiter = TokenBucketLimiter(capacity=5, refill_per_second=0.001, max_keys=100)
+    email_limiter = TokenBucketLimiter(capacity=1, refill_per_second=0.001, max_keys=100)
+
+    assert hit_all((ip_limiter, "ip"), (email_limiter, "victim@example.com")) == 0
+    # The email bucket is empty: further attempts on it must not drain the IP bucket
+    for _ in range(10):
+        assert hit_all((ip_limiter, "ip"), (email_limiter, "victim@example.com")) > 0
+
+    for n in range(4):
+        assert hit_all((ip_limiter, "ip"), (email_limiter, f"user{n}@example.com")) == 0
+    # Now the IP bucket is empty, and the fresh email bucket keeps its token
+    assert hit_all((ip_limiter, "ip"), (email_limiter, "fresh@example.com")) > 0
+    assert email_limiter.hit("fresh@example.com") == 0
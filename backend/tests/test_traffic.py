@@ -0,0 +1,41 @@
+"""
+Tests for the sanitizer behind traffic capture.
+"""
+import json
+
+from app.core.traffic import TraceSanitizer
+
+
+def test_register_body_keeps_no_raw_values():
+    sanitizer = TraceSanitizer(key=b"k" * 32)
+    body = {
+        "email": "jane.smith@example.com",
+        "password": "hunter22",
+        "full_name": "Jane Smith",
+        "phone": "5550100",
+        "role": "client",
+    }
+
+    shape = sanitizer.value(body)
+
+    written = json.dumps(shape)
+    for raw in ("jane", "smith", "hunter22", "5550100"):
+        assert raw not in written.lower()
+    assert shape["password"] == {"$secret": True}
+    assert shape["phone"] == "$str:7"
+    assert shape["role"] == "client"
+    assert sanitizer.value({"phone": 5550100}) == {"phone": "$str:7"}
+
+
+def test_free_text_query_keeps_no_raw_values():
+    sanitizer = TraceSanitizer(key=b"k" * 32)
+
+    params = sanitizer.query(b"q=smith&event_type=smith&location=elm&status=pending&date_from=2026-05-01&limit=20")
+
+    assert params["q"] == ["$str:5"]
+    assert params["event_type"] == ["$str:5"]
+    assert params["location"] == ["$str:3"]
+    assert "smith" not in json.dumps(params)
+    assert params["status"] == ["pending"]
+    assert params["date_from"] == ["2026-05-01"]
+    assert params["limit"] == ["20"]
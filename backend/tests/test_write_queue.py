@@ -0,0 +1,64 @@
+"""
+Tests for the SQLite group-commit write queue.
+"""
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column
+
+from app.core.write_queue import QueuedSession, WriteQueue
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Item(Base):
+    __tablename__ = "items"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str]
+
+
+class FailingCommitQueue(WriteQueue):
+    """WriteQueue whose group COMMIT raises while ``fail_commits`` is set."""
+
+    fail_commits = True
+
+    def _writer_engine(self):
+        writer_engine = super()._writer_engine()
+
+        @event.listens_for(writer_engine, "commit")
+        def _fail(connection):
+            if self.fail_commits:
+                raise RuntimeError("disk I/O error")
+
+        return writer_engine
+
+
+def test_failed_group_commit_leaves_no_phantom_objects(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'queue.db'}")
+    Base.metadata.create_all(engine)
+    write_queue = FailingCommitQueue(engine, max_batch=8, timeout_seconds=5)
+    session = QueuedSession(bind=engine, write_queue=write_queue)
+    rollbacks = []
+    event.listen(session, "after_rollback", lambda s: rollbacks.append(s))
+    try:
+        item = Item(id=1, name="first")
+        session.add(item)
+        with pytest.raises(RuntimeError, match="disk I/O error"):
+            session.commit()
+
+        assert rollbacks == [session]
+        assert item not in session
+        assert session.get(Item, 1) is None
+
+        # The same row can be written once the writer recovers
+        write_queue.fail_commits = False
+        session.add(Item(id=1, name="second"))
+        session.commit()
+        with Session(engine) as reader:
+            assert reader.get(Item, 1).name == "second"
+    finally:
+        session.close()
+        write_queue.stop()
+        engine.dispose()
@@ -96,3 +96,53 @@ export const deliveryService = {
     return response.data;
   },
 };
+
+// Live booking/delivery events (server-sent events)
+const EVENT_TYPES = ['booking.created', 'booking.updated', 'delivery.created', 'delivery.updated', 'resync'];
+const EVENT_RECONNECT_MS = 3000;
+
+export const eventService = {
+  // EventSource cannot send the Authorization header, so each connection is
+  // opened with a single-use ticket. The browser's own reconnect would reuse
+  // the spent ticket, so after an error a new ticket is fetched and the
+  // stream resumes from the last event received.
+  subscribe: (onEvent) => {
+    let source = null;
+    let closed = false;
+    let lastEventId = null;
+
+    const connect = async () => {
+      let ticket;
+      try {
+        const response = await api.post('/events/ticket');
+        ticket = response.data.ticket;
+      } catch (error) {
+        if (!closed && error.response?.status !== 401) {
+          setTimeout(connect, EVENT_RECONNECT_MS);
+        }
+        return;
+      }
+      if (closed) return;
+
+      const params = new URLSearchParams({ ticket });
+      if (lastEventId) params.set('last_event_id', lastEventId);
+      source = new EventSource(`${api.defaults.baseURL}/events/stream?${params}`);
+      EVENT_TYPES.forEach((type) => {
+        source.addEventListener(type, (event) => {
+          if (event.lastEventId) lastEventId = event.lastEventId;
+          onEvent(type, JSON.parse(event.data));
+        });
+      });
+      source.onerror = () => {
+        source.close();
+        if (!closed) setTimeout(connect, EVENT_RECONNECT_MS);
+      };
+    };
+
+    connect();
+    return () => {
+      closed = true;
+      if (source) source.close();
+    };
+  },
+};